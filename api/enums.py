@@ -4,4 +4,9 @@ from enum import Enum
 class HealthStatus(str, Enum):
     OK = "ok"
     DOWN = "down"
-    DEGRADED = "degraded"
\ No newline at end of file
+    DEGRADED = "degraded"
+
+class RequestPriority(str, Enum):
+    INTERACTIVE = "interactive"
+    REFRESH = "refresh"
+    BULK = "bulk"
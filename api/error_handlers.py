@@ -1,4 +1,4 @@
-from fastapi import Request
+from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 import logging
 
@@ -35,4 +35,43 @@ async def generic_exception_handler(request: Request, exc: Exception):
             "error": "INTERNAL_SERVER_ERROR",
             "detail": "Erro interno inesperado",
         },
-    )
\ No newline at end of file
+    )
+
+
+def build_error_item(exc: Exception) -> dict:
+    """Função que converte uma exceção em um dicionário de erro tipado para respostas em lote
+    Args:
+        exc (Exception): Exceção levantada na consulta de um processo
+    Returns:
+        error (dict): Dicionário com tipo, status e detalhe do erro
+    """
+    if isinstance(exc, TJRSBaseError):
+        error = {
+            "type": type(exc).__name__,
+            "status_code": exc.status_code,
+            "detail": exc.message,
+        }
+        if hasattr(exc, "retry_after"):
+            error["retry_after"] = exc.retry_after
+        return error
+
+    if isinstance(exc, HTTPException):
+        return {
+            "type": "HTTPException",
+            "status_code": exc.status_code,
+            "detail": exc.detail,
+        }
+
+    if isinstance(exc, ValueError):
+        return {
+            "type": "ValidationError",
+            "status_code": 422,
+            "detail": str(exc),
+        }
+
+    logger.exception(f"Unhandled error in batch item | error={exc}", exc_info=exc)
+    return {
+        "type": "INTERNAL_SERVER_ERROR",
+        "status_code": 500,
+        "detail": "Erro interno inesperado",
+    }
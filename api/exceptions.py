@@ -37,4 +37,24 @@ class TJRSUpstreamError(TJRSBaseError):
     TJRS respondeu, mas resposta inesperada (HTML, JSON inválido, 5xx persistente etc.)
     """
     message: str = "Falha ao consultar TJRS"
-    status_code: int = 502
\ No newline at end of file
+    status_code: int = 502
+
+
+@dataclass
+class TJRSClientError(TJRSUpstreamError):
+    """
+    TJRS respondeu 4xx definitivo (fora 401/403/429): repetir a consulta não muda o resultado.
+    """
+    message: str = "TJRS recusou a consulta"
+    status_code: int = 502
+    upstream_status: int = 400
+
+
+@dataclass
+class TJRSCircuitOpen(TJRSBaseError):
+    """
+    Circuit breaker aberto: TJRS falhando seguidamente, a consulta é recusada sem chamar o tribunal.
+    """
+    message: str = "TJRS indisponível, consultas suspensas"
+    status_code: int = 503
+    retry_after: int = 30
@@ -1,23 +1,51 @@
+import os
+import json
 import time
+import asyncio
+import logging
 import httpx
+from datetime import date
+from typing import AsyncIterator, Optional
 from . import schema
-from fastapi import Query
+from fastapi import Header, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from crawler_jus.crawler import Crawler
-from crawler_jus.services.search_service import SearchService
+from crawler_jus.cache import listen_invalidations, cache_stats
+from crawler_jus.tracing import start_trace, server_timing, format_tree
+from crawler_jus import metrics
+from crawler_jus.services.search_service import SearchService, MovimentosFilter, BATCH_MAX_CONCURRENCY
+from crawler_jus.services.watch_service import WatchService
+from crawler_jus.npu_batch import validate_npus
 from api.exceptions import TJRSBaseError
 from api.error_handlers import tjrs_exception_handler, generic_exception_handler
-from api.enums import HealthStatus
+from api.enums import HealthStatus, RequestPriority
+
+
+logger = logging.getLogger(__name__)
+
+WATCH_WORKER = os.getenv("WATCH_WORKER", "1") == "1"
+# requisições mais lentas que isso são logadas com a árvore de fases completa
+SLOW_REQUEST_THRESHOLD = float(os.getenv("SLOW_REQUEST_THRESHOLD_SECONDS", "5"))
+# linha do /search_npu/stream maior que isso vira erro da linha em vez de crescer em memória
+NDJSON_MAX_LINE_BYTES = int(os.getenv("NDJSON_MAX_LINE_BYTES", "4096"))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     crawler = Crawler()
     app.state.crawler = crawler
+    tasks = [asyncio.create_task(listen_invalidations())]
+    if WATCH_WORKER:
+        tasks.append(asyncio.create_task(WatchService(crawler).run()))
 
     yield
 
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
     await crawler.close()
 
 
@@ -28,7 +56,25 @@ app.add_exception_handler(Exception, generic_exception_handler)
 
 TJRS_URL = "https://www.tjrs.jus.br/novo/busca/?return=proc&client=wp_index#"
 
-@app.get("/status")
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """Middleware que mede as fases de cada requisição, devolve no header Server-Timing e loga
+    a árvore de fases das requisições mais lentas que SLOW_REQUEST_THRESHOLD_SECONDS
+    """
+    path = request.url.path
+    if path == "/metrics":
+        return await call_next(request)
+
+    with start_trace(f"{request.method} {path}") as root:
+        response = await call_next(request)
+
+    if path.startswith("/search_npu"):
+        metrics.SEARCH_LATENCY.labels(path).observe(root.duration)
+    response.headers["Server-Timing"] = server_timing(root)
+    if root.duration >= SLOW_REQUEST_THRESHOLD:
+        logger.warning(f"Requisição lenta | status={response.status_code}\n{format_tree(root)}")
+    return response
 
 
 @app.get("/status")
@@ -59,17 +105,243 @@ async def healthcheck():
         "api": api_status,
         "tribunal_site": site_status,
         "response_time_ms": response_time_ms,
+        "cache": cache_stats(),
+        "rate_limiter": app.state.crawler.rate_limiter.stats(),
+        "circuit_breaker": app.state.crawler.circuit_breaker.stats(),
+        "scheduler": app.state.crawler.scheduler.stats(),
     }
 
+
+@app.get("/metrics")
+async def prometheus_metrics() -> Response:
+    """Parte da api que expõe as métricas no formato do Prometheus"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+def choose_priority(
+    priority: Optional[RequestPriority], x_priority: Optional[RequestPriority], default: RequestPriority
+) -> RequestPriority:
+    """Função que escolhe a classe de prioridade das consultas ao TJRS
+    Args:
+        priority (Optional[RequestPriority]): Parametro "priority" da url, tem precedência
+        x_priority (Optional[RequestPriority]): Header X-Priority
+        default (RequestPriority): Classe padrão da rota
+    Returns:
+        priority (RequestPriority): Classe escolhida
+    """
+    return priority or x_priority or default
+
+
 @app.post("/search_npu")
-async def search_npu(cliente: schema.ClienteInput, force_refresh: bool = Query(False)) -> dict:
+async def search_npu(
+    cliente: schema.ClienteInput,
+    response: Response,
+    force_refresh: bool = Query(False),
+    priority: Optional[RequestPriority] = Query(None),
+    x_priority: Optional[RequestPriority] = Header(None),
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    desde: Optional[date] = Query(None),
+    ate: Optional[date] = Query(None),
+) -> dict:
     """Parte da api que recebe o post com dados do processo e executa chamada para extração dos dados
     Args:
         cliente (schema.ClienteInput): Json com numero do processo
+        response (Response): Resposta, usada para informar a idade do dado no header Age
         force_refresh (bool): Determina se é para forçar ou nao refresh no cache redis
+        priority (RequestPriority): Classe da consulta no TJRS (também aceita pelo header X-Priority), padrão "interactive"
+        limit (Optional[int]): Máximo de movimentos devolvidos, sem limite por padrão (histórico completo)
+        offset (int): Quantidade de movimentos pulados
+        desde (Optional[date]): Só movimentos a partir desta data (AAAA-MM-DD)
+        ate (Optional[date]): Só movimentos até esta data (AAAA-MM-DD)
     Returns:
         processo_info (dict): Dicionário com dados do processo
     """
-    service = SearchService(app.state.crawler)
-    return await service.search_npu(cliente.npu, force_refresh=force_refresh)
-    
+    service = SearchService(
+        app.state.crawler, priority=choose_priority(priority, x_priority, RequestPriority.INTERACTIVE)
+    )
+    movimentos_filter = MovimentosFilter(offset=offset, limit=limit, desde=desde, ate=ate)
+    processo_info = await service.search_npu(
+        cliente.npu, force_refresh=force_refresh, movimentos_filter=movimentos_filter
+    )
+    age = processo_info.get("cache", {}).get("age_seconds")
+    if age is not None:
+        response.headers["Age"] = str(int(age))
+    return processo_info
+
+
+@app.post("/search_npu/batch")
+async def search_npu_batch(
+    lote: schema.BatchInput,
+    force_refresh: bool = Query(False),
+    max_concurrency: int = Query(BATCH_MAX_CONCURRENCY, ge=1, le=BATCH_MAX_CONCURRENCY),
+    priority: Optional[RequestPriority] = Query(None),
+    x_priority: Optional[RequestPriority] = Header(None),
+) -> dict:
+    """Parte da api que recebe uma lista de processos e retorna dados ou erro tipado de cada um
+    Args:
+        lote (schema.BatchInput): Json com lista de numeros de processo
+        force_refresh (bool): Determina se é para forçar ou nao refresh no cache redis
+        max_concurrency (int): Máximo de processos consultados ao mesmo tempo no TJRS
+        priority (RequestPriority): Classe das consultas no TJRS (também aceita pelo header X-Priority), padrão "bulk"
+    Returns:
+        resultados (dict): Dicionário com um resultado por processo único
+    """
+    service = SearchService(app.state.crawler, priority=choose_priority(priority, x_priority, RequestPriority.BULK))
+    npus = [cliente.npu for cliente in lote.processos]
+    results = await service.search_npu_batch(
+        npus, force_refresh=force_refresh, max_concurrency=max_concurrency
+    )
+    return {"total": len(results), "results": results}
+
+
+@app.post("/validate_npu/batch")
+async def validate_npu_batch(lote: schema.ValidateBatchInput) -> dict:
+    """Parte da api que normaliza e confere o dígito verificador de uma lista de npus, sem consultar o TJRS
+    Args:
+        lote (schema.ValidateBatchInput): Json com lista de numeros de processo
+    Returns:
+        resultado (dict): npus no formato CNJ (None se não normalizáveis) e máscara dos inválidos, na ordem da entrada
+    """
+    # cálculo pesado em listas grandes: fora do event loop
+    normalized, invalid = await asyncio.to_thread(validate_npus, lote.npus)
+    return {
+        "total": len(normalized),
+        "invalid_count": sum(invalid),
+        "normalized": normalized,
+        "invalid": invalid,
+    }
+
+
+async def read_ndjson_npus(chunks: AsyncIterator[bytes]) -> AsyncIterator[str | Exception]:
+    """Função que percorre o corpo NDJSON da requisição conforme chega, validando cada linha sob demanda
+    Args:
+        chunks (AsyncIterator[bytes]): Pedaços do corpo com um {"npu": ...} por linha
+    Returns:
+        npu (AsyncIterator[str | Exception]): npu formatado ou erro de validação da linha
+    """
+    pending = b""
+    skipping = False
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if skipping:
+                # fim da linha longa demais, já reportada
+                skipping = False
+            elif line.strip():
+                yield parse_ndjson_line(line)
+        # linha sem fim não pode crescer sem limite: reporta uma vez e descarta até a próxima quebra
+        if len(pending) > NDJSON_MAX_LINE_BYTES:
+            if not skipping:
+                yield ValueError(f"Linha NDJSON maior que {NDJSON_MAX_LINE_BYTES} bytes")
+            skipping = True
+            pending = b""
+    if pending.strip() and not skipping:
+        yield parse_ndjson_line(pending)
+
+
+def parse_ndjson_line(line: bytes) -> str | Exception:
+    try:
+        return schema.ClienteInput.model_validate(json.loads(line)).npu
+    except ValueError as e:
+        return e
+
+
+@app.post("/search_npu/stream")
+async def search_npu_stream(
+    request: Request,
+    force_refresh: bool = Query(False),
+    max_concurrency: int = Query(BATCH_MAX_CONCURRENCY, ge=1, le=BATCH_MAX_CONCURRENCY),
+    priority: Optional[RequestPriority] = Query(None),
+    x_priority: Optional[RequestPriority] = Header(None),
+) -> StreamingResponse:
+    """Parte da api que recebe processos em NDJSON e devolve cada resultado em NDJSON assim que fica pronto;
+    em servidores ASGI 2.4 o corpo é lido aos poucos (a memória não cresce com o tamanho da entrada)
+    Args:
+        request (Request): Corpo NDJSON com um {"npu": ...} por linha
+        force_refresh (bool): Determina se é para forçar ou nao refresh no cache redis
+        max_concurrency (int): Máximo de processos consultados ao mesmo tempo no TJRS
+        priority (RequestPriority): Classe das consultas no TJRS (também aceita pelo header X-Priority), padrão "bulk"
+    Returns:
+        resultados (StreamingResponse): Uma linha por processo, em ordem de conclusão, com o índice da entrada
+    """
+    service = SearchService(app.state.crawler, priority=choose_priority(priority, x_priority, RequestPriority.BULK))
+    spec_version = tuple(map(int, request.scope.get("asgi", {}).get("spec_version", "2.0").split(".")))
+    if spec_version >= (2, 4):
+        chunks = request.stream()
+    else:
+        # antes do ASGI 2.4 (caso do uvicorn) o StreamingResponse lê o receive() à espera da desconexão
+        # enquanto responde, o que consumiria os pedaços do corpo: o corpo é lido inteiro antes de responder
+        body = await request.body()
+
+        async def buffered() -> AsyncIterator[bytes]:
+            yield body
+
+        chunks = buffered()
+    body_read = False
+
+    async def npus() -> AsyncIterator[str | Exception]:
+        nonlocal body_read
+        try:
+            async for npu in read_ndjson_npus(chunks):
+                yield npu
+        except ClientDisconnect:
+            # cliente foi embora no meio do envio
+            return
+        finally:
+            body_read = True
+
+    async def lines() -> AsyncIterator[str]:
+        results = service.stream_npus(npus(), force_refresh=force_refresh, max_concurrency=max_concurrency)
+        try:
+            async for item in results:
+                # com o corpo já lido o receive() só traz a desconexão: cliente foi embora, para de consultar o TJRS
+                if body_read and await request.is_disconnected():
+                    break
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+        finally:
+            await results.aclose()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def validate_path_npu(npu: str) -> str:
+    try:
+        return schema.ClienteInput(npu=npu).npu
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.post("/watch")
+async def watch_add(cliente: schema.ClienteInput) -> dict:
+    """Parte da api que inclui um processo na lista de acompanhamento, com os movimentos atuais como base
+    Args:
+        cliente (schema.ClienteInput): Json com numero do processo
+    Returns:
+        watch (dict): Situação do acompanhamento, com o cursor atual
+    """
+    return await WatchService(app.state.crawler).add(cliente.npu)
+
+
+@app.delete("/watch/{npu}", status_code=204)
+async def watch_remove(npu: str = Path(...)) -> Response:
+    """Parte da api que tira um processo da lista de acompanhamento
+    Args:
+        npu (str): Numero do processo
+    """
+    await WatchService(app.state.crawler).remove(validate_path_npu(npu))
+    return Response(status_code=204)
+
+
+@app.get("/watch/{npu}/movimentos")
+async def watch_movements(npu: str = Path(...), cursor: int = Query(0, ge=0)) -> dict:
+    """Parte da api que retorna só os movimentos detectados depois do cursor
+    Args:
+        npu (str): Numero do processo
+        cursor (int): Cursor devolvido na chamada anterior (0 para todos desde o início do acompanhamento)
+    Returns:
+        movimentos (dict): Movimentos novos e o cursor para a próxima chamada
+    """
+    return await WatchService(app.state.crawler).new_movements(validate_path_npu(npu), cursor=cursor)
@@ -1,10 +1,14 @@
+import os
 import re
 import logging
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from crawler_jus.util import normalize_npu_to_20_digits
 
 logger = logging.getLogger(__name__)
 
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "500"))
+VALIDATE_BATCH_MAX_SIZE = int(os.getenv("VALIDATE_BATCH_MAX_SIZE", "100000"))
+
 
 def format_cnj(digits: str) -> str:
     # npu = 20 dígitos
@@ -42,4 +46,13 @@ class ClienteInput(BaseModel):
             f"Dígito verificador inválido no NPU. Esperado: {expected_digito_verificador}")
             raise ValueError(f"O número não é um numero cnj(NPU) válido)")
 
-        return format_cnj(digits20)
\ No newline at end of file
+        return format_cnj(digits20)
+
+
+class BatchInput(BaseModel):
+    processos: list[ClienteInput] = Field(..., min_length=1, max_length=BATCH_MAX_SIZE)
+
+
+class ValidateBatchInput(BaseModel):
+    # npus sem validação individual: inválidos voltam marcados na máscara em vez de derrubar o lote
+    npus: list[str] = Field(..., min_length=1, max_length=VALIDATE_BATCH_MAX_SIZE)
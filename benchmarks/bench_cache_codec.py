@@ -0,0 +1,101 @@
+"""
+Benchmark dos codecs da cache: tamanho gravado no redis e tempo de encode/decode
+em payloads realistas de processo (dados básicos + partes + N movimentos).
+
+Uso:
+    python -m benchmarks.bench_cache_codec [--movimentos 10 200 2000] [--repeat 200]
+"""
+import argparse
+import json
+import random
+import time
+
+from crawler_jus.codec import CacheCodec, COMPRESSORS, SERIALIZERS
+
+DESCRICOES = [
+    "Publicado no DJEN - no dia {d} - Refer. ao Evento: {n}",
+    "PETIÇÃO PROTOCOLADA JUNTADA - PETIÇÃO",
+    "Expedida/certificada a intimação eletrônica (EXECUTADO -  BANCO BRADESCO S.A.)  prazo: 30 dias  Data final: {d} 23:59:59",
+    "Ato Ordinatório - Vinculado depósito judicial BACENJUD/SISBAJUD - GUIA: {g}",
+    "Confirmada a intimação eletrônica - Refer. ao Evento: {n} - Ciência Tácita",
+    "Conclusos pra decisão/despacho",
+]
+
+
+def build_payload(movimentos: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    return {
+        "fetched_at": 1767225600.0,
+        "data": {
+            "numeroProcesso": "5056077-84.2025.8.21.0008",
+            "numeroProcessoCNJ": "50560778420258210008",
+            "classeCNJ": "CUMPRIMENTO DE SENTENÇA",
+            "assuntoCNJ": "Compromisso, Espécies de contratos, Obrigações, DIREITO CIVIL",
+            "nomeClasse": "CUMPRIMENTO DE SENTENÇA",
+            "nomeNatureza": "Compromisso, Espécies de contratos, Obrigações, DIREITO CIVIL",
+            "comarca": "CANOAS",
+            "codigoComarca": "8",
+            "dataDistribuicao": "04/12/2025 09:25:41",
+            "dataPropositura": None,
+            "situacaoProcesso": "MOVIMENTO",
+            "segredoJustica": False,
+            "tipoProcesso": "EPROC",
+            "orgaoJulgador": "1º Juízo da 2ª Vara Cível da Comarca de Canoas",
+            "partes": [
+                {"descricaoTipo": "EXEQUENTE", "nome": "SERAFINI ADVOGADOS"},
+                {"descricaoTipo": "EXECUTADO", "nome": "BANCO BRADESCO S.A."},
+                {"descricaoTipo": "EXECUTADO", "nome": "PETRÓLEO BRASILEIRO S/A - PETROBRÁS"},
+            ],
+            "processosVinculados": [],
+            "movimentos": [
+                {
+                    "data": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2013, 2026)}",
+                    "descricao": rng.choice(DESCRICOES).format(
+                        d="19/12/2025", n=rng.randint(1, 900), g=rng.randint(10**8, 10**9)
+                    ),
+                }
+                for _ in range(movimentos)
+            ],
+        },
+    }
+
+
+def measure(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movimentos", type=int, nargs="+", default=[10, 200, 2000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    codecs = {"legacy json (ensure_ascii=False)": None}
+    for serializer in SERIALIZERS:
+        codecs[serializer] = CacheCodec(serializer, None)
+        for compression in COMPRESSORS:
+            codecs[f"{serializer}+{compression}"] = CacheCodec(serializer, compression, compress_threshold=4096)
+
+    print(f"{'movimentos':>10} | {'codec':<34} | {'bytes':>9} | {'encode us':>10} | {'decode us':>10}")
+    for movimentos in args.movimentos:
+        payload = build_payload(movimentos)
+        for name, codec in codecs.items():
+            if codec is None:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                encode = lambda: json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                decode = lambda: json.loads(data)
+            else:
+                data, _ = codec.encode(payload)
+                encode = lambda: codec.encode(payload)
+                decode = lambda: codec.decode(data)
+            print(
+                f"{movimentos:>10} | {name:<34} | {len(data):>9} | "
+                f"{measure(encode, args.repeat):>10.1f} | {measure(decode, args.repeat):>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Teste de carga ponta a ponta: sobe o servidor falso do TJRS (benchmarks/mock_tjrs.py), aponta o crawler
+para ele e dispara consultas contra api.router:app (em processo, sem rede entre cliente e api),
+informando vazão, latência p50/p95/p99 e os status devolvidos.
+
+Uso:
+    python -m benchmarks.bench_load [--requests 2000] [--concurrency 50] [--npus 200] [--fakeredis]
+        [--latency-ms 80] [--rate-429 0.02] [--rate-5xx 0.01] [--movimentos 200]
+
+Sem --fakeredis usa o redis de CACHE_URL (ex.: o do docker-compose).
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.mock_tjrs import add_arguments, config_from_args, create_app
+
+
+def build_npus(count: int, seed: int = 11) -> list[str]:
+    from api.schema import calc_digito_verificador, format_cnj
+
+    rng = random.Random(seed)
+    npus = []
+    for _ in range(count):
+        digits = f"{rng.randint(1, 9_999_999):07d}00{rng.randint(2015, 2026)}821{rng.randint(1, 200):04d}"
+        npus.append(format_cnj(digits[:7] + calc_digito_verificador(digits) + digits[9:]))
+    return npus
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def start_mock(args: argparse.Namespace):
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(config_from_args(args)), host="127.0.0.1", port=args.mock_port, log_level="error")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+async def run_load(args: argparse.Namespace) -> None:
+    # só depois de apontar as urls para o servidor falso (lidas na importação de crawler_jus.util)
+    from api import router
+    from crawler_jus import cache
+
+    if args.fakeredis:
+        import fakeredis
+
+        cache.redis_client = fakeredis.FakeAsyncRedis()
+
+    npus = build_npus(args.npus)
+    rng = random.Random(args.seed)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(rng.choice(npus))
+
+    async with router.lifespan(router.app):
+        transport = httpx.ASGITransport(app=router.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+            async def worker():
+                while not queue.empty():
+                    npu = queue.get_nowait()
+                    params = {"force_refresh": "true"} if rng.random() < args.force_refresh_ratio else {}
+                    start = time.perf_counter()
+                    response = await client.post("/search_npu", json={"npu": npu}, params=params)
+                    latencies.append(time.perf_counter() - start)
+                    statuses[response.status_code] += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+
+    async with httpx.AsyncClient() as client:
+        mock_stats = (await client.get(f"http://127.0.0.1:{args.mock_port}/mock/stats")).json()
+
+    print(f"requisições   {len(latencies)} em {elapsed:.2f}s ({len(latencies) / elapsed:,.1f} req/s)")
+    print(
+        "latência      "
+        + "  ".join(f"p{p}={percentile(latencies, p) * 1000:.1f}ms" for p in (50, 95, 99))
+        + f"  max={max(latencies) * 1000:.1f}ms"
+    )
+    print(f"status        {dict(sorted(statuses.items()))}")
+    print(f"tjrs falso    {mock_stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--npus", type=int, default=200, help="processos distintos (menos processos, mais acertos de cache)")
+    parser.add_argument("--force-refresh-ratio", type=float, default=0.0, help="fração das consultas com force_refresh")
+    parser.add_argument("--fakeredis", action="store_true", help="usa um redis em memória (fakeredis) no lugar de CACHE_URL")
+    parser.add_argument("--mock-port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.mock_port}"
+    os.environ["TJRS_CONSULTA_URL"] = f"{base}/consulta-processual/"
+    os.environ["TJRS_SERVICE_URL"] = f"{base}/api/consulta-service"
+    os.environ.setdefault("WATCH_WORKER", "0")
+    os.environ.setdefault("SLOW_REQUEST_THRESHOLD_SECONDS", "60")
+
+    server, thread = start_mock(args)
+    try:
+        asyncio.run(run_load(args))
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark da validação de npus em lote: ClienteInput (normalização por regex e mod 97 com int grande,
+um npu por vez) contra o caminho vetorizado com numpy de crawler_jus.npu_batch.
+
+Uso:
+    python -m benchmarks.bench_npu_validation [--count 1000000] [--invalid-ratio 0.1]
+"""
+import argparse
+import logging
+import random
+import time
+
+from api.schema import ClienteInput, calc_digito_verificador, format_cnj
+from crawler_jus.npu_batch import np, validate_npus
+
+
+def build_npus(count: int, invalid_ratio: float, seed: int = 3) -> list[str]:
+    rng = random.Random(seed)
+    npus = []
+    for _ in range(count):
+        digits = f"{rng.randint(1, 9_999_999):07d}00{rng.randint(2015, 2026)}821{rng.randint(1, 200):04d}"
+        digits = digits[:7] + calc_digito_verificador(digits) + digits[9:]
+        if rng.random() < invalid_ratio:
+            digits = digits[:8] + str((int(digits[8]) + 1) % 10) + digits[9:]
+        npus.append(format_cnj(digits) if rng.random() < 0.5 else digits)
+    return npus
+
+
+def scalar(npus: list[str]) -> list[bool]:
+    invalid = []
+    for npu in npus:
+        try:
+            ClienteInput(npu=npu)
+            invalid.append(False)
+        except ValueError:
+            invalid.append(True)
+    return invalid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+    # ClienteInput loga cada dígito verificador inválido
+    logging.disable(logging.WARNING)
+
+    npus = build_npus(args.count, args.invalid_ratio)
+
+    start = time.perf_counter()
+    expected = scalar(npus)
+    scalar_elapsed = time.perf_counter() - start
+    print(f"{'scalar':<10} {args.count / scalar_elapsed:>12,.0f} npus/s  ({scalar_elapsed:.2f}s)")
+
+    start = time.perf_counter()
+    _, invalid = validate_npus(npus)
+    elapsed = time.perf_counter() - start
+    assert invalid == expected
+    engine = "numpy" if np is not None else "fallback"
+    print(f"{engine:<10} {args.count / elapsed:>12,.0f} npus/s  ({elapsed:.2f}s, {scalar_elapsed / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark do CPU gasto decodificando as respostas do TJRS por busca (dados básicos + movimentos):
+pipeline antigo (json.loads para validar, de novo no is_rate_limited e de novo no extrator)
+contra o atual (um único decode, com orjson quando instalado, e o objeto indo direto aos extratores).
+
+Uso:
+    python -m benchmarks.bench_parse [--movimentos 10 200 2000] [--repeat 200]
+"""
+import argparse
+import json
+import random
+import time
+
+from crawler_jus import codec
+from crawler_jus.crawler import Crawler
+from benchmarks.bench_cache_codec import DESCRICOES
+
+crawler = Crawler.__new__(Crawler)
+
+
+def build_bodies(movimentos: int, seed: int = 7) -> tuple[str, str]:
+    rng = random.Random(seed)
+    basic = {
+        "data": [
+            {
+                "numeroCNJFormatado": "5056077-84.2025.8.21.0008",
+                "numeroCNJ": "50560778420258210008",
+                "classeCNJ": "CUMPRIMENTO DE SENTENÇA",
+                "assuntoCNJ": "Compromisso, Espécies de contratos, Obrigações, DIREITO CIVIL",
+                "nomeClasse": "CUMPRIMENTO DE SENTENÇA",
+                "comarca": {"nome": "CANOAS"},
+                "orgaoJulgador": {"nome": "1º Juízo da 2ª Vara Cível da Comarca de Canoas"},
+                "partes": {"parte": [{"descricaoTipo": "EXEQUENTE", "nome": "SERAFINI ADVOGADOS"}]},
+                "processosVinculados": [],
+            }
+        ]
+    }
+    movs = {
+        "data": [
+            {
+                "data": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2013, 2026)} 10:00:00",
+                "descricao": rng.choice(DESCRICOES).format(
+                    d="19/12/2025", n=rng.randint(1, 900), g=rng.randint(10**8, 10**9)
+                ),
+                "usuario": "SISTEMA",
+                "sequencia": i,
+            }
+            for i in range(movimentos)
+        ]
+    }
+    return json.dumps(basic, ensure_ascii=False), json.dumps(movs, ensure_ascii=False)
+
+
+def legacy_is_rate_limited(text: str) -> bool:
+    try:
+        return json.loads(text).get("exceptionKey") == 429
+    except Exception:
+        return False
+
+
+def search_before(basic: str, movs: str):
+    for text in (basic, movs):
+        legacy_is_rate_limited(text)
+        json.loads(text)
+    return crawler.extract_basic_data_partes(json.loads(basic)), crawler.extract_movimentos(json.loads(movs))
+
+
+def search_after(loads):
+    def search(basic: str, movs: str):
+        payloads = []
+        for text in (basic, movs):
+            payload = loads(text)
+            crawler.is_rate_limited(payload)
+            payloads.append(payload)
+        return crawler.extract_basic_data_partes(payloads[0]), crawler.extract_movimentos(payloads[1])
+
+    return search
+
+
+def measure(fn, repeat: int, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movimentos", type=int, nargs="+", default=[10, 200, 2000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    pipelines = {
+        "antes (3x json.loads)": search_before,
+        "depois (1x json.loads)": search_after(json.loads),
+    }
+    if codec.orjson is not None:
+        pipelines["depois (1x orjson)"] = search_after(codec.orjson.loads)
+
+    print(f"{'movimentos':>10} | {'pipeline':<24} | {'us/busca':>10} | {'economia':>8}")
+    for movimentos in args.movimentos:
+        basic, movs = build_bodies(movimentos)
+        assert len({repr(fn(basic, movs)) for fn in pipelines.values()}) == 1
+        baseline = None
+        for name, fn in pipelines.items():
+            elapsed = measure(fn, args.repeat, basic, movs)
+            baseline = baseline or elapsed
+            print(f"{movimentos:>10} | {name:<24} | {elapsed:>10.1f} | {1 - elapsed / baseline:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Micro-benchmark das engines do solver do challenge altcha: hashes por segundo de cada engine
+em busca completa (o número está no fim do intervalo), e opcionalmente do solver paralelo.
+
+Uso:
+    python -m benchmarks.bench_solver [--maxnumber 300000] [--parallel-workers 4]
+"""
+import argparse
+import asyncio
+import hashlib
+import time
+
+from crawler_jus.solver import ENGINES, ParallelSolver
+
+SALT = "5b6f1c0e2a9d4e77a1f3?expires=1767225600"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--maxnumber", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--parallel-workers", type=int, default=0, help="0 desliga o teste do solver paralelo")
+    args = parser.parse_args()
+
+    number = args.maxnumber
+    challenge = hashlib.sha256(f"{SALT}{number}".encode()).hexdigest()
+    hashes = number + 1
+
+    baseline = None
+    for name, engine in ENGINES.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            assert engine(SALT, challenge, 0, args.maxnumber + 1) == number
+            best = min(best, time.perf_counter() - start)
+        rate = hashes / best
+        baseline = baseline or rate
+        print(f"{name:<10} {rate:>12,.0f} hashes/s  ({best * 1000:.0f} ms, {rate / baseline:.2f}x)")
+
+    if args.parallel_workers:
+        async def run_parallel() -> float:
+            solver = ParallelSolver(workers=args.parallel_workers)
+            try:
+                # primeira chamada sobe o pool; mede a segunda
+                await solver.solve(SALT, challenge, args.maxnumber)
+                start = time.perf_counter()
+                assert await solver.solve(SALT, challenge, args.maxnumber) == number
+                return time.perf_counter() - start
+            finally:
+                solver.close()
+
+        elapsed = asyncio.run(run_parallel())
+        rate = hashes / elapsed
+        print(f"{'parallel':<10} {rate:>12,.0f} hashes/s  ({elapsed * 1000:.0f} ms, {rate / baseline:.2f}x, {args.parallel_workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
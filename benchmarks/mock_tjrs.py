@@ -0,0 +1,272 @@
+"""
+Servidor local que imita o TJRS para testes de carga, com o mesmo contrato usado pelo crawler:
+página da consulta processual apontando para um main.<hash>.js com os BigInts da função obfuscation,
+auth/token com challenge altcha de verdade, auth/submit validando a solução, e consultaProcesso /
+consultaMovimentacao exigindo o Authorization ofuscado. Latência, falhas (429, 5xx, HTML de bloqueio)
+e tamanho das respostas são configuráveis.
+
+Uso:
+    python -m benchmarks.mock_tjrs [--port 8900] [--latency-ms 80] [--rate-429 0.02] [--movimentos 200]
+
+Para apontar a api para ele:
+    TJRS_CONSULTA_URL=http://127.0.0.1:8900/consulta-processual/
+    TJRS_SERVICE_URL=http://127.0.0.1:8900/api/consulta-service
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import secrets
+import time
+from dataclasses import dataclass
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
+
+from benchmarks.bench_cache_codec import DESCRICOES
+
+HMAC_KEY = b"mock-tjrs"
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    auth_latency_ms: float = 30.0
+    rate_429: float = 0.0
+    rate_payload_429: float = 0.0
+    rate_5xx: float = 0.0
+    rate_html: float = 0.0
+    movimentos: int = 50
+    partes: int = 4
+    maxnumber: int = 50_000
+    token_ttl_seconds: float = 300.0
+    bigints: tuple[int, int] = (982451653, 57885161)
+    seed: int | None = None
+
+
+def main_js(config: MockConfig) -> str:
+    big0, big1 = config.bigints
+    # código em volta só para o regex do crawler ter o que atravessar
+    filler = "function n(e){return e&&e.__esModule?e.default:e}" * 200
+    return (
+        f"{filler}\n"
+        f"class r{{obfuscation(e){{const t=BigInt(e.replace('ChaAnon_','')),"
+        f"n=t%BigInt({big0})+BigInt({big1}),r=t*n;return sha256(`@${{n}}@${{r}}!`)}}}}\n"
+        f"{filler}\n"
+    )
+
+
+def expected_authorization(auth: str, bigints: tuple[int, int]) -> str:
+    """Mesmo cálculo de Crawler.obfuscate, do lado do servidor"""
+    big0, big1 = bigints
+    id_num = int(auth.replace("ChaAnon_", ""))
+    n = (id_num % big0) + big1
+    ie = hashlib.sha256(f"@{n}@{id_num * n}!".encode()).hexdigest()
+    return "Basic " + base64.b64encode(f"{auth}:{ie}".encode()).decode()
+
+
+def build_basic(npu: str, comarca: str, rng: random.Random, partes: int) -> dict:
+    formatted = f"{npu[:7]}-{npu[7:9]}.{npu[9:13]}.{npu[13]}.{npu[14:16]}.{npu[16:20]}"
+    return {
+        "data": [
+            {
+                "numeroCNJFormatado": formatted,
+                "numeroCNJ": npu,
+                "classeCNJ": "CUMPRIMENTO DE SENTENÇA",
+                "assuntoCNJ": "Compromisso, Espécies de contratos, Obrigações, DIREITO CIVIL",
+                "nomeClasse": "CUMPRIMENTO DE SENTENÇA",
+                "nomeNatureza": "Compromisso, Espécies de contratos, Obrigações, DIREITO CIVIL",
+                "comarca": {"nome": f"COMARCA {comarca}"},
+                "codigoComarca": comarca,
+                "dataDistribuicao": "10/03/2025",
+                "situacaoProcesso": "EM ANDAMENTO",
+                "segredoJustica": False,
+                "tipoProcesso": "ELETRONICO",
+                "orgaoJulgador": {"nome": "1º Juízo da 2ª Vara Cível"},
+                "partes": {
+                    "parte": [
+                        {"descricaoTipo": rng.choice(["EXEQUENTE", "EXECUTADO", "ADVOGADO"]), "nome": f"PARTE {i}"}
+                        for i in range(partes)
+                    ]
+                },
+                "processosVinculados": [],
+            }
+        ]
+    }
+
+
+def build_movimentos(rng: random.Random, movimentos: int) -> dict:
+    return {
+        "data": [
+            {
+                "data": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2013, 2026)} 10:00:00",
+                "descricao": rng.choice(DESCRICOES).format(
+                    d="19/12/2025", n=rng.randint(1, 900), g=rng.randint(10**8, 10**9)
+                ),
+                "usuario": "SISTEMA",
+                "sequencia": i,
+            }
+            for i in range(movimentos)
+        ]
+    }
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    """Função que monta o servidor falso do TJRS
+    Args:
+        config (MockConfig): Latência, falhas injetadas e tamanho das respostas
+    Returns:
+        app (FastAPI): Aplicação pronta para o uvicorn
+    """
+    app = FastAPI()
+    rng = random.Random(config.seed)
+    bundle = f"main.{secrets.token_hex(8)}.js"
+    issued: dict[str, float] = {}
+    stats = {"token": 0, "submit": 0, "consulta": 0, "unauthorized": 0, "injected": 0}
+
+    async def delay(mean_ms: float):
+        wait = max(0.0, mean_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+        if wait:
+            await asyncio.sleep(wait)
+
+    def injected_failure() -> Response | None:
+        roll = rng.random()
+        for rate, response in (
+            (config.rate_429, lambda: JSONResponse({"message": "Too Many Requests"}, status_code=429)),
+            (config.rate_payload_429, lambda: JSONResponse({"exceptionKey": 429, "messages": ["Limite de requisições"]})),
+            (config.rate_5xx, lambda: PlainTextResponse("Bad Gateway", status_code=502)),
+            (config.rate_html, lambda: HTMLResponse("<html><body>Acesso bloqueado</body></html>")),
+        ):
+            if roll < rate:
+                stats["injected"] += 1
+                return response()
+            roll -= rate
+        return None
+
+    @app.get("/consulta-processual/")
+    async def consulta_page(if_none_match: str | None = Header(None)):
+        etag = f'"{bundle}"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return HTMLResponse(
+            f'<html><head><script src="{bundle}" type="module"></script></head><body></body></html>',
+            headers={"ETag": etag},
+        )
+
+    @app.get("/consulta-processual/{name}")
+    async def consulta_bundle(name: str):
+        if name != bundle:
+            return PlainTextResponse("Not Found", status_code=404)
+        return Response(main_js(config), media_type="application/javascript")
+
+    @app.get("/api/consulta-service/public/auth/token")
+    async def auth_token():
+        stats["token"] += 1
+        await delay(config.auth_latency_ms)
+        salt = f"{secrets.token_hex(12)}?expires={int(time.time() + 600)}"
+        number = rng.randint(0, config.maxnumber)
+        challenge = hashlib.sha256(f"{salt}{number}".encode()).hexdigest()
+        signature = hmac.new(HMAC_KEY, challenge.encode(), hashlib.sha256).hexdigest()
+        return {
+            "algorithm": "SHA-256",
+            "challenge": challenge,
+            "maxnumber": config.maxnumber,
+            "salt": salt,
+            "signature": signature,
+        }
+
+    @app.post("/api/consulta-service/public/auth/submit")
+    async def auth_submit(request: Request):
+        stats["submit"] += 1
+        await delay(config.auth_latency_ms)
+        # form urlencoded lido à mão para não depender do python-multipart
+        altcha = parse_qs((await request.body()).decode()).get("altcha", [""])[0]
+        try:
+            payload = json.loads(base64.b64decode(altcha))
+        except ValueError:
+            return JSONResponse({"message": "Formulário inválido"}, status_code=400)
+        challenge = hashlib.sha256(f"{payload['salt']}{payload['number']}".encode()).hexdigest()
+        signature = hmac.new(HMAC_KEY, challenge.encode(), hashlib.sha256).hexdigest()
+        if challenge != payload["challenge"] or not hmac.compare_digest(signature, payload["signature"]):
+            return JSONResponse({"message": "Challenge inválido"}, status_code=400)
+        username = f"ChaAnon_{rng.randint(10**11, 10**12)}"
+        issued[expected_authorization(username, config.bigints)] = time.time() + config.token_ttl_seconds
+        return {"username": username}
+
+    async def consulta(request: Request, authorization: str | None, build) -> Response:
+        stats["consulta"] += 1
+        await delay(config.latency_ms)
+        if issued.get(authorization or "", 0) < time.time():
+            stats["unauthorized"] += 1
+            return JSONResponse({"message": "Unauthorized"}, status_code=401)
+        failure = injected_failure()
+        if failure is not None:
+            return failure
+        npu = request.query_params.get("numeroProcesso", "")
+        # mesmo processo, mesma resposta
+        return JSONResponse(build(npu, request.query_params.get("codComarca", ""), random.Random(npu)))
+
+    @app.get("/api/consulta-service/v1/consultaProcesso")
+    async def consulta_processo(request: Request, authorization: str | None = Header(None)):
+        return await consulta(request, authorization, lambda npu, comarca, r: build_basic(npu, comarca, r, config.partes))
+
+    @app.get("/api/consulta-service/v1/consultaMovimentacao")
+    async def consulta_movimentacao(request: Request, authorization: str | None = Header(None)):
+        return await consulta(request, authorization, lambda npu, comarca, r: build_movimentos(r, config.movimentos))
+
+    @app.get("/mock/stats")
+    async def mock_stats():
+        return stats
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = MockConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="latência média das consultas")
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--auth-latency-ms", type=float, default=defaults.auth_latency_ms)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fração das consultas com HTTP 429")
+    parser.add_argument("--rate-payload-429", type=float, default=0.0, help="fração com exceptionKey 429 no json")
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-html", type=float, default=0.0, help="fração com página HTML de bloqueio")
+    parser.add_argument("--movimentos", type=int, default=defaults.movimentos, help="movimentos por processo")
+    parser.add_argument("--partes", type=int, default=defaults.partes)
+    parser.add_argument("--maxnumber", type=int, default=defaults.maxnumber, help="dificuldade do challenge")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        auth_latency_ms=args.auth_latency_ms,
+        rate_429=args.rate_429,
+        rate_payload_429=args.rate_payload_429,
+        rate_5xx=args.rate_5xx,
+        rate_html=args.rate_html,
+        movimentos=args.movimentos,
+        partes=args.partes,
+        maxnumber=args.maxnumber,
+        seed=args.seed,
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="error")
+
+
+if __name__ == "__main__":
+    main()
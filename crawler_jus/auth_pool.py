@@ -0,0 +1,204 @@
+import asyncio
+import time
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AuthToken:
+    value: str
+    expires_at: float
+    cooldown_until: float = 0.0
+    # geração das credenciais em que a resolução do token começou
+    generation: int = 0
+
+
+class AuthPool:
+    """
+    Pool de tokens de autorização (ChaAnon_) já resolvidos. As requisições são distribuídas entre os
+    tokens em rodízio, um token que levou 429 fica em espera por um tempo, e uma tarefa em segundo
+    plano resolve novos challenges antes dos tokens expirarem.
+
+    Attributes:
+        create: Função assíncrona que devolve o header Authorization, ou o par (header, horario de expiração)
+        size (int): Quantidade de tokens mantidos válidos
+        ttl_seconds (float): Tempo medio que um token deve durar
+        refresh_lead_seconds (float): Antecedência, em relação à expiração, para resolver o substituto
+        cooldown_seconds (float): Tempo que um token fica sem uso após um 429
+        retry_seconds (float): Espera da tarefa de renovação após falha
+        generation (int): Geração atual das credenciais; tokens de gerações anteriores não entram no pool
+    """
+
+    def __init__(
+        self,
+        create: Callable[[], Awaitable[str | tuple[str, float]]],
+        size: int = 1,
+        ttl_seconds: float = 300,
+        refresh_lead_seconds: float = 30,
+        cooldown_seconds: float = 30,
+        retry_seconds: float = 5,
+    ):
+        self.create = create
+        self.size = max(1, size)
+        self.ttl_seconds = ttl_seconds
+        self.refresh_lead_seconds = min(refresh_lead_seconds, ttl_seconds / 2)
+        self.cooldown_seconds = cooldown_seconds
+        self.retry_seconds = retry_seconds
+        self._tokens: list[AuthToken] = []
+        self._next = 0
+        self._lock = asyncio.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+        self.generation = 0
+
+    async def get(self, force_refresh: bool = False) -> str:
+        """Função que devolve um token válido do pool, resolvendo um novo se necessário
+        Args:
+            force_refresh (bool): bool que determina se um token novo vai ser resolvido forçadamente
+        Returns:
+            auth (str): Header Authorization pronto
+        """
+        return (await self.get_token(force_refresh=force_refresh)).value
+
+    async def get_token(self, force_refresh: bool = False) -> AuthToken:
+        """Função que devolve um token válido do pool, com a geração em que foi resolvido
+        Args:
+            force_refresh (bool): bool que determina se um token novo vai ser resolvido forçadamente
+        Returns:
+            token (AuthToken): Token com header Authorization e geração
+        """
+        self._ensure_refresher()
+
+        if not force_refresh:
+            token = self._pick(time.time())
+            if token is not None:
+                return token
+
+        async with self._lock:
+            if not force_refresh:
+                token = self._pick(time.time())
+                if token is not None:
+                    return token
+
+            token = await self._create_token()
+            self._add(token)
+            return token
+
+    def cooldown(self, value: str) -> None:
+        """Função que tira de uso por um tempo um token que recebeu 429
+        Args:
+            value (str): Token que recebeu o 429
+        """
+        until = time.time() + self.cooldown_seconds
+        for token in self._tokens:
+            if token.value == value:
+                token.cooldown_until = until
+
+    def invalidate(self, value: Optional[str] = None) -> None:
+        """Função que descarta um token, ou todos quando value for None (ex.: segredo do main.js mudou)
+        Args:
+            value (Optional[str]): Token a ser descartado
+        """
+        if value is None:
+            self._tokens = []
+            # token em resolução na tarefa de renovação foi feito com as credenciais antigas
+            if self._refresher is not None:
+                self._refresher.cancel()
+                self._refresher = None
+        else:
+            self._tokens = [token for token in self._tokens if token.value != value]
+
+    def advance(self, value: str) -> int:
+        """Função que inicia uma nova geração de credenciais com o token já resolvido com elas: descarta os demais
+        tokens, inclusive os resolvidos durante a renovação, e os que ainda estiverem em resolução não entram no pool
+        Args:
+            value (str): Token resolvido com as credenciais novas
+        Returns:
+            generation (int): Nova geração
+        """
+        self.generation += 1
+        self._tokens = [token for token in self._tokens if token.value == value]
+        for token in self._tokens:
+            token.generation = self.generation
+        return self.generation
+
+    def held(self) -> set[str]:
+        """Função que retorna os tokens que estão no pool
+        Returns:
+            values (set[str]): Tokens do pool
+        """
+        return {token.value for token in self._tokens}
+
+    def stats(self) -> dict:
+        now = time.time()
+        valid = [token for token in self._tokens if token.expires_at > now]
+        return {
+            "size": self.size,
+            "valid": len(valid),
+            "cooling_down": sum(1 for token in valid if token.cooldown_until > now),
+        }
+
+    async def close(self):
+        """Função que encerra a tarefa de renovação"""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+
+    def _pick(self, now: float) -> Optional[AuthToken]:
+        valid = [token for token in self._tokens if token.expires_at > now]
+        usable = [token for token in valid if token.cooldown_until <= now]
+        if usable:
+            self._next = (self._next + 1) % len(usable)
+            return usable[self._next]
+        # todos em espera e pool cheio: usa o que sai da espera primeiro em vez de resolver mais um
+        if valid and len(valid) >= self.size:
+            return min(valid, key=lambda token: token.cooldown_until)
+        return None
+
+    def _add(self, token: AuthToken) -> None:
+        if token.generation < self.generation:
+            return
+        now = time.time()
+        self._tokens = [t for t in self._tokens if t.expires_at > now]
+        if len(self._tokens) >= self.size:
+            self._tokens.remove(min(self._tokens, key=lambda t: t.expires_at))
+        self._tokens.append(token)
+
+    async def _create_token(self) -> AuthToken:
+        now = time.time()
+        generation = self.generation
+        created = await self.create()
+        if isinstance(created, tuple):
+            value, expires_at = created
+            return AuthToken(value=value, expires_at=expires_at, generation=generation)
+        return AuthToken(value=created, expires_at=now + self.ttl_seconds, generation=generation)
+
+    def _next_refresh_delay(self) -> float:
+        now = time.time()
+        fresh = [t for t in self._tokens if t.expires_at - self.refresh_lead_seconds > now]
+        if len(fresh) < self.size:
+            return 0.0
+        return min(t.expires_at - self.refresh_lead_seconds for t in fresh) - now
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                delay = self._next_refresh_delay()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                async with self._lock:
+                    if self._next_refresh_delay() <= 0:
+                        self._add(await self._create_token())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Falha ao renovar token do pool de autorização | error={e}")
+                await asyncio.sleep(self.retry_seconds)
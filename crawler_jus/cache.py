@@ -1,20 +1,388 @@
 import os
 import json
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any
 from redis import asyncio as redis
+from crawler_jus.codec import CacheCodec, DEFAULT_COMPRESSION
+from crawler_jus.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
 
 CACHE_URL = os.getenv("CACHE_URL", "redis://redis:6379/0")
 CACHE_TTL = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+# stale-while-revalidate: até o soft TTL o valor é fresco; entre soft e hard é servido
+# como velho enquanto uma atualização roda em segundo plano; após o hard TTL expira
+CACHE_SOFT_TTL = int(os.getenv("CACHE_SOFT_TTL_SECONDS", "60"))
+CACHE_HARD_TTL = int(os.getenv("CACHE_HARD_TTL_SECONDS", str(CACHE_TTL)))
+# dados básicos e partes mudam pouco: TTLs próprios, mais longos que os dos movimentos
+CACHE_BASIC_SOFT_TTL = int(os.getenv("CACHE_BASIC_SOFT_TTL_SECONDS", "3600"))
+CACHE_BASIC_HARD_TTL = int(os.getenv("CACHE_BASIC_HARD_TTL_SECONDS", "86400"))
+# processos inexistentes e 4xx definitivos do TJRS ficam pouco tempo em um namespace próprio
+NEGATIVE_CACHE_TTL = int(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "30"))
+NEGATIVE_CACHE_PREFIX = "tjrs:neg:"
+
+L1_CACHE_MAX_ENTRIES = int(os.getenv("L1_CACHE_MAX_ENTRIES", "1024"))
+L1_CACHE_MAX_BYTES = int(os.getenv("L1_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+L1_CACHE_MAX_TTL = float(os.getenv("L1_CACHE_MAX_TTL_SECONDS", "30"))
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "tjrs:cache:invalidate")
+
+CACHE_CODEC = os.getenv("CACHE_CODEC", "json")
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", DEFAULT_COMPRESSION) or None
+CACHE_COMPRESS_THRESHOLD = int(os.getenv("CACHE_COMPRESS_THRESHOLD_BYTES", "4096"))
+
+# credenciais do TJRS compartilhadas entre workers e réplicas
+SHARED_BIGINTS_TTL = int(os.getenv("SHARED_BIGINTS_TTL_SECONDS", "3600"))
+CREDENTIALS_PREFIX = "tjrs:cred:"
+# o main.js só muda de conteúdo quando muda de nome (hash no nome do bundle)
+MAIN_JS_ARTIFACT_TTL = int(os.getenv("MAIN_JS_ARTIFACT_TTL_SECONDS", str(7 * 86400)))
+
+# identifica esta réplica para ignorar as próprias mensagens de invalidação
+INSTANCE_ID = uuid.uuid4().hex
+
+# valores binários (cabeçalho de versão + payload possivelmente comprimido)
+redis_client = redis.from_url(CACHE_URL, decode_responses=False)
+codec = CacheCodec(CACHE_CODEC, CACHE_COMPRESSION, CACHE_COMPRESS_THRESHOLD)
+
+
+class LocalCache:
+    """
+    Cache L1 em memória do processo (LRU com TTL) que fica na frente do redis.
+    Os valores são compartilhados entre chamadores e não devem ser alterados.
+
+    Attributes:
+        max_entries (int): Quantidade máxima de chaves
+        max_bytes (int): Tamanho máximo aproximado (bytes serializados, sem compressão) de todos os valores
+        max_ttl (float): Tempo máximo que uma chave fica no L1, mesmo que o redis dure mais
+        hits (int): Quantidade de acertos
+        misses (int): Quantidade de faltas
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, max_ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            CACHE_REQUESTS.labels("l1", "miss").inc()
+            return None
+
+        value, expires_at, _ = entry
+        if time.monotonic() >= expires_at:
+            self.delete(key)
+            self.misses += 1
+            CACHE_REQUESTS.labels("l1", "miss").inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        CACHE_REQUESTS.labels("l1", "hit").inc()
+        return value
+
+    def set(self, key: str, value: Any, ttl: float, size: int) -> None:
+        ttl = min(ttl, self.max_ttl)
+        if ttl <= 0 or size > self.max_bytes or self.max_entries <= 0:
+            self.delete(key)
+            return
+
+        self.delete(key)
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
 
-redis_client = redis.from_url(CACHE_URL, encoding="utf-8", decode_responses=True)
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+
+local_cache = LocalCache(L1_CACHE_MAX_ENTRIES, L1_CACHE_MAX_BYTES, L1_CACHE_MAX_TTL)
+redis_stats = {"hits": 0, "misses": 0}
+
+
+def cache_stats() -> dict:
+    """Função que retorna os contadores de acertos e faltas de cada camada da cache
+    Returns:
+        stats (dict): Contadores do L1 (memória) e do redis
+    """
+    return {"l1": local_cache.stats(), "redis": dict(redis_stats)}
+
+
+def _remember(key: str, data: bytes | None, pttl: int) -> Any:
+    if not data:
+        redis_stats["misses"] += 1
+        CACHE_REQUESTS.labels("redis", "miss").inc()
+        return None
+
+    redis_stats["hits"] += 1
+    CACHE_REQUESTS.labels("redis", "hit").inc()
+    value, size = codec.decode(data)
+    # respeita o TTL restante no redis (pttl < 0: sem expiração definida)
+    if pttl > 0:
+        local_cache.set(key, value, pttl / 1000, size)
+    return value
 
 
 async def get_cache(key: str):
-    data = await redis_client.get(key)
-    if data:
-        return json.loads(data)
-    return None
+    value = local_cache.get(key)
+    if value is not None:
+        return value
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(key)
+    pipe.pttl(key)
+    data, pttl = await pipe.execute()
+    return _remember(key, data, pttl)
 
 
 async def set_cache(key: str, value: dict, ttl: int | None = None):
     ex = ttl if ttl is not None else CACHE_TTL
-    await redis_client.set(key, json.dumps(value, ensure_ascii=False), ex=ex)
+    data, size = codec.encode(value)
+
+    # grava e avisa as outras réplicas na mesma ida ao redis
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.set(key, data, ex=ex)
+    pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({"origin": INSTANCE_ID, "key": key}))
+    await pipe.execute()
+
+    local_cache.set(key, value, ex, size)
+
+
+async def get_many_cache(keys: list[str]) -> list:
+    if not keys:
+        return []
+
+    values = [local_cache.get(key) for key in keys]
+    missing = [key for key, value in zip(keys, values) if value is None]
+    if not missing:
+        return values
+
+    pipe = redis_client.pipeline(transaction=False)
+    for key in missing:
+        pipe.get(key)
+        pipe.pttl(key)
+    replies = await pipe.execute()
+
+    found = {
+        key: _remember(key, data, pttl)
+        for key, data, pttl in zip(missing, replies[::2], replies[1::2])
+    }
+    return [value if value is not None else found[key] for key, value in zip(keys, values)]
+
+
+def movimentos_cache_key(cache_key: str) -> str:
+    """Função que monta a chave da lista de movimentos a partir da chave do processo
+    Args:
+        cache_key (str): Chave do processo na cache (tjrs:{comarca}:{npu})
+    Returns:
+        key (str): Chave da lista de movimentos (tjrs:{comarca}:{npu}:movimentos)
+    """
+    return f"{cache_key}:movimentos"
+
+
+def movimentos_meta_key(cache_key: str) -> str:
+    """Função que monta a chave da entrada de controle dos movimentos (horário da consulta e total)
+    Args:
+        cache_key (str): Chave do processo na cache (tjrs:{comarca}:{npu})
+    Returns:
+        key (str): Chave da entrada de controle (tjrs:{comarca}:{npu}:movimentos:meta)
+    """
+    return f"{movimentos_cache_key(cache_key)}:meta"
+
+
+async def set_list_cache(key: str, items: list, ttl: int | None = None):
+    """Função que grava uma lista no redis com um item codificado por elemento, para ser lida em fatias
+    Args:
+        key (str): Chave da lista
+        items (list): Itens da lista
+        ttl (int | None): Tempo de expiração em segundos
+    """
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(key)
+    if items:
+        pipe.rpush(key, *(codec.encode(item)[0] for item in items))
+        pipe.expire(key, ttl if ttl is not None else CACHE_TTL)
+    await pipe.execute()
+
+
+async def get_list_range(key: str, start: int = 0, stop: int = -1) -> list | None:
+    """Função que lê uma fatia de uma lista gravada com set_list_cache, decodificando só os itens da fatia
+    Args:
+        key (str): Chave da lista
+        start (int): Primeiro índice
+        stop (int): Último índice (inclusivo, -1 para o fim)
+    Returns:
+        items (list | None): Itens da fatia, None se a lista não existir
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.exists(key)
+    pipe.lrange(key, start, stop)
+    exists, data = await pipe.execute()
+    if not exists:
+        return None
+    return [codec.decode(item)[0] for item in data]
+
+
+def negative_cache_key(cache_key: str) -> str:
+    """Função que monta a chave da cache negativa a partir da chave do processo
+    Args:
+        cache_key (str): Chave do processo na cache (tjrs:{comarca}:{npu})
+    Returns:
+        key (str): Chave no namespace da cache negativa (tjrs:neg:{comarca}:{npu})
+    """
+    return NEGATIVE_CACHE_PREFIX + cache_key.removeprefix("tjrs:")
+
+
+async def set_negative_cache(cache_key: str, value: dict, ttl: int | None = None):
+    await set_cache(negative_cache_key(cache_key), value, ttl=ttl if ttl is not None else NEGATIVE_CACHE_TTL)
+
+
+def apply_invalidation(message: str | bytes) -> None:
+    """Função que remove do L1 a chave avisada por outra réplica
+    Args:
+        message (str | bytes): Mensagem json com a réplica de origem e a chave alterada
+    """
+    try:
+        payload = json.loads(message)
+    except Exception:
+        return
+    if payload.get("origin") != INSTANCE_ID:
+        local_cache.delete(payload.get("key"))
+
+
+async def listen_invalidations(retry_seconds: float = 5.0):
+    """Função que escuta o canal de invalidação do redis e remove do L1 as chaves
+    alteradas em outras réplicas (ex.: force_refresh). Roda até ser cancelada.
+    Args:
+        retry_seconds (float): Espera antes de reconectar após falha
+    """
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    apply_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Canal de invalidação da cache indisponível | error={e}")
+            # sem o canal podemos ter perdido avisos: descarta o L1
+            local_cache.clear()
+            await asyncio.sleep(retry_seconds)
+        finally:
+            await pubsub.aclose()
+
+
+def _encode_bigints(bigints: tuple[int, int] | list[int]) -> list[str]:
+    # BigInts passam de 2**53: guardados como texto
+    return [str(b) for b in bigints]
+
+
+def _decode_bigints(data: list) -> tuple[int, int]:
+    big0, big1 = data
+    return int(big0), int(big1)
+
+
+async def get_shared_bigints() -> tuple[int, int] | None:
+    """Função que lê os BigInts do main.js compartilhados no redis
+    Returns:
+        bigints (tuple[int, int] | None): Os dois números do calculo, None se ausentes
+    """
+    data = await redis_client.get(CREDENTIALS_PREFIX + "bigints")
+    if not data:
+        return None
+    return _decode_bigints(json.loads(data))
+
+
+async def set_shared_bigints(bigints: tuple[int, int], ttl: int | None = None):
+    ex = ttl if ttl is not None else SHARED_BIGINTS_TTL
+    await redis_client.set(CREDENTIALS_PREFIX + "bigints", json.dumps(_encode_bigints(bigints)), ex=ex)
+
+
+async def get_main_js_artifact() -> dict | None:
+    """Função que lê do redis o último main.js processado (nome do bundle, validadores HTTP e BigInts)
+    Returns:
+        artifact (dict | None): Artefato salvo, None se ausente
+    """
+    data = await redis_client.get(CREDENTIALS_PREFIX + "main_js")
+    if not data:
+        return None
+    artifact = json.loads(data)
+    return {**artifact, "bigints": _decode_bigints(artifact["bigints"])}
+
+
+async def set_main_js_artifact(artifact: dict, ttl: int | None = None):
+    ex = ttl if ttl is not None else MAIN_JS_ARTIFACT_TTL
+    stored = {**artifact, "bigints": _encode_bigints(artifact["bigints"])}
+    await redis_client.set(CREDENTIALS_PREFIX + "main_js", json.dumps(stored), ex=ex)
+
+
+def _auth_tokens_key(bigints: tuple[int, int]) -> str:
+    # tokens só valem com os BigInts usados para ofuscá-los
+    return f"{CREDENTIALS_PREFIX}auth:{bigints[0]}:{bigints[1]}"
+
+
+async def get_shared_auth_tokens(bigints: tuple[int, int], min_expires_at: float) -> list[tuple[str, float]]:
+    """Função que lê os tokens de autorização compartilhados que ainda valem até min_expires_at
+    Args:
+        bigints (tuple[int, int]): BigInts com que os tokens foram ofuscados
+        min_expires_at (float): Horario mínimo de expiração aceito
+    Returns:
+        tokens (list[tuple[str, float]]): Pares (token, horario de expiração)
+    """
+    key = _auth_tokens_key(bigints)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zremrangebyscore(key, "-inf", time.time())
+    pipe.zrangebyscore(key, min_expires_at, "+inf", withscores=True)
+    _, tokens = await pipe.execute()
+    return [(value.decode() if isinstance(value, bytes) else value, expires_at) for value, expires_at in tokens]
+
+
+async def add_shared_auth_token(bigints: tuple[int, int], value: str, expires_at: float):
+    key = _auth_tokens_key(bigints)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.zadd(key, {value: expires_at})
+    pipe.expireat(key, int(expires_at) + 1, gt=True)
+    await pipe.execute()
+
+
+async def discard_shared_auth_token(bigints: tuple[int, int], value: str):
+    await redis_client.zrem(_auth_tokens_key(bigints), value)
+
+
+def credentials_lock(name: str, timeout: float = 120, blocking_timeout: float = 60):
+    """Função que cria um lock distribuído no redis para que só um processo renove uma credencial por vez
+    Args:
+        name (str): Nome da credencial
+        timeout (float): Tempo máximo com o lock (libera sozinho se o processo morrer)
+        blocking_timeout (float): Tempo máximo esperando o lock
+    Returns:
+        lock: Lock assíncrono do redis, usado com async with
+    """
+    return redis_client.lock(f"{CREDENTIALS_PREFIX}lock:{name}", timeout=timeout, blocking_timeout=blocking_timeout)
@@ -0,0 +1,100 @@
+import math
+import time
+import logging
+from api.exceptions import TJRSCircuitOpen
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Disjuntor das chamadas ao TJRS. Após failure_threshold falhas seguidas (timeout, 5xx, HTML de
+    bloqueio ou rate limit) abre e recusa as chamadas na hora durante recovery_seconds; depois fica
+    meio aberto e deixa passar uma chamada de teste por vez: sucesso fecha, falha abre de novo.
+
+    Attributes:
+        failure_threshold (int): Falhas seguidas que abrem o disjuntor
+        recovery_seconds (float): Tempo aberto antes de testar o TJRS de novo
+        probe_timeout (float): Tempo máximo esperando o resultado da chamada de teste antes de liberar outra
+        failures (int): Falhas seguidas atuais
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30.0, probe_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = recovery_seconds
+        self.probe_timeout = probe_timeout
+        self.failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_until = 0.0
+        self._last_failure: str | None = None
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+            self._state = HALF_OPEN
+            self._probe_until = 0.0
+        return self._state
+
+    def retry_after(self) -> int:
+        """Função que calcula quantos segundos faltam para o disjuntor aceitar chamadas de novo
+        Returns:
+            seconds (int): Segundos até a próxima chamada de teste
+        """
+        now = time.monotonic()
+        if self.state == OPEN:
+            remaining = self._opened_at + self.recovery_seconds - now
+        else:
+            remaining = self._probe_until - now
+        return max(1, math.ceil(remaining))
+
+    def before_call(self) -> None:
+        """Função chamada antes de cada chamada ao TJRS
+        Raises:
+            TJRSCircuitOpen: Disjuntor aberto, ou meio aberto com chamada de teste em andamento
+        """
+        state = self.state
+        if state == CLOSED:
+            return
+
+        now = time.monotonic()
+        if state == HALF_OPEN and now >= self._probe_until:
+            self._probe_until = now + self.probe_timeout
+            return
+
+        raise TJRSCircuitOpen(
+            f"TJRS indisponível, consultas suspensas. Última falha: {self._last_failure}",
+            retry_after=self.retry_after(),
+        )
+
+    def on_success(self) -> None:
+        """Função que registra uma resposta válida do TJRS e fecha o disjuntor"""
+        if self._state != CLOSED:
+            logger.info("Circuit breaker TJRS fechado")
+        self._state = CLOSED
+        self.failures = 0
+
+    def on_failure(self, reason: str) -> None:
+        """Função que registra uma falha do TJRS, abrindo o disjuntor se necessário
+        Args:
+            reason (str): Descrição da falha
+        """
+        self.failures += 1
+        self._last_failure = reason
+        if self.state == HALF_OPEN or (self._state == CLOSED and self.failures >= self.failure_threshold):
+            logger.warning(f"Circuit breaker TJRS aberto | failures={self.failures} | last_error={reason}")
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        state = self.state
+        return {
+            "state": state,
+            "failures": self.failures,
+            "last_failure": self._last_failure,
+            "retry_after": self.retry_after() if state == OPEN else None,
+        }
@@ -0,0 +1,399 @@
+"""
+Carga em lote fora da api: lê npus de um arquivo CSV/TXT, valida, consulta pelo Crawler e SearchService
+com concorrência limitada e grava um registro por processo e um por movimento em JSONL ou Parquet.
+O progresso fica em um checkpoint para retomar a carga depois de uma queda.
+
+Uso:
+    crawlerjus-bulk npus.csv --out saida/ [--format jsonl|parquet] [--concurrency 5] [--column npu]
+"""
+import os
+import csv
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import time
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional
+from api import schema
+from api.enums import RequestPriority
+from crawler_jus.crawler import Crawler
+from crawler_jus.scheduler import UpstreamScheduler
+from crawler_jus.services.search_service import SearchService, BATCH_MAX_CONCURRENCY
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - dependência opcional
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# itens concluídos entre gravações do checkpoint (no Parquet, também o tamanho de cada arquivo)
+BULK_CHECKPOINT_EVERY = int(os.getenv("BULK_CHECKPOINT_EVERY", "500"))
+
+PROCESSO_FIELDS = [
+    "line",
+    "npu",
+    "status",
+    "numeroProcesso",
+    "classeCNJ",
+    "assuntoCNJ",
+    "nomeClasse",
+    "nomeNatureza",
+    "comarca",
+    "codigoComarca",
+    "dataDistribuicao",
+    "dataPropositura",
+    "situacaoProcesso",
+    "segredoJustica",
+    "tipoProcesso",
+    "orgaoJulgador",
+    "partes",
+    "processosVinculados",
+    "movimentos_total",
+    "error",
+]
+MOVIMENTO_FIELDS = ["npu", "seq", "data", "descricao"]
+INT_FIELDS = {"line", "movimentos_total", "seq"}
+
+
+def read_npus(path: str, column: Optional[str] = None) -> Iterator[tuple[int, str]]:
+    """Função que percorre o arquivo de entrada sem carregá-lo inteiro
+    Args:
+        path (str): Arquivo .csv (com cabeçalho) ou texto com um npu por linha
+        column (Optional[str]): Coluna do npu no CSV, por padrão "npu" ou a primeira
+    Returns:
+        npus (Iterator[tuple[int, str]]): Número do registro (a partir de 1) e npu como veio no arquivo
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            fields = reader.fieldnames or []
+            column = column or ("npu" if "npu" in fields else (fields[0] if fields else None))
+            if column not in fields:
+                raise ValueError(f"Coluna {column!r} não encontrada no CSV")
+            rows = (row.get(column) or "" for row in reader)
+        else:
+            rows = (line for line in f if not line.lstrip().startswith("#"))
+
+        line = 0
+        for raw in rows:
+            raw = raw.strip()
+            if raw:
+                line += 1
+                yield line, raw
+
+
+def validate_npu(raw: str) -> str | Exception:
+    """Função que valida o npu com as mesmas regras da api
+    Args:
+        raw (str): npu como veio no arquivo
+    Returns:
+        npu (str | Exception): npu formatado, ou o erro de validação
+    """
+    try:
+        return schema.ClienteInput(npu=raw).npu
+    except ValueError as e:
+        return e
+
+
+class Checkpoint:
+    """
+    Progresso da carga, gravado de forma atômica. watermark é o maior registro até o qual todos já
+    foram gravados; done guarda os registros concluídos acima dele (no máximo a concorrência).
+    Junto vai a posição de cada saída no momento do checkpoint: na retomada a saída volta para ela
+    e os registros concluídos depois do checkpoint são refeitos, cada registro aparece uma única vez.
+
+    Attributes:
+        path (Path): Arquivo do checkpoint
+        source (str): Arquivo de entrada a que o checkpoint se refere
+        watermark (int): Registros 1..watermark concluídos
+        done (set[int]): Registros concluídos acima do watermark
+        positions (dict[str, int]): Posição de cada saída (bytes no JSONL, arquivos no Parquet)
+    """
+
+    def __init__(self, path: Path, source: str):
+        self.path = path
+        self.source = source
+        self.watermark = 0
+        self.done: set[int] = set()
+        self.completed = 0
+        self.positions: dict[str, int] = {}
+
+    @classmethod
+    def load(cls, path: Path, source: str) -> "Checkpoint":
+        checkpoint = cls(path, source)
+        if path.exists():
+            data = json.loads(path.read_text())
+            if data["source"] != source:
+                raise ValueError(f"Checkpoint {path} é de outro arquivo de entrada: {data['source']}")
+            checkpoint.watermark = data["watermark"]
+            checkpoint.done = set(data["done"])
+            checkpoint.completed = data.get("completed", 0)
+            checkpoint.positions = data["positions"]
+        return checkpoint
+
+    def is_done(self, line: int) -> bool:
+        return line <= self.watermark or line in self.done
+
+    def mark(self, line: int) -> None:
+        self.done.add(line)
+        self.completed += 1
+        while self.watermark + 1 in self.done:
+            self.watermark += 1
+            self.done.remove(self.watermark)
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "source": self.source,
+                    "watermark": self.watermark,
+                    "done": sorted(self.done),
+                    "completed": self.completed,
+                    "positions": self.positions,
+                    "updated_at": time.time(),
+                }
+            )
+        )
+        os.replace(tmp, self.path)
+
+
+class JsonlWriter:
+    """
+    Gravação incremental em JSONL, acrescentando ao arquivo existente na retomada. O arquivo é cortado
+    antes na posição do checkpoint, descartando as linhas gravadas depois dele (inclusive uma linha
+    pela metade de uma queda no meio da escrita).
+    """
+
+    def __init__(self, path: Path, position: int = 0):
+        self.file = open(path, "ab")
+        self.file.truncate(position)
+
+    def write(self, row: dict) -> None:
+        self.file.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def flush(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def position(self) -> int:
+        """Tamanho do arquivo, já com tudo que foi escrito (chamar depois do flush)"""
+        return self.file.seek(0, os.SEEK_END)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    Gravação incremental em Parquet: as linhas ficam em memória só até o próximo checkpoint, quando viram
+    um arquivo completo (name-00001.parquet, ...). Uma queda nunca deixa um arquivo sem rodapé.
+    Campos aninhados (partes, erro) vão como texto json. Na retomada os arquivos gravados depois do
+    checkpoint são apagados.
+    """
+
+    def __init__(self, directory: Path, name: str, fields: list[str], position: int = 0):
+        self.directory = directory
+        self.name = name
+        self.schema = pyarrow.schema(
+            [(field, pyarrow.int64() if field in INT_FIELDS else pyarrow.string()) for field in fields]
+        )
+        self.rows: list[dict] = []
+        for part in sorted(directory.glob(f"{name}-*.parquet"))[position:]:
+            part.unlink()
+        self.part = position
+
+    def write(self, row: dict) -> None:
+        self.rows.append(
+            {
+                field: value if value is None or field in INT_FIELDS or isinstance(value, str)
+                else json.dumps(value, ensure_ascii=False)
+                for field, value in row.items()
+            }
+        )
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        self.part += 1
+        table = pyarrow.Table.from_pylist(self.rows, schema=self.schema)
+        path = self.directory / f"{self.name}-{self.part:05d}.parquet"
+        tmp = path.with_suffix(".tmp")
+        pyarrow.parquet.write_table(table, tmp)
+        os.replace(tmp, path)
+        self.rows = []
+
+    def position(self) -> int:
+        """Quantidade de arquivos completos gravados"""
+        return self.part
+
+    def close(self) -> None:
+        self.flush()
+
+
+def open_writers(out_dir: Path, output_format: str, positions: dict[str, int]) -> tuple:
+    """Função que abre a saída de processos e de movimentos, voltando cada uma para a posição do checkpoint
+    Args:
+        out_dir (Path): Diretório de saída
+        output_format (str): "jsonl" ou "parquet"
+        positions (dict[str, int]): Posição de cada saída no checkpoint (vazio para começar do zero)
+    Returns:
+        writers (tuple): Escritor dos processos e escritor dos movimentos
+    """
+    processos_at = positions.get("processos", 0)
+    movimentos_at = positions.get("movimentos", 0)
+    if output_format == "parquet":
+        if pyarrow is None:
+            raise RuntimeError("Saída parquet requer o pacote pyarrow (poetry install -E parquet)")
+        return (
+            ParquetWriter(out_dir, "processos", PROCESSO_FIELDS, processos_at),
+            ParquetWriter(out_dir, "movimentos", MOVIMENTO_FIELDS, movimentos_at),
+        )
+    return JsonlWriter(out_dir / "processos.jsonl", processos_at), JsonlWriter(out_dir / "movimentos.jsonl", movimentos_at)
+
+
+def processo_row(line: int, npu: str, item: dict) -> dict:
+    data = item.get("data") or {}
+    row = {field: data.get(field) for field in PROCESSO_FIELDS}
+    row.update(line=line, npu=npu, status=item["status"], error=item.get("error"))
+    return row
+
+
+def movimento_rows(npu: str, item: dict) -> Iterator[dict]:
+    for seq, movimento in enumerate((item.get("data") or {}).get("movimentos") or [], start=1):
+        yield {"npu": npu, "seq": seq, "data": movimento.get("data"), "descricao": movimento.get("descricao")}
+
+
+def bulk_scheduler(concurrency: int) -> UpstreamScheduler:
+    """Função que monta o escalonador do crawler da carga em lote, dimensionado pela concorrência pedida
+    em vez de UPSTREAM_BULK_MAX_CONCURRENCY, já que a linha de comando é o único cliente do crawler
+    Args:
+        concurrency (int): Máximo de processos consultados ao mesmo tempo
+    Returns:
+        scheduler (UpstreamScheduler): Escalonador com duas vagas por processo (dados básicos e movimentos)
+    """
+    limit = 2 * max(1, concurrency)
+    return UpstreamScheduler(max_concurrency=limit, caps={RequestPriority.BULK: limit})
+
+
+async def run_bulk(
+    input_path: str,
+    out_dir: str,
+    output_format: str = "jsonl",
+    concurrency: int = BATCH_MAX_CONCURRENCY,
+    column: Optional[str] = None,
+    force_refresh: bool = False,
+    checkpoint_every: int = BULK_CHECKPOINT_EVERY,
+    crawler: Optional[Crawler] = None,
+) -> dict:
+    """Função que executa a carga em lote, retomando do checkpoint do diretório de saída se houver
+    Args:
+        input_path (str): Arquivo .csv ou .txt com os npus
+        out_dir (str): Diretório da saída e do checkpoint
+        output_format (str): "jsonl" ou "parquet"
+        concurrency (int): Máximo de processos consultados ao mesmo tempo
+        column (Optional[str]): Coluna do npu no CSV
+        force_refresh (bool): Ignora a cache
+        checkpoint_every (int): Itens concluídos entre checkpoints
+        crawler (Optional[Crawler]): Crawler usado, por padrão um novo com bulk_scheduler (fechado ao final)
+    Returns:
+        summary (dict): Contagem de processos ok, com erro e pulados (já feitos)
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    checkpoint = Checkpoint.load(out / "checkpoint.json", os.path.abspath(input_path))
+    processos, movimentos = open_writers(out, output_format, checkpoint.positions)
+    own_crawler = crawler is None
+    if own_crawler:
+        scheduler = bulk_scheduler(concurrency)
+        crawler = Crawler(scheduler=scheduler)
+        logger.info(
+            f"Carga em lote | concorrência={concurrency} | "
+            f"consultas simultâneas ao TJRS={scheduler.caps[RequestPriority.BULK]}"
+        )
+    service = SearchService(crawler, priority=RequestPriority.BULK)
+
+    # registro e npu original de cada item entregue ao serviço, na ordem de entrega
+    pending: dict[int, tuple[int, str]] = {}
+    summary = {"ok": 0, "error": 0, "skipped": 0}
+
+    async def source() -> AsyncIterator[str | Exception]:
+        index = 0
+        for line, raw in read_npus(input_path, column):
+            if checkpoint.is_done(line):
+                summary["skipped"] += 1
+                continue
+            pending[index] = (line, raw)
+            index += 1
+            yield validate_npu(raw)
+
+    def save():
+        processos.flush()
+        movimentos.flush()
+        checkpoint.positions = {"processos": processos.position(), "movimentos": movimentos.position()}
+        checkpoint.save()
+
+    started = time.monotonic()
+    try:
+        since_checkpoint = 0
+        async for item in service.stream_npus(source(), force_refresh=force_refresh, max_concurrency=concurrency):
+            line, raw = pending.pop(item["index"])
+            npu = item.get("npu") or raw
+            processos.write(processo_row(line, npu, item))
+            for row in movimento_rows(npu, item):
+                movimentos.write(row)
+            checkpoint.mark(line)
+            summary[item["status"]] += 1
+
+            since_checkpoint += 1
+            if since_checkpoint >= checkpoint_every:
+                save()
+                since_checkpoint = 0
+                done = summary["ok"] + summary["error"]
+                logger.info(
+                    f"Carga em lote | concluídos={done} | erros={summary['error']} | "
+                    f"watermark={checkpoint.watermark} | taxa={done / (time.monotonic() - started):.1f}/s"
+                )
+        save()
+    finally:
+        processos.close()
+        movimentos.close()
+        if own_crawler:
+            await crawler.close()
+
+    return summary
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="arquivo .csv (com cabeçalho) ou .txt com um npu por linha")
+    parser.add_argument("--out", required=True, help="diretório de saída; contém o checkpoint para retomar")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    parser.add_argument("--concurrency", type=int, default=BATCH_MAX_CONCURRENCY)
+    parser.add_argument("--column", default=None, help="coluna do npu no CSV (padrão: npu ou a primeira)")
+    parser.add_argument("--force-refresh", action="store_true", help="ignora a cache")
+    parser.add_argument("--checkpoint-every", type=int, default=BULK_CHECKPOINT_EVERY)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    summary = asyncio.run(
+        run_bulk(
+            args.input,
+            args.out,
+            output_format=args.format,
+            concurrency=args.concurrency,
+            column=args.column,
+            force_refresh=args.force_refresh,
+            checkpoint_every=max(1, args.checkpoint_every),
+        )
+    )
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import json
+import zlib
+import logging
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+
+def _json_dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Função que decodifica json, com orjson quando instalado
+    Args:
+        data (str | bytes): Texto json
+    Returns:
+        value (Any): Objeto decodificado
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+SERIALIZERS: dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (_json_dumps, json_loads),
+}
+if msgpack is not None:
+    SERIALIZERS["msgpack"] = (
+        lambda value: msgpack.packb(value, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False),
+    )
+
+COMPRESSORS: dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = (
+        lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+
+DEFAULT_COMPRESSION = "zstd" if "zstd" in COMPRESSORS else "zlib"
+
+# Versão do formato gravada no primeiro byte do valor. Nenhum destes bytes inicia um
+# json válido, então entradas antigas (json puro, sem cabeçalho) continuam legíveis.
+HEADERS: dict[tuple[str, str | None], int] = {
+    ("json", None): 0x01,
+    ("json", "zlib"): 0x02,
+    ("json", "zstd"): 0x03,
+    ("msgpack", None): 0x04,
+    ("msgpack", "zlib"): 0x05,
+    ("msgpack", "zstd"): 0x06,
+}
+FORMATS = {header: fmt for fmt, header in HEADERS.items()}
+
+
+class CacheCodec:
+    """
+    Codificador dos valores gravados no redis: serializa, comprime acima de um tamanho
+    e prefixa com um byte de versão do formato.
+
+    Attributes:
+        serializer (str): "json" (orjson quando instalado) ou "msgpack"
+        compression (str | None): "zstd", "zlib" ou None
+        compress_threshold (int): Tamanho mínimo (bytes serializados) para comprimir
+    """
+
+    def __init__(self, serializer: str = "json", compression: str | None = DEFAULT_COMPRESSION, compress_threshold: int = 4096):
+        if serializer not in SERIALIZERS:
+            logger.warning(f"Serializador de cache indisponível: {serializer}, usando json")
+            serializer = "json"
+        if compression and compression not in COMPRESSORS:
+            fallback = "zlib"
+            logger.warning(f"Compressão de cache indisponível: {compression}, usando {fallback}")
+            compression = fallback
+        self.serializer = serializer
+        self.compression = compression or None
+        self.compress_threshold = compress_threshold
+
+    def encode(self, value: Any) -> tuple[bytes, int]:
+        """Função que codifica um valor para o redis
+        Args:
+            value (Any): Valor a ser gravado
+        Returns:
+            data (bytes): Cabeçalho + payload
+            size (int): Tamanho serializado sem compressão
+        """
+        dumps, _ = SERIALIZERS[self.serializer]
+        payload = dumps(value)
+        size = len(payload)
+
+        compression = None
+        if self.compression and size >= self.compress_threshold:
+            compress, _ = COMPRESSORS[self.compression]
+            payload = compress(payload)
+            compression = self.compression
+
+        header = HEADERS[(self.serializer, compression)]
+        return bytes((header,)) + payload, size
+
+    def decode(self, data: bytes | str) -> tuple[Any, int]:
+        """Função que decodifica um valor lido do redis, em qualquer versão do formato
+        Args:
+            data (bytes | str): Valor gravado
+        Returns:
+            value (Any): Valor decodificado
+            size (int): Tamanho serializado sem compressão
+        Raises:
+            ValueError: Formato desconhecido ou dependência do formato não instalada
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        fmt = FORMATS.get(data[0])
+        if fmt is None:
+            # entrada antiga: json puro gravado antes do cabeçalho existir
+            return json.loads(data), len(data)
+
+        serializer, compression = fmt
+        if serializer not in SERIALIZERS or (compression and compression not in COMPRESSORS):
+            raise ValueError(f"Formato de cache sem suporte instalado: {serializer}/{compression}")
+
+        payload = data[1:]
+        if compression:
+            _, decompress = COMPRESSORS[compression]
+            payload = decompress(payload)
+
+        _, loads = SERIALIZERS[serializer]
+        return loads(payload), len(payload)
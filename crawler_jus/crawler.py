@@ -1,30 +1,82 @@
-import asyncio
+import os
 import time
+import asyncio
 import logging
 import base64
 import hashlib
 import json
 import httpx
-from crawler_jus.util import find_obfuscate_and_extract_big_int
+from crawler_jus.util import find_obfuscate_and_extract_big_int, close_http_client, TJRS_SERVICE_URL
+from crawler_jus.solver import ENGINES, ParallelSolver
+from crawler_jus.auth_pool import AuthPool
+from crawler_jus.rate_limit import AdaptiveRateLimiter, RedisTokenBucket
+from crawler_jus.circuit_breaker import CircuitBreaker
+from crawler_jus.scheduler import UpstreamScheduler
+from crawler_jus.codec import json_loads
+from crawler_jus.tracing import span
+from crawler_jus.metrics import (
+    UPSTREAM_LATENCY,
+    UPSTREAM_IN_FLIGHT,
+    REQUEST_PAGE_FAILURES,
+    SOLVE_CHALLENGE_SECONDS,
+    SOLVE_CHALLENGE_ITERATIONS,
+    AUTH_REFRESHES,
+)
+from api.enums import RequestPriority
+from crawler_jus.cache import (
+    get_shared_bigints,
+    set_shared_bigints,
+    get_shared_auth_tokens,
+    add_shared_auth_token,
+    discard_shared_auth_token,
+    credentials_lock,
+)
+from redis.exceptions import RedisError
 from tenacity import (
     retry,
     wait_fixed,
     stop_after_attempt,
 )
 from curl_cffi.requests import AsyncSession
-from typing import Optional, Tuple
+from curl_cffi.requests.exceptions import Timeout as CurlTimeout, ConnectionError as CurlConnectionError
+from typing import Any, Optional, Tuple
 import random
 from api.exceptions import (
     TJRSRateLimit,
     TJRSUnauthorized,
     TJRSUpstreamError,
     TJRSNetworkError,
+    TJRSClientError,
+    TJRSCircuitOpen,
 )
 import re
 
 
 logger = logging.getLogger()
 
+CHALLENGE_SOLVER = os.getenv("CHALLENGE_SOLVER", "serial")
+CHALLENGE_SOLVER_WORKERS = int(os.getenv("CHALLENGE_SOLVER_WORKERS", "0")) or None
+CHALLENGE_SOLVER_CHUNK_SIZE = int(os.getenv("CHALLENGE_SOLVER_CHUNK_SIZE", "50000"))
+CHALLENGE_SOLVER_ENGINE = os.getenv("CHALLENGE_SOLVER_ENGINE", "fast")
+AUTH_POOL_SIZE = int(os.getenv("AUTH_POOL_SIZE", "1"))
+AUTH_REFRESH_LEAD_SECONDS = float(os.getenv("AUTH_REFRESH_LEAD_SECONDS", "30"))
+AUTH_COOLDOWN_SECONDS = float(os.getenv("AUTH_COOLDOWN_SECONDS", "30"))
+SHARED_CREDENTIALS = os.getenv("SHARED_CREDENTIALS", "1") == "1"
+TJRS_RATE_INITIAL = float(os.getenv("TJRS_RATE_INITIAL", "5"))
+TJRS_RATE_MIN = float(os.getenv("TJRS_RATE_MIN", "0.2"))
+TJRS_RATE_MAX = float(os.getenv("TJRS_RATE_MAX", "50"))
+# orçamentos da frota inteira (todas as réplicas), em req/s e rajada
+DISTRIBUTED_RATE_LIMIT = os.getenv("DISTRIBUTED_RATE_LIMIT", "1") == "1"
+TJRS_AUTH_RATE = float(os.getenv("TJRS_AUTH_RATE", "1"))
+TJRS_AUTH_BURST = int(os.getenv("TJRS_AUTH_BURST", "3"))
+TJRS_CONSULTA_RATE = float(os.getenv("TJRS_CONSULTA_RATE", "10"))
+TJRS_CONSULTA_BURST = int(os.getenv("TJRS_CONSULTA_BURST", "20"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RECOVERY_SECONDS = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "8"))
+UPSTREAM_REFRESH_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_REFRESH_MAX_CONCURRENCY", "4"))
+UPSTREAM_BULK_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_BULK_MAX_CONCURRENCY", "4"))
+
 
 class Crawler:
     """
@@ -36,13 +88,37 @@ class Crawler:
         client: Cliente async que faz as requisiçoes
         url_token_request: Url de requisição do token challenge de acesso
         url_token_submit: Url de subimissão do token challenge de acesso
-        _auth_value: Valor do challenge resolvido em cache
-        _auth_expires_at: Horario em que a chave challenge em cache expira
-        _auth_lock: Trava async de codigo critico
         _auth_ttl_seconds: Tempo medio que a chave challenge deve durar
+        auth_pool: Pool de chaves challenge resolvidas, renovadas em segundo plano e usadas em rodízio
+        shared_credentials: Se BigInts e chaves challenge são compartilhados via redis entre workers e réplicas
+        rate_limiter: Limitador adaptativo (AIMD) por onde passam todas as chamadas ao TJRS
+        distributed_limiters: Token buckets no redis, por tipo de endpoint ("auth", "consulta"), compartilhados pela frota
+        circuit_breaker: Disjuntor que recusa as consultas na hora enquanto o TJRS está falhando
+        scheduler: Escalonador que divide as consultas simultâneas entre as classes de prioridade
+        solver: Modo de resolução do challenge, "serial" (thread) ou "parallel" (pool de processos)
+        solver_engine: Implementação do hash de cada tentativa, "fast" (estado sha256 do salt reaproveitado) ou "hashlib"
+        _parallel_solver: Pool de processos usado no modo "parallel"
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        solver: str = CHALLENGE_SOLVER,
+        solver_workers: Optional[int] = CHALLENGE_SOLVER_WORKERS,
+        solver_chunk_size: int = CHALLENGE_SOLVER_CHUNK_SIZE,
+        solver_engine: str = CHALLENGE_SOLVER_ENGINE,
+        auth_pool_size: int = AUTH_POOL_SIZE,
+        auth_refresh_lead_seconds: float = AUTH_REFRESH_LEAD_SECONDS,
+        auth_cooldown_seconds: float = AUTH_COOLDOWN_SECONDS,
+        shared_credentials: bool = SHARED_CREDENTIALS,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        distributed_rate_limit: bool = DISTRIBUTED_RATE_LIMIT,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        scheduler: Optional[UpstreamScheduler] = None,
+    ):
+        if solver not in ("serial", "parallel"):
+            raise ValueError(f"Modo de solver inválido: {solver}")
+        if solver_engine not in ENGINES:
+            raise ValueError(f"Engine de solver inválida: {solver_engine}")
         self.headers_consulta = {
             "Accept": "application/json, text/plain, */*",
             "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
@@ -54,54 +130,154 @@ class Crawler:
             timeout=30,
             verify=True,
         )
-        self.url_token_request = "https://consulta-processual-service.tjrs.jus.br/api/consulta-service/public/auth/token"
-        self.url_token_submit = "https://consulta-processual-service.tjrs.jus.br/api/consulta-service/public/auth/submit"
+        self.url_token_request = f"{TJRS_SERVICE_URL}/public/auth/token"
+        self.url_token_submit = f"{TJRS_SERVICE_URL}/public/auth/submit"
         self._bigints: Optional[Tuple[int, int]] = None
         self._bigints_lock = asyncio.Lock()
-        self._auth_value: Optional[str] = None
-        self._auth_expires_at: float = 0.0
-        self._auth_lock = asyncio.Lock()
         self._auth_ttl_seconds = 300
+        self._credentials_lock = asyncio.Lock()
+        self.shared_credentials = shared_credentials
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(
+            rate=TJRS_RATE_INITIAL, min_rate=TJRS_RATE_MIN, max_rate=TJRS_RATE_MAX
+        )
+        self.distributed_limiters = (
+            {
+                "auth": RedisTokenBucket("auth", TJRS_AUTH_RATE, TJRS_AUTH_BURST),
+                "consulta": RedisTokenBucket("consulta", TJRS_CONSULTA_RATE, TJRS_CONSULTA_BURST),
+            }
+            if distributed_rate_limit
+            else {}
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=CIRCUIT_FAILURE_THRESHOLD, recovery_seconds=CIRCUIT_RECOVERY_SECONDS
+        )
+        self.scheduler = scheduler or UpstreamScheduler(
+            max_concurrency=UPSTREAM_MAX_CONCURRENCY,
+            caps={
+                RequestPriority.REFRESH: UPSTREAM_REFRESH_MAX_CONCURRENCY,
+                RequestPriority.BULK: UPSTREAM_BULK_MAX_CONCURRENCY,
+            },
+        )
+        self.auth_pool = AuthPool(
+            self.acquire_authorization,
+            size=auth_pool_size,
+            ttl_seconds=self._auth_ttl_seconds,
+            refresh_lead_seconds=auth_refresh_lead_seconds,
+            cooldown_seconds=auth_cooldown_seconds,
+        )
+        self.solver = solver
+        self.solver_engine = solver_engine
+        self._parallel_solver = (
+            ParallelSolver(workers=solver_workers, chunk_size=solver_chunk_size, engine=solver_engine)
+            if solver == "parallel"
+            else None
+        )
 
     async def close(self):
-        """Função que fecha o cliente de requisiçoes web"""
+        """Função que fecha os clientes de requisiçoes web, o pool de autorização e o pool do solver"""
+        await self.auth_pool.close()
         await self.client.close()
+        await close_http_client()
+        if self._parallel_solver is not None:
+            self._parallel_solver.close()
+
+    async def upstream_request(self, method: str, url: str, endpoint: str = "consulta", **kwargs):
+        """Função por onde passam todas as chamadas ao TJRS, aguardando a vez no orçamento da frota
+        (redis) e no limitador de taxa local
+        Args:
+            method (str): "GET" ou "POST"
+            url (str): url da requisição
+            endpoint (str): Orçamento usado, "auth" ou "consulta"
+        Returns:
+            resp: Resposta do cliente de requisiçoes web
+        """
+        with span("rate_limit"):
+            bucket = self.distributed_limiters.get(endpoint)
+            if bucket is not None:
+                await bucket.acquire()
+            await self.rate_limiter.acquire()
+        send = self.client.post if method == "POST" else self.client.get
+        with span("upstream", endpoint=endpoint), UPSTREAM_IN_FLIGHT.track_inprogress(), UPSTREAM_LATENCY.labels(endpoint).time():
+            return await send(url, **kwargs)
 
     async def get_big_ints(self, force_refresh: bool = False) -> tuple[int, int]:
         """
         Retorna os 2 inteiros usados no BigInt(numérico) do main.js.
-        Cacheia o resultado e só recalcula se force_refresh=True ou cache vazio.
+        Cacheia o resultado (em memória e, com shared_credentials, no redis para os demais processos)
+        e só recalcula se force_refresh=True ou cache vazio.
         """
         if not force_refresh and self._bigints is not None:
             return self._bigints
 
+        # valor que levou ao force_refresh: não pode ser reaproveitado do redis
+        stale = self._bigints if force_refresh else None
+
         async with self._bigints_lock:
             if not force_refresh and self._bigints is not None:
                 return self._bigints
 
+            if self.shared_credentials:
+                self._bigints = await self.get_shared_big_ints(stale)
+            else:
+                self._bigints = await self.extract_big_ints()
+            return self._bigints
+
+    async def extract_big_ints(self) -> tuple[int, int]:
+        """Função que extrai do main.js os 2 inteiros usados no BigInt
+        Returns:
+            bigints (tuple[int, int]): Os dois números do calculo
+        Raises:
+            TJRSUpstreamError: Falha ao extrair BigInt do main.js
+        """
+        with span("main_js"):
             bigints = await find_obfuscate_and_extract_big_int()
 
-            if not isinstance(bigints, (list, tuple)) or len(bigints) < 2:
-                raise TJRSUpstreamError("Falha ao extrair BigInt do main.js")
+        if not isinstance(bigints, (list, tuple)) or len(bigints) < 2:
+            raise TJRSUpstreamError("Falha ao extrair BigInt do main.js")
 
-            self._bigints = (int(bigints[0]), int(bigints[1]))
-            return self._bigints
+        return (int(bigints[0]), int(bigints[1]))
 
-    def is_rate_limited(self, text: str) -> tuple[bool, str]:
-        """Função que testa se erro 429 esta no texto enviado
+    async def get_shared_big_ints(self, stale: Optional[Tuple[int, int]] = None) -> tuple[int, int]:
+        """Função que obtém os BigInts do redis ou, sob lock distribuído, extrai do main.js e publica para os demais processos
+        Args:
+            stale (Optional[Tuple[int, int]]): BigInts recusados pelo TJRS, que não devem ser reaproveitados
+        Returns:
+            bigints (tuple[int, int]): Os dois números do calculo
+        """
+        extracted = None
+        try:
+            shared = await get_shared_bigints()
+            if shared and shared != stale:
+                return shared
+
+            async with credentials_lock("bigints"):
+                # outro processo pode ter renovado enquanto esperávamos o lock
+                shared = await get_shared_bigints()
+                if shared and shared != stale:
+                    return shared
+
+                extracted = await self.extract_big_ints()
+                await set_shared_bigints(extracted)
+                return extracted
+        except RedisError as e:
+            if extracted is not None:
+                return extracted
+            logger.warning(f"Redis indisponível para BigInts compartilhados | error={e}")
+            return await self.extract_big_ints()
+
+    def is_rate_limited(self, payload: Any) -> tuple[bool, str]:
+        """Função que testa se erro 429 esta na resposta já decodificada
         Args:
-            text (str): texto do json de reposta de consulta no site
+            payload (Any): json de reposta de consulta no site já decodificado (None se não era json)
         Returns:
             bool (bool): bool de retorno que indica se encontrou ou nao 429 no texto
             message (str) : mensagem do encontrada junto ao erro 429
         """
-        try:
-            text_json = json.loads(text)
-        except Exception:
+        if not isinstance(payload, dict):
             return False, ""
 
-        if text_json.get("exceptionKey") == 429:
-            message = (text_json.get("messages") or [""])[0]
+        if payload.get("exceptionKey") == 429:
+            message = (payload.get("messages") or [""])[0]
             return True, message
 
         return False, ""
@@ -113,29 +289,109 @@ class Crawler:
         """
         exp = min(cap, base * (2 ** attempt))
         wait = random.uniform(0, exp)
-        await asyncio.sleep(wait)
+        with span("backoff"):
+            await asyncio.sleep(wait)
 
-    async def get_auth(self, force_refresh: bool = False) -> str:
+    @property
+    def credentials_generation(self) -> int:
+        """Geração das credenciais (BigInts + chaves): cada renovação após 401/403 incrementa"""
+        return self.auth_pool.generation
+
+    async def get_auth(self, force_refresh: bool = False) -> tuple[str, int]:
         """Função que controla o token challenge em cache
         Args:
             force_refresh (bool): bool que determina se o token challenge vai ser atualizado forçadamente
         Returns:
             auth (str): Token challenge resolvido
+            generation (int): Geração das credenciais em que o token começou a ser resolvido
         """
-        now = time.time()
+        token = await self.auth_pool.get_token(force_refresh=force_refresh)
+        return token.value, token.generation
 
-        if not force_refresh and self._auth_value and now < self._auth_expires_at:
-            return self._auth_value
+    async def acquire_authorization(self) -> str | tuple[str, float]:
+        """Função que obtém uma chave challenge para o pool: reaproveita uma chave válida compartilhada no redis
+        ou, sob lock distribuído, resolve um novo challenge e publica para os demais processos
+        Returns:
+            authorization (str | tuple[str, float]): Token pronto, com o horario de expiração quando conhecido
+        """
+        if not self.shared_credentials:
+            return await self.create_authorization()
 
-        async with self._auth_lock:
-            now = time.time()
-            if not force_refresh and self._auth_value and now < self._auth_expires_at:
-                return self._auth_value
+        created = None
+        try:
+            bigints = await self.get_big_ints()
+            shared = await self.pick_shared_authorization(bigints)
+            if shared is not None:
+                AUTH_REFRESHES.labels("shared").inc()
+                return shared
+
+            async with credentials_lock("auth"):
+                shared = await self.pick_shared_authorization(bigints)
+                if shared is not None:
+                    AUTH_REFRESHES.labels("shared").inc()
+                    return shared
+
+                expires_at = time.time() + self._auth_ttl_seconds
+                created = (await self.create_authorization(), expires_at)
+                await add_shared_auth_token(bigints, *created)
+                return created
+        except RedisError as e:
+            if created is not None:
+                return created
+            logger.warning(f"Redis indisponível para chaves challenge compartilhadas | error={e}")
+            return await self.create_authorization()
+
+    async def pick_shared_authorization(self, bigints: tuple[int, int]) -> Optional[tuple[str, float]]:
+        """Função que escolhe no redis a chave challenge compartilhada de maior validade que ainda não está no pool
+        Args:
+            bigints (tuple[int, int]): BigInts com que a chave deve ter sido ofuscada
+        Returns:
+            authorization (Optional[tuple[str, float]]): Token e horario de expiração, None se não houver
+        """
+        # margem para o pool não renovar a chave logo após recebê-la
+        min_expires_at = time.time() + 2 * self.auth_pool.refresh_lead_seconds
+        held = self.auth_pool.held()
+        tokens = await get_shared_auth_tokens(bigints, min_expires_at)
+        candidates = [(value, expires_at) for value, expires_at in tokens if value not in held]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda token: token[1])
+
+    async def invalidate_credentials(self, auth: str):
+        """Função que descarta a chave challenge recusada pelo TJRS, localmente e no redis
+        Args:
+            auth (str): Chave challenge recusada
+        """
+        # segredo do main.js pode ter mudado: nenhum token do pool serve mais
+        AUTH_REFRESHES.labels("invalidated").inc()
+        self.auth_pool.invalidate()
+        if self.shared_credentials and self._bigints is not None:
+            try:
+                await discard_shared_auth_token(self._bigints, auth)
+            except RedisError:
+                pass
+
+    async def refresh_credentials(self, auth: str, generation: int) -> tuple[str, int]:
+        """Função que renova as credenciais recusadas pelo TJRS uma única vez por geração: só quem falhou
+        com a geração atual descarta a chave e refaz BigInts e challenge; os demais aguardam e reaproveitam
+        as credenciais novas
+        Args:
+            auth (str): Chave challenge recusada
+            generation (int): Geração das credenciais com que a chave foi obtida
+        Returns:
+            auth (str): Chave challenge da geração atual
+            generation (int): Geração atual
+        """
+        async with self._credentials_lock:
+            if generation == self.credentials_generation:
+                await self.invalidate_credentials(auth)
+                await self.get_big_ints(force_refresh=True)
+                auth, _ = await self.get_auth(force_refresh=True)
+                # só com BigInts e chave novos no lugar a geração avança: chaves resolvidas durante a
+                # renovação ficam com a geração antiga e seus 401 não disparam outra renovação
+                return auth, self.auth_pool.advance(auth)
 
-            auth = await self.create_authorization()
-            self._auth_value = auth
-            self._auth_expires_at = now + self._auth_ttl_seconds
-            return auth
+        return await self.get_auth()
 
     async def obfuscate(self, auth: str) -> str:
         """Função que calcula o segredo que vai junto ao token challenge com base no mesmo para acesso ao site
@@ -169,18 +425,38 @@ class Crawler:
         Returns:
             i (int): Número resultado do challenge
         """
-    
-        for i in range(maxnumber + 1):
-            attempt = (salt + str(i)).encode('utf-8')
-            result = hashlib.sha256(attempt).hexdigest()
-            if result == challenge:
-
-                return i
+        result = ENGINES[self.solver_engine](salt, challenge, 0, maxnumber + 1)
+        if result is not None:
+            return result
 
         raise TJRSUpstreamError(
         f"Não foi possível resolver o challenge (maxnumber={maxnumber})"
         )
 
+    async def run_solver(self, salt: str, challenge: str, maxnumber: int) -> int:
+        """Função que resolve o challenge no modo configurado sem travar o event loop
+        Args:
+            salt (int): Parte do calculo do desafio
+            challenge(int): Número a ser encontrado
+            maxnumber(int): Número maximo que challenge pode ter
+        Returns:
+            i (int): Número resultado do challenge
+        """
+        start = time.perf_counter()
+        with span("solve_challenge"):
+            if self._parallel_solver is None:
+                result = await asyncio.to_thread(self.solve_challenge, salt, challenge, maxnumber)
+            else:
+                result = await self._parallel_solver.solve(salt, challenge, maxnumber)
+        if result is None:
+            raise TJRSUpstreamError(
+                f"Não foi possível resolver o challenge (maxnumber={maxnumber})"
+            )
+        SOLVE_CHALLENGE_SECONDS.observe(time.perf_counter() - start)
+        # busca do 0 até o resultado: result + 1 hashes testados
+        SOLVE_CHALLENGE_ITERATIONS.observe(result + 1)
+        return result
+
     @retry(wait=wait_fixed(1), stop=stop_after_attempt(5), reraise=True)
     async def create_authorization(self) -> str:
         """Função que controla todo o processo de criação da token challenge fazendo desde a requisição do desafio, a requisição de
@@ -191,14 +467,15 @@ class Crawler:
         Raises:
         RuntimeError: Erro de requisição do challenge
         """
-        challenge_token = await self.client.get(self.url_token_request)
+        challenge_token = await self.upstream_request("GET", self.url_token_request, endpoint="auth")
+        if challenge_token.status_code == 429:
+            self.rate_limiter.on_rate_limited()
         if challenge_token.status_code != 200:
             raise RuntimeError(
                 f"Challenge request failed: {challenge_token.status_code}"
             )
         challenge_data = json.loads(challenge_token.text)
-        challenge_result = await asyncio.to_thread(
-            self.solve_challenge,
+        challenge_result = await self.run_solver(
             challenge_data["salt"],
             challenge_data["challenge"],
             challenge_data["maxnumber"],
@@ -213,26 +490,42 @@ class Crawler:
         json_str = json.dumps(payload, separators=(",", ":"))
         token_base64 = base64.b64encode(json_str.encode()).decode()
         form_data = {"altcha": token_base64}
-        authorization_response = await self.client.post(
-            self.url_token_submit, data=form_data
+        authorization_response = await self.upstream_request(
+            "POST", self.url_token_submit, endpoint="auth", data=form_data
         )
         authorization_json = json.loads(authorization_response.text)
         authorization_obfuscated = await self.obfuscate(authorization_json["username"])
         authorization = f"Basic {authorization_obfuscated}"
-        
+        AUTH_REFRESHES.labels("solved").inc()
 
         return authorization
 
-    async def request_page(self, url: str) -> str:
+    async def request_page(self, url: str, priority: RequestPriority = RequestPriority.INTERACTIVE) -> Any:
+        """Função que aguarda a vez da consulta no escalonador, conforme a classe de prioridade, e busca a pagina
+        Args:
+            url (str): url da requisição
+            priority (RequestPriority): Classe da consulta ("interactive", "refresh" ou "bulk")
+        Returns:
+            payload (Any): json retornado pelo site com as informações buscadas, já decodificado
+        """
+        with span("queue", priority=priority.value):
+            await self.scheduler.acquire(priority)
+        try:
+            return await self.fetch_page(url)
+        finally:
+            self.scheduler.release(priority)
+
+    async def fetch_page(self, url: str) -> Any:
         """Função que executa as requisições das paginas de dados e movimentos com o challenge em cache,
         caso acesso nao seja autorizado pede para recriar o token de autorização
         Args:
             url (str): url da requisição
         Returns:
-            resp (json): Retorna json que é retornado pelo site com as informações buscadas
+            payload (Any): json retornado pelo site com as informações buscadas, decodificado uma única vez
         Raises:
             TJRSRateLimit: Erro de rate limit persistente
             TJRSUnauthorized : Authorization inválido mesmo após refresh
+            TJRSCircuitOpen: TJRS falhando seguidamente, consulta recusada sem chamar o tribunal
             TimeoutException: Timeout na requisição ao site
             TJRSNetworkError: timeout/erro de rede para TJRS
             TJRSUpstreamError: TJRS respondeu, mas veio quebrado (HTML, JSON inválido, 5xx persistente etc.)
@@ -246,32 +539,40 @@ class Crawler:
         resp = None 
         for attempt in range(max_attempts):
             try:
-                auth = await self.get_auth()
+                self.circuit_breaker.before_call()
+            except TJRSCircuitOpen:
+                REQUEST_PAGE_FAILURES.labels("circuit_open").inc()
+                raise
+            try:
+                with span("auth"):
+                    auth, generation = await self.get_auth()
                 headers = {**self.headers_consulta, "Authorization": auth}
 
-                resp = await self.client.get(url, headers=headers, timeout=timeout)
+                with span("attempt", n=attempt + 1):
+                    resp = await self.upstream_request("GET", url, headers=headers, timeout=timeout)
                 text = resp.text or ""
 
-                # 401/403 -> refresh e tenta de novo
+                # 401/403 -> refresh (um por geração) e tenta de novo
                 if resp.status_code in (401, 403):
-                    self._auth_value = None
-                    self._auth_expires_at = 0
-
-                    self._bigints = None  # invalida cache
-                    await self.get_big_ints(force_refresh=True)
-
-                    auth = await self.get_auth(force_refresh=True)
+                    with span("auth", refresh=True):
+                        auth, generation = await self.refresh_credentials(auth, generation)
                     headers["Authorization"] = auth
-                    resp = await self.client.get(url, headers=headers, timeout=timeout)
+                    with span("attempt", n=attempt + 1, retry="auth"):
+                        resp = await self.upstream_request("GET", url, headers=headers, timeout=timeout)
                     text = resp.text or ""
 
                     if resp.status_code in (401, 403):
+                        REQUEST_PAGE_FAILURES.labels("unauthorized").inc()
                         raise TJRSUnauthorized("Authorization inválido mesmo após refresh, tente novamente mais tarde.")
 
                 #  rate limit por status
                 if resp.status_code == 429:
+                    self.rate_limiter.on_rate_limited()
+                    self.auth_pool.cooldown(auth)
                     rate_limit_hits += 1
                     last_error = "HTTP 429 Too Many Requests"
+                    REQUEST_PAGE_FAILURES.labels("http_429").inc()
+                    self.circuit_breaker.on_failure(last_error)
                     await self.sleep_backoff(attempt, base=2, cap=60)
                     continue
 
@@ -279,44 +580,66 @@ class Crawler:
                 ctype = (resp.headers.get("Content-Type") or "").lower()
                 if "text/html" in ctype or text.lstrip().startswith("<"):
                     last_error = "TJRS retornou HTML (não JSON)"
+                    REQUEST_PAGE_FAILURES.labels("html").inc()
+                    self.circuit_breaker.on_failure(last_error)
                     await self.sleep_backoff(attempt, base=2, cap=10)
                     continue
 
+                # corpo decodificado uma única vez; None se não for json
+                try:
+                    payload = json_loads(text)
+                except ValueError:
+                    payload = None
+
                 # rate limit por payload
-                is429, msg = self.is_rate_limited(text)
+                is429, msg = self.is_rate_limited(payload)
                 if is429:
+                    self.rate_limiter.on_rate_limited()
+                    self.auth_pool.cooldown(auth)
                     rate_limit_hits += 1
                     last_error = f"Rate limit: {msg}"
+                    REQUEST_PAGE_FAILURES.labels("payload_429").inc()
+                    self.circuit_breaker.on_failure(last_error)
                     await self.sleep_backoff(attempt, base=2, cap=60)
                     continue
 
                 # 5xx
                 if resp.status_code >= 500:
                     last_error = f"TJRS 5xx ({resp.status_code})"
+                    REQUEST_PAGE_FAILURES.labels("5xx").inc()
+                    self.circuit_breaker.on_failure(last_error)
                     await self.sleep_backoff(attempt, base=2, cap=10)
                     continue
 
                 # 4xx (fora 401/403/429)
                 if 400 <= resp.status_code < 500 and resp.status_code not in (401, 403, 429):
-                        raise TJRSUpstreamError(
-                            message=f"TJRS retornou erro {resp.status_code}"
+                        # o TJRS está respondendo: erro do processo, não do tribunal
+                        self.circuit_breaker.on_success()
+                        REQUEST_PAGE_FAILURES.labels("4xx").inc()
+                        raise TJRSClientError(
+                            message=f"TJRS retornou erro {resp.status_code}",
+                            upstream_status=resp.status_code,
                         )
 
                 # resposta vazia
                 if not text.strip():
                     last_error = "Resposta vazia"
+                    REQUEST_PAGE_FAILURES.labels("empty").inc()
+                    self.circuit_breaker.on_failure(last_error)
                     await self.sleep_backoff(attempt, base=2, cap=10)
                     continue
 
                 # JSON inválido/parcial
-                try:
-                    json.loads(text)
-                except Exception:
+                if payload is None:
                     last_error = "JSON inválido/parcial"
+                    REQUEST_PAGE_FAILURES.labels("invalid_json").inc()
+                    self.circuit_breaker.on_failure(last_error)
                     await self.sleep_backoff(attempt, base=2, cap=10)
                     continue
 
-                return text
+                self.rate_limiter.on_success()
+                self.circuit_breaker.on_success()
+                return payload
 
             except TJRSUnauthorized:
                 logger.warning(f"Não autorizado no TJRS | url={url} | attempt={attempt+1}")
@@ -325,13 +648,25 @@ class Crawler:
                 status = getattr(resp, "status_code", None)
                 logger.warning(f"Upstream 4xx TJRS | status={status} | detail={e}")
                 raise
-            except httpx.TimeoutException:
+            except (httpx.TimeoutException, CurlTimeout):
                 timeout_hits += 1
                 last_error = "Timeout consultando TJRS"
+                REQUEST_PAGE_FAILURES.labels("timeout").inc()
+                self.circuit_breaker.on_failure(last_error)
+                await self.sleep_backoff(attempt, base=2, cap=5)
+                continue
+            except CurlConnectionError as e:
+                # TJRS fora do ar/inalcançável: conta como timeout e abre o disjuntor
+                timeout_hits += 1
+                last_error = f"Erro de rede consultando TJRS: {e}"
+                REQUEST_PAGE_FAILURES.labels("network").inc()
+                self.circuit_breaker.on_failure(last_error)
                 await self.sleep_backoff(attempt, base=2, cap=5)
                 continue
             except Exception as e:
                 last_error = f"Exceção inesperada: {type(e).__name__}: {e}"
+                REQUEST_PAGE_FAILURES.labels("exception").inc()
+                self.circuit_breaker.on_failure(last_error)
                 await self.sleep_backoff(attempt, base=2, cap=5)
                 continue
 
@@ -348,14 +683,14 @@ class Crawler:
 )
 
 
-    def extract_basic_data_partes(self, basic_data_json: str) -> dict:
+    def extract_basic_data_partes(self, basic_data_json: dict | str) -> dict:
         """Função que extrai dados basicos e partes do processo.
         Args:
-            basic_data_json (json): Json com dados que vem do site
+            basic_data_json (dict | str): Json com dados que vem do site, já decodificado ou em texto
         Returns:
             data (dict): Dicionario com dados de interesse
         """
-        data_dict = json.loads(basic_data_json)
+        data_dict = json_loads(basic_data_json) if isinstance(basic_data_json, (str, bytes)) else basic_data_json
         basic = (data_dict.get("data") or [{}])[0]
         partes = basic.get("partes", {}).get("parte", [])
         partes_list = [
@@ -403,14 +738,14 @@ class Crawler:
         data["processosVinculados"] = processos_vinculados
         return data
 
-    def extract_movimentos(self, movimentos_json: str) -> list[dict[str]]:
+    def extract_movimentos(self, movimentos_json: dict | str) -> list[dict[str]]:
         """Função que extrai dados movimentos do processo.
         Args:
-            movimentos_json (json): Json com movimentos que vem do site
+            movimentos_json (dict | str): Json com movimentos que vem do site, já decodificado ou em texto
         Returns:
             movimentos_list (list): Lista de dicionarios contendo data e descrição dos movimentos
         """
-        mov_dict = json.loads(movimentos_json)
+        mov_dict = json_loads(movimentos_json) if isinstance(movimentos_json, (str, bytes)) else movimentos_json
         movimentos = mov_dict.get("data") or []
 
         movimentos_list = [
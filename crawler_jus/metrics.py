@@ -0,0 +1,61 @@
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+SEARCH_LATENCY = Histogram(
+    "tjrs_search_npu_seconds",
+    "Latência ponta a ponta das rotas de busca",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_LATENCY = Histogram(
+    "tjrs_upstream_request_seconds",
+    "Latência de cada chamada HTTP ao TJRS (uma por tentativa do request_page)",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_IN_FLIGHT = Gauge("tjrs_upstream_in_flight", "Chamadas HTTP ao TJRS em andamento")
+REQUEST_PAGE_FAILURES = Counter(
+    "tjrs_request_page_failures_total",
+    "Falhas do request_page por tipo (429, html, 5xx, timeout, ...)",
+    ["reason"],
+)
+SOLVE_CHALLENGE_SECONDS = Histogram(
+    "tjrs_solve_challenge_seconds",
+    "Tempo para resolver o challenge altcha",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+SOLVE_CHALLENGE_ITERATIONS = Histogram(
+    "tjrs_solve_challenge_iterations",
+    "Quantidade de hashes testados até resolver o challenge",
+    buckets=(1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000),
+)
+AUTH_REFRESHES = Counter(
+    "tjrs_auth_refreshes_total",
+    "Obtenções de chave de autorização por origem (solved, shared) e invalidações",
+    ["source"],
+)
+MAIN_JS_FETCHES = Counter(
+    "tjrs_main_js_fetches_total",
+    "Atualizações dos BigInts do main.js por resultado (page_not_modified, bundle_unchanged, downloaded)",
+    ["result"],
+)
+CACHE_REQUESTS = Counter(
+    "tjrs_cache_requests_total",
+    "Consultas à cache por camada (l1, redis) e resultado (hit, miss)",
+    ["layer", "result"],
+)
+CACHE_RESOURCES = Counter(
+    "tjrs_cache_resources_total",
+    "Situação de cada recurso do processo ao ser servido (hit, stale, miss)",
+    ["resource", "status"],
+)
+
+
+def render() -> tuple[bytes, str]:
+    """Função que gera o texto das métricas no formato do Prometheus
+    Returns:
+        body (bytes): Métricas
+        content_type (str): Content-Type da resposta
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
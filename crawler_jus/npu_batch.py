@@ -0,0 +1,136 @@
+import logging
+from typing import Sequence
+from crawler_jus.util import normalize_npu_to_20_digits
+from api.schema import calc_digito_verificador, format_cnj
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência opcional
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# entradas maiores que isso não cabem na matriz de bytes e vão pelo caminho escalar
+MAX_VECTOR_WIDTH = 64
+# dígitos somados por vez no mod 97: resto (< 97) * 10**9 + bloco cabe em int64
+MOD_CHUNK_DIGITS = 9
+# posições dos separadores em NNNNNNN-DD.AAAA.J.TR.OOOO
+CNJ_SEPARATORS = {7: ord("-"), 10: ord("."), 15: ord("."), 17: ord("."), 20: ord(".")}
+CNJ_DIGIT_COLUMNS = [i for i in range(25) if i not in CNJ_SEPARATORS]
+
+
+def validate_npu_scalar(npu) -> tuple[str | None, bool]:
+    """Função que valida um npu com as funções de normalização e dígito verificador
+    Args:
+        npu: npu como veio na entrada
+    Returns:
+        normalized (str | None): npu no formato CNJ, None se não normalizável
+        invalid (bool): True se o npu não for válido
+    """
+    try:
+        digits20 = normalize_npu_to_20_digits(npu)
+    except ValueError:
+        return None, True
+    return format_cnj(digits20), calc_digito_verificador(digits20) != digits20[7:9]
+
+
+def mod97(digits: "np.ndarray") -> "np.ndarray":
+    """Função que calcula o resto por 97 de cada linha de uma matriz de dígitos, em blocos de 9 dígitos
+    Args:
+        digits (np.ndarray): Matriz (n, k) de dígitos 0-9, o mais significativo primeiro
+    Returns:
+        rest (np.ndarray): Resto de cada linha (int64)
+    """
+    rest = np.zeros(digits.shape[0], dtype=np.int64)
+    for start in range(0, digits.shape[1], MOD_CHUNK_DIGITS):
+        chunk = digits[:, start:start + MOD_CHUNK_DIGITS].astype(np.int64)
+        width = chunk.shape[1]
+        value = chunk @ (10 ** np.arange(width - 1, -1, -1, dtype=np.int64))
+        rest = (rest * 10**width + value) % 97
+    return rest
+
+
+def validate_npus_vectorized(npus: Sequence[str]) -> tuple[list[str | None], list[bool]]:
+    """Função que valida npus ASCII de uma vez com numpy: extrai os dígitos, completa com zeros à esquerda
+    até 20, confere o dígito verificador (mod 97) e formata no padrão CNJ
+    Args:
+        npus (Sequence[str]): npus ASCII de até MAX_VECTOR_WIDTH caracteres
+    Returns:
+        normalized (list[str | None]): npus no formato CNJ, None se tiverem mais de 20 dígitos
+        invalid (list[bool]): True para os npus inválidos
+    """
+    if not npus:
+        return [], []
+
+    chars = np.array(npus, dtype="S")
+    if chars.dtype.itemsize < 25:
+        chars = chars.astype("S25")
+    width = chars.dtype.itemsize
+    chars = chars.view(np.uint8).reshape(len(npus), width)
+    # bytes fora de "0".."9" dão a volta no uint8 e ficam >= 10
+    values = chars - np.uint8(ord("0"))
+    is_digit = values < 10
+    count = is_digit.sum(axis=1)
+    too_long = count > 20
+
+    digits = np.zeros((len(npus), 20), dtype=np.uint8)
+    # formatos usuais direto por fatias: 20 dígitos seguidos ou NNNNNNN-DD.AAAA.J.TR.OOOO
+    plain = (count == 20) & is_digit[:, :20].all(axis=1)
+    cnj = ~plain & (count == 20) & is_digit[:, CNJ_DIGIT_COLUMNS].all(axis=1)
+    digits[plain] = values[plain, :20]
+    digits[cnj] = values[cnj][:, CNJ_DIGIT_COLUMNS]
+
+    # demais: alinha os dígitos à direita em 20 colunas (o último vai para a coluna 19, o penúltimo para a 18...)
+    other = np.flatnonzero(~(plain | cnj))
+    if other.size:
+        from_right = np.cumsum(is_digit[other, ::-1], axis=1)[:, ::-1]
+        column = 20 - from_right
+        rows, positions = np.nonzero(is_digit[other] & (column >= 0))
+        digits[other[rows], column[rows, positions]] = values[other[rows], positions]
+
+    # base do cálculo: NNNNNNN + AAAAJTROOOO + "00"
+    base = np.concatenate([digits[:, :7], digits[:, 9:], np.zeros((len(npus), 2), dtype=np.uint8)], axis=1)
+    expected = 98 - mod97(base)
+    given = digits[:, 7].astype(np.int64) * 10 + digits[:, 8]
+    invalid = too_long | (given != expected)
+
+    formatted = np.empty((len(npus), 25), dtype=np.uint8)
+    formatted[:, CNJ_DIGIT_COLUMNS] = digits + ord("0")
+    for position, separator in CNJ_SEPARATORS.items():
+        formatted[:, position] = separator
+    normalized = formatted.view("S25").ravel().astype("U25").tolist()
+
+    return [None if long else npu for npu, long in zip(normalized, too_long.tolist())], invalid.tolist()
+
+
+def validate_npus(npus: Sequence[str]) -> tuple[list[str | None], list[bool]]:
+    """Função que normaliza e valida uma lista de npus, com o mesmo resultado de ClienteInput para cada um.
+    Usa o caminho vetorizado (numpy) quando instalado; entradas não ASCII (dígitos unicode), não texto ou
+    muito longas vão pelo caminho escalar
+    Args:
+        npus (Sequence[str]): npus com ou sem pontuação
+    Returns:
+        normalized (list[str | None]): npus no formato CNJ, None se não normalizáveis
+        invalid (list[bool]): Máscara dos npus inválidos (dígito verificador errado ou não normalizáveis)
+    """
+    if np is None:
+        results = [validate_npu_scalar(npu) for npu in npus]
+        return [normalized for normalized, _ in results], [invalid for _, invalid in results]
+
+    normalized: list[str | None] = [None] * len(npus)
+    invalid = [True] * len(npus)
+    vector_indexes = []
+    for index, npu in enumerate(npus):
+        if isinstance(npu, str) and npu.isascii() and len(npu) <= MAX_VECTOR_WIDTH:
+            vector_indexes.append(index)
+        else:
+            normalized[index], invalid[index] = validate_npu_scalar(npu)
+
+    if len(vector_indexes) == len(npus):
+        return validate_npus_vectorized(list(npus))
+
+    vector_normalized, vector_invalid = validate_npus_vectorized([npus[index] for index in vector_indexes])
+    for index, npu, bad in zip(vector_indexes, vector_normalized, vector_invalid):
+        normalized[index] = npu
+        invalid[index] = bad
+    return normalized, invalid
@@ -0,0 +1,145 @@
+import asyncio
+import time
+import logging
+from redis.exceptions import RedisError
+from crawler_jus import cache
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+    """
+    Limitador de taxa adaptativo (AIMD) das chamadas ao TJRS. Cada chamada reserva o próximo horário
+    livre e aguarda na fila até ele; respostas bem sucedidas aumentam a taxa de forma aditiva e sinais
+    de 429 a reduzem de forma multiplicativa, mantendo a vazão logo abaixo do limite do tribunal.
+
+    Attributes:
+        rate (float): Taxa atual (requisições por segundo)
+        min_rate (float): Taxa mínima
+        max_rate (float): Taxa máxima
+        increase (float): Aumento aproximado da taxa por segundo de sucesso (req/s)
+        decrease (float): Fator aplicado à taxa em um 429
+        decrease_interval (float): Intervalo mínimo entre reduções (uma rajada de 429 conta uma vez)
+        queue_depth (int): Chamadas aguardando a vez
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        min_rate: float = 0.2,
+        max_rate: float = 50.0,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        decrease_interval: float = 1.0,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.decrease_interval = decrease_interval
+        self.queue_depth = 0
+        self._next_slot = 0.0
+        self._last_decrease = float("-inf")
+
+    async def acquire(self) -> None:
+        """Função que aguarda a vez da chamada conforme a taxa atual"""
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1 / self.rate
+        delay = slot - now
+        if delay <= 0:
+            return
+
+        self.queue_depth += 1
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.queue_depth -= 1
+
+    def on_success(self) -> None:
+        """Função que aumenta a taxa após uma resposta bem sucedida (aumento aditivo)"""
+        # +increase/rate por sucesso: com a taxa cheia equivale a +increase req/s a cada segundo
+        self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_rate_limited(self) -> None:
+        """Função que reduz a taxa após um 429 (redução multiplicativa)"""
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_interval:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        # as próximas chamadas já respeitam o novo intervalo
+        self._next_slot = max(self._next_slot, now + 1 / self.rate)
+
+    def stats(self) -> dict:
+        return {"rate": round(self.rate, 3), "queue_depth": self.queue_depth}
+
+
+# token bucket atômico no redis; usa o relógio do redis para todas as réplicas concordarem
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    """
+    Token bucket compartilhado no redis entre processos e réplicas, para que a frota inteira
+    respeite um orçamento de chamadas ao TJRS. Se o redis falhar, libera as chamadas (fail-open)
+    e só tenta de novo após retry_seconds, ficando a cargo do limitador local.
+
+    Attributes:
+        name (str): Nome do orçamento (ex.: "auth", "consulta")
+        rate (float): Requisições por segundo permitidas para a frota
+        burst (int): Quantidade de requisições permitidas de uma vez
+        retry_seconds (float): Tempo sem consultar o redis após uma falha
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, retry_seconds: float = 30.0):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.retry_seconds = retry_seconds
+        self._disabled_until = 0.0
+
+    @property
+    def key(self) -> str:
+        return f"tjrs:ratelimit:{self.name}"
+
+    async def try_acquire(self) -> float:
+        """Função que tenta consumir um token do bucket
+        Returns:
+            wait (float): 0 se consumiu, senão segundos até haver token
+        """
+        wait = await cache.redis_client.eval(TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.burst)
+        return float(wait)
+
+    async def acquire(self) -> None:
+        """Função que aguarda até haver token no bucket compartilhado"""
+        while time.monotonic() >= self._disabled_until:
+            try:
+                wait = await self.try_acquire()
+            except RedisError as e:
+                logger.warning(f"Rate limit distribuído indisponível | bucket={self.name} | error={e}")
+                self._disabled_until = time.monotonic() + self.retry_seconds
+                return
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
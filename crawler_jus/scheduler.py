@@ -0,0 +1,106 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from api.enums import RequestPriority
+
+DEFAULT_WEIGHTS = {
+    RequestPriority.INTERACTIVE: 8,
+    RequestPriority.REFRESH: 3,
+    RequestPriority.BULK: 1,
+}
+
+
+class UpstreamScheduler:
+    """
+    Escalonador das consultas ao TJRS por classe de prioridade. Limita o total de consultas simultâneas
+    e o de cada classe, e distribui as vagas entre as classes com fila por weighted fair queuing:
+    cada vaga concedida avança o tempo virtual da classe em 1/peso, e a próxima vaga vai para a
+    classe com fila de menor tempo virtual. Assim uma carga em lote não impede as consultas interativas.
+
+    Attributes:
+        max_concurrency (int): Máximo de consultas simultâneas, somando todas as classes
+        weights (dict): Peso de cada classe na divisão das vagas
+        caps (dict): Máximo de consultas simultâneas de cada classe
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        weights: Optional[dict[RequestPriority, float]] = None,
+        caps: Optional[dict[RequestPriority, int]] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.caps = {priority: self.max_concurrency for priority in RequestPriority}
+        self.caps.update({priority: max(1, cap) for priority, cap in (caps or {}).items()})
+        self._queues: dict[RequestPriority, deque[asyncio.Future]] = {p: deque() for p in RequestPriority}
+        self._running = {priority: 0 for priority in RequestPriority}
+        self._vtime = {priority: 0.0 for priority in RequestPriority}
+        self._clock = 0.0
+
+    @asynccontextmanager
+    async def slot(self, priority: RequestPriority) -> AsyncIterator[None]:
+        """Função que reserva uma vaga da classe durante o bloco
+        Args:
+            priority (RequestPriority): Classe da consulta
+        """
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    async def acquire(self, priority: RequestPriority) -> None:
+        """Função que aguarda uma vaga para a classe
+        Args:
+            priority (RequestPriority): Classe da consulta
+        """
+        queue = self._queues[priority]
+        if not queue:
+            # classe voltando a ter fila não acumula crédito do tempo em que ficou parada
+            self._vtime[priority] = max(self._vtime[priority], self._clock)
+        future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # a vaga foi concedida junto com o cancelamento
+                self.release(priority)
+            elif future in queue:
+                queue.remove(future)
+            raise
+
+    def release(self, priority: RequestPriority) -> None:
+        """Função que devolve a vaga da classe e repassa para a próxima da fila
+        Args:
+            priority (RequestPriority): Classe da consulta
+        """
+        self._running[priority] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while sum(self._running.values()) < self.max_concurrency:
+            ready = [
+                priority
+                for priority, queue in self._queues.items()
+                if queue and self._running[priority] < self.caps[priority]
+            ]
+            if not ready:
+                return
+            priority = min(ready, key=lambda p: self._vtime[p])
+            future = self._queues[priority].popleft()
+            if future.done():
+                continue
+            future.set_result(None)
+            self._running[priority] += 1
+            self._clock = self._vtime[priority]
+            self._vtime[priority] += 1 / self.weights[priority]
+
+    def stats(self) -> dict:
+        return {
+            priority.value: {"running": self._running[priority], "queued": len(self._queues[priority])}
+            for priority in RequestPriority
+        }
@@ -1,9 +1,40 @@
+import os
+import time
 import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import date
+from functools import partial
+from typing import AsyncIterable, AsyncIterator
 from fastapi import HTTPException
-from crawler_jus.util import normalize_npu_to_20_digits
-from crawler_jus.cache import get_cache, set_cache
+from crawler_jus.util import normalize_npu_to_20_digits, parse_data_movimento
+from crawler_jus.cache import (
+    set_cache,
+    get_many_cache,
+    set_list_cache,
+    get_list_range,
+    movimentos_cache_key,
+    movimentos_meta_key,
+    set_negative_cache,
+    negative_cache_key,
+    CACHE_SOFT_TTL,
+    CACHE_HARD_TTL,
+    CACHE_BASIC_SOFT_TTL,
+    CACHE_BASIC_HARD_TTL,
+)
 from crawler_jus.crawler import Crawler
-from api.exceptions import TJRSUnauthorized, TJRSRateLimit, TJRSUpstreamError, TJRSNetworkError
+from crawler_jus.tracing import span
+from crawler_jus.metrics import CACHE_RESOURCES
+from api.enums import RequestPriority
+from api.exceptions import (
+    TJRSUnauthorized,
+    TJRSRateLimit,
+    TJRSUpstreamError,
+    TJRSNetworkError,
+    TJRSClientError,
+    TJRSCircuitOpen,
+)
+from api.error_handlers import build_error_item
 from crawler_jus.util import (
     remove_special_characters,
     extract_comarca,
@@ -11,76 +42,584 @@ from crawler_jus.util import (
     build_url_movimento,
 )
 
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "5"))
+
+# recursos do processo, cada um com sua entrada e seus TTLs (soft, hard) na cache
+BASIC = "basic"
+MOVIMENTOS = "movimentos"
+RESOURCES = (BASIC, MOVIMENTOS)
+RESOURCE_SOFT_TTLS = {BASIC: CACHE_BASIC_SOFT_TTL, MOVIMENTOS: CACHE_SOFT_TTL}
+
+# consultas ao TJRS em andamento, por chave de cache e recurso (compartilhado entre instâncias do serviço)
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def _forget_inflight(cache_key: str, task: asyncio.Task) -> None:
+    if _inflight.get(cache_key) is task:
+        del _inflight[cache_key]
+    # marca a exceção como lida caso nenhum chamador tenha ficado para recebê-la
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug(f"Consulta TJRS falhou | key={cache_key} | error={task.exception()!r}")
+
+
+def raise_negative(negative: dict) -> None:
+    """Função que relança o erro guardado na cache negativa
+    Args:
+        negative (dict): Entrada da cache negativa
+    Raises:
+        TJRSClientError: TJRS respondeu 4xx definitivo para o processo
+        HTTPException: Processo não encontrado
+    """
+    if negative.get("type") == "upstream_4xx":
+        raise TJRSClientError(
+            message=negative.get("detail") or TJRSClientError.message,
+            upstream_status=negative.get("upstream_status", 400),
+        )
+    raise HTTPException(status_code=404, detail=negative.get("detail") or "Nenhum processo encontrado")
+
+
+def with_cache_info(data: dict, status: str, age: float | None) -> dict:
+    """Função que acrescenta ao resultado a situação e a idade do dado em cache
+    Args:
+        data (dict): Dicionário com dados do processo (não é alterado)
+        status (str): "miss" (consultado agora), "hit" (fresco) ou "stale" (velho, atualizando)
+        age (float | None): Idade do dado em segundos, None se desconhecida
+    Returns:
+        results (dict): Cópia dos dados com a chave "cache"
+    """
+    age_seconds = round(age, 3) if age is not None else None
+    return {**data, "cache": {"status": status, "age_seconds": age_seconds}}
+
+
+@dataclass(frozen=True)
+class MovimentosFilter:
+    """
+    Parte dos movimentos pedida pelo cliente. Sem filtros devolve o histórico completo.
+
+    Attributes:
+        offset (int): Quantidade de movimentos pulados, na ordem do TJRS
+        limit (int | None): Máximo de movimentos devolvidos
+        desde (date | None): Só movimentos a partir desta data
+        ate (date | None): Só movimentos até esta data
+    """
+
+    offset: int = 0
+    limit: int | None = None
+    desde: date | None = None
+    ate: date | None = None
+
+    @property
+    def by_date(self) -> bool:
+        return self.desde is not None or self.ate is not None
+
+    def redis_range(self) -> tuple[int, int]:
+        """Função que retorna o intervalo (inclusivo) lido da lista de movimentos no redis
+        Returns:
+            start, stop (tuple[int, int]): Índices para o LRANGE; o período exige ler a lista toda
+        """
+        if self.by_date:
+            return 0, -1
+        stop = -1 if self.limit is None else self.offset + self.limit - 1
+        return self.offset, stop
+
+    def apply(self, movimentos: list[dict]) -> list[dict]:
+        """Função que aplica período e paginação a uma lista completa de movimentos
+        Args:
+            movimentos (list[dict]): Movimentos na ordem do TJRS
+        Returns:
+            movimentos (list[dict]): Movimentos selecionados
+        """
+        if self.by_date:
+            movimentos = [m for m in movimentos if self.in_period(m)]
+        stop = None if self.limit is None else self.offset + self.limit
+        return movimentos[self.offset:stop]
+
+    def in_period(self, movimento: dict) -> bool:
+        data = parse_data_movimento(movimento.get("data"))
+        if data is None:
+            return False
+        return (self.desde is None or data >= self.desde) and (self.ate is None or data <= self.ate)
+
+
+def resource_state(entry: dict | None, resource: str) -> tuple[str, float | None]:
+    """Função que classifica a entrada de um recurso na cache conforme o soft TTL do recurso
+    Args:
+        entry (dict | None): Entrada lida da cache ({"fetched_at", ...})
+        resource (str): "basic" ou "movimentos"
+    Returns:
+        status (str): "hit" (fresco), "stale" (velho) ou "miss" (fora da cache)
+        age (float | None): Idade do dado em segundos
+    """
+    if not entry or "fetched_at" not in entry:
+        return "miss", None
+    if resource == BASIC and not entry.get("data"):
+        return "miss", None
+    age = max(0.0, time.time() - entry["fetched_at"])
+    return ("hit" if age < RESOURCE_SOFT_TTLS[resource] else "stale"), age
+
+
+def strip_movimentos(basic_data: dict) -> dict:
+    # entradas gravadas com o total de movimentos junto dos dados básicos
+    return {k: v for k, v in basic_data.items() if k != "movimentos_total"}
+
+
+def select_movimentos(results: dict, movimentos_filter: MovimentosFilter) -> dict:
+    """Função que aplica o filtro aos movimentos de um resultado que os traz completos
+    Args:
+        results (dict): Dados do processo com a lista completa de movimentos
+        movimentos_filter (MovimentosFilter): Parte dos movimentos pedida
+    Returns:
+        results (dict): Cópia com os movimentos selecionados e o total do histórico
+    """
+    movimentos = results.get("movimentos") or []
+    return {**results, "movimentos": movimentos_filter.apply(movimentos), "movimentos_total": len(movimentos)}
+
 
 class SearchService:
-    def __init__(self, crawler: Crawler):
+    def __init__(self, crawler: Crawler, priority: RequestPriority = RequestPriority.INTERACTIVE):
         self.crawler = crawler
+        # classe das consultas ao TJRS no escalonador; a atualização em segundo plano usa "refresh"
+        self.priority = priority
 
-    async def search_npu(self, npu_original: str, force_refresh: bool = False) -> dict:
-        """Seviço que serve com as regras de negocio a rota de search_npu
+    def build_context(self, npu_original: str) -> tuple[str, str, str]:
+        """Função que prepara o contexto de busca de um processo
         Args:
             npu_original (str): npu(número de processo unificado) enviado para busca
         Returns:
-            results (dict): Dicionário com dados do processo
-        Raises:
-            TJRSRateLimit: Erro de limite de requisiçoes
+            npu_digits20 (str): npu com 20 dígitos
+            comarca (str): comarca do processo
+            cache_key (str): chave do processo na cache
         """
-        # 1) normaliza
         npu = remove_special_characters(npu_original)
-
-        # 2) prepara contexto
-        
         npu_digits20 = normalize_npu_to_20_digits(npu_original)
         comarca = extract_comarca(npu)
         cache_key = f"tjrs:{comarca}:{npu_digits20}"
+        return npu_digits20, comarca, cache_key
+
+    async def search_npu(
+        self,
+        npu_original: str,
+        force_refresh: bool = False,
+        movimentos_filter: MovimentosFilter | None = None,
+    ) -> dict:
+        """Seviço que serve com as regras de negocio a rota de search_npu
+        Args:
+            npu_original (str): npu(número de processo unificado) enviado para busca
+            force_refresh (bool): Ignora a cache; se já houver consulta do processo em andamento, aguarda a mesma
+            movimentos_filter (MovimentosFilter | None): Parte dos movimentos devolvida, None para o histórico completo
+        Returns:
+            results (dict): Dicionário com dados do processo
+        Raises:
+            TJRSRateLimit: Erro de limite de requisiçoes
+            TJRSCircuitOpen: TJRS fora e nenhum dado em cache
+        """
+        # 1) normaliza e prepara contexto
+        npu_digits20, comarca, cache_key = self.build_context(npu_original)
+        movimentos_filter = movimentos_filter or MovimentosFilter()
 
-        # 3) tenta buscar na cache
-        cached = None
+        # 2) tenta buscar na cache (dados básicos, movimentos e negativa na mesma ida ao redis)
+        basic = meta = negative = None
         if not force_refresh:
             try:
-                cached = await get_cache(cache_key)
+                with span("cache"):
+                    basic, meta, negative = await get_many_cache(
+                        [cache_key, movimentos_meta_key(cache_key), negative_cache_key(cache_key)]
+                    )
             except Exception:
-                cached = None
-
-        if cached:
-            return cached
-
-        
-        urlconsult = build_url_processo(npu_digits20, comarca)
-        urlmovimentos = build_url_movimento(npu_digits20, comarca)
-        
-        # 4) fetch concorrente com tratamento estável
-        basic_data_json, movimentos_json = await asyncio.gather(
-            self.crawler.request_page(urlconsult),
-            self.crawler.request_page(urlmovimentos),
-            return_exceptions=True,
-        )
-        
-        for response in (basic_data_json, movimentos_json):
-            if isinstance(response, HTTPException):
-                raise response
-            if isinstance(response, (TJRSUnauthorized, TJRSRateLimit, TJRSUpstreamError, TJRSNetworkError)):
-                raise response
-            if isinstance(response, Exception):
-                raise HTTPException(status_code=500, detail=f"Erro inesperado: {type(response).__name__}")
-        
-
-        # 5) parse e montagem
+                basic = meta = negative = None
+
+        if not basic and negative:
+            raise_negative(negative)
+
+        # 3) serve da cache o que houver e busca no TJRS só o que falta, compartilhando a
+        # consulta com chamadas simultâneas do mesmo processo
+        try:
+            return await self.resolve(npu_digits20, comarca, cache_key, basic, meta, movimentos_filter)
+        except TJRSCircuitOpen:
+            # TJRS fora: o refresh forçado devolve o dado velho da cache, se houver
+            stale = await self.read_stale(npu_digits20, comarca, cache_key, movimentos_filter) if force_refresh else None
+            if stale is None:
+                raise
+            return stale
+
+    async def read_stale(
+        self, npu_digits20: str, comarca: str, cache_key: str, movimentos_filter: MovimentosFilter
+    ) -> dict | None:
+        """Seviço que lê da cache o dado de um processo sem consultar o TJRS nem agendar atualização
+        Args:
+            npu_digits20 (str): npu com 20 dígitos
+            comarca (str): comarca do processo
+            cache_key (str): chave do processo na cache
+            movimentos_filter (MovimentosFilter): Parte dos movimentos pedida
+        Returns:
+            results (dict | None): Dados do processo marcados como "stale", None se algum recurso faltar na cache
+        """
+        try:
+            with span("cache"):
+                basic, meta = await get_many_cache([cache_key, movimentos_meta_key(cache_key)])
+        except Exception:
+            return None
         try:
-            basic_data = self.crawler.extract_basic_data_partes(basic_data_json)
-            movimentos = self.crawler.extract_movimentos(movimentos_json)
+            results = await self.resolve(
+                npu_digits20, comarca, cache_key, basic, meta, movimentos_filter, fetch_missing=False, refresh_stale=False
+            )
+        except LookupError:
+            return None
+        return {**results, "cache": {**results["cache"], "status": "stale"}}
+
+    async def resolve(
+        self,
+        npu_digits20: str,
+        comarca: str,
+        cache_key: str,
+        basic: dict | None,
+        meta: dict | None,
+        movimentos_filter: MovimentosFilter,
+        fetch_missing: bool = True,
+        refresh_stale: bool = True,
+    ) -> dict:
+        """Seviço que aplica o stale-while-revalidate a cada recurso do processo: o que está fresco é servido,
+        o que está velho é servido e atualizado em segundo plano, e só o que falta é buscado no TJRS
+        Args:
+            npu_digits20 (str): npu com 20 dígitos
+            comarca (str): comarca do processo
+            cache_key (str): chave do processo na cache
+            basic (dict | None): Entrada dos dados básicos lida da cache
+            meta (dict | None): Entrada de controle dos movimentos lida da cache
+            movimentos_filter (MovimentosFilter): Parte dos movimentos pedida
+            fetch_missing (bool): Se False, não busca no TJRS o que falta na cache
+            refresh_stale (bool): Se False, não agenda a atualização do que está velho
+        Returns:
+            results (dict): Dados do processo com a situação e a idade do dado
+        Raises:
+            LookupError: Recurso fora da cache com fetch_missing=False
+        """
+        # entrada gravada antes da separação por recurso: o resultado completo, sem envelope nem idade
+        if basic and "fetched_at" not in basic:
+            return with_cache_info(select_movimentos(basic, movimentos_filter), "hit", None)
+
+        states = {BASIC: resource_state(basic, BASIC), MOVIMENTOS: resource_state(meta, MOVIMENTOS)}
+        missing = [resource for resource, (status, _) in states.items() if status == "miss"]
+        if missing and not fetch_missing:
+            raise LookupError(missing)
+        for resource, (status, _) in states.items():
+            CACHE_RESOURCES.labels(resource, status).inc()
+        if refresh_stale:
+            for resource, (status, _) in states.items():
+                if status == "stale":
+                    self.start_fetch(npu_digits20, comarca, cache_key, resource, priority=RequestPriority.REFRESH)
+
+        fetched = {}
+        if missing:
+            replies = await asyncio.gather(
+                *(self.fetch_coalesced(npu_digits20, comarca, cache_key, resource) for resource in missing),
+                return_exceptions=True,
+            )
+            for reply in replies:
+                if isinstance(reply, BaseException):
+                    raise reply
+            fetched = dict(zip(missing, replies))
+
+        basic_data = fetched[BASIC] if BASIC in fetched else strip_movimentos(basic["data"])
+        if MOVIMENTOS in fetched:
+            movimentos_all = fetched[MOVIMENTOS]
+            movimentos, total = movimentos_filter.apply(movimentos_all), len(movimentos_all)
+        else:
+            total = meta.get("total", 0)
+            movimentos = await self.read_movimentos(cache_key, total, movimentos_filter)
+            if movimentos is None:
+                # lista expirou antes da entrada de controle
+                if not fetch_missing:
+                    raise LookupError([MOVIMENTOS])
+                movimentos_all = await self.fetch_coalesced(npu_digits20, comarca, cache_key, MOVIMENTOS)
+                movimentos, total = movimentos_filter.apply(movimentos_all), len(movimentos_all)
+                fetched[MOVIMENTOS] = movimentos_all
+
+        # TJRS responde "data" vazio para processo inexistente
+        if BASIC in fetched and not any(basic_data.values()) and not total:
+            await self.remember_negative(cache_key, {"type": "not_found", "detail": "Nenhum processo encontrado"})
+            raise HTTPException(status_code=404, detail="Nenhum processo encontrado")
+
+        results = {**basic_data, "movimentos": movimentos, "movimentos_total": total}
+        if fetched:
+            return with_cache_info(results, "miss", 0.0)
+        status = "stale" if any(status == "stale" for status, _ in states.values()) else "hit"
+        return with_cache_info(results, status, max(age for _, age in states.values()))
+
+    async def read_movimentos(self, cache_key: str, total: int, movimentos_filter: MovimentosFilter) -> list | None:
+        """Seviço que lê da lista de movimentos na cache só a fatia pedida
+        Args:
+            cache_key (str): chave do processo na cache
+            total (int): Quantidade de movimentos gravados
+            movimentos_filter (MovimentosFilter): Parte dos movimentos pedida
+        Returns:
+            movimentos (list | None): Movimentos selecionados, None se a lista não estiver na cache
+        """
+        if not total:
+            return []
+        start, stop = movimentos_filter.redis_range()
+        try:
+            with span("cache_list"):
+                movimentos = await get_list_range(movimentos_cache_key(cache_key), start, stop)
+        except Exception:
+            return None
+        if movimentos is None:
+            return None
+        if movimentos_filter.by_date:
+            movimentos = movimentos_filter.apply(movimentos)
+        return movimentos
+
+    def start_fetch(
+        self,
+        npu_digits20: str,
+        comarca: str,
+        cache_key: str,
+        resource: str,
+        priority: RequestPriority | None = None,
+    ) -> asyncio.Task:
+        """Seviço que inicia a consulta ao TJRS de um recurso do processo, ou reaproveita a que já está em andamento
+        Args:
+            npu_digits20 (str): npu com 20 dígitos
+            comarca (str): comarca do processo
+            cache_key (str): chave do processo na cache, usada para agrupar as chamadas
+            resource (str): "basic" (dados básicos e partes) ou "movimentos"
+            priority (RequestPriority | None): Classe da consulta, por padrão a do serviço
+        Returns:
+            task (asyncio.Task): Consulta em andamento
+        """
+        inflight_key = f"{cache_key}#{resource}"
+        task = _inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.create_task(
+                self.fetch_and_cache(npu_digits20, comarca, cache_key, resource, priority=priority or self.priority)
+            )
+            _inflight[inflight_key] = task
+            task.add_done_callback(partial(_forget_inflight, inflight_key))
+        return task
+
+    async def fetch_coalesced(self, npu_digits20: str, comarca: str, cache_key: str, resource: str) -> dict | list:
+        """Seviço que garante uma única consulta ao TJRS por recurso do processo em andamento;
+        chamadas simultâneas da mesma chave aguardam a mesma consulta
+        Args:
+            npu_digits20 (str): npu com 20 dígitos
+            comarca (str): comarca do processo
+            cache_key (str): chave do processo na cache, usada para agrupar as chamadas
+            resource (str): "basic" ou "movimentos"
+        Returns:
+            data (dict | list): Dados básicos ou lista completa de movimentos
+        """
+        task = self.start_fetch(npu_digits20, comarca, cache_key, resource)
+
+        # shield: o cancelamento de um chamador não cancela a consulta dos demais
+        return await asyncio.shield(task)
+
+    async def fetch_and_cache(
+        self,
+        npu_digits20: str,
+        comarca: str,
+        cache_key: str,
+        resource: str,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+    ) -> dict | list:
+        """Seviço que consulta um recurso do processo no TJRS, extrai os dados e grava na cache com o TTL do recurso
+        Args:
+            npu_digits20 (str): npu com 20 dígitos
+            comarca (str): comarca do processo
+            cache_key (str): chave do processo na cache
+            resource (str): "basic" (dados básicos e partes) ou "movimentos"
+            priority (RequestPriority): Classe da consulta no escalonador
+        Returns:
+            data (dict | list): Dados básicos ou lista completa de movimentos
+        Raises:
+            TJRSRateLimit: Erro de limite de requisiçoes
+        """
+        if resource == BASIC:
+            url = build_url_processo(npu_digits20, comarca)
+        else:
+            url = build_url_movimento(npu_digits20, comarca)
+
+        # 1) fetch com tratamento estável
+        try:
+            with span(f"fetch_{resource}"):
+                payload = await self.crawler.request_page(url, priority=priority)
+        except TJRSClientError as response:
+            await self.remember_negative(
+                cache_key,
+                {"type": "upstream_4xx", "upstream_status": response.upstream_status, "detail": response.message},
+            )
+            raise
+        except HTTPException:
+            raise
+        except (TJRSUnauthorized, TJRSRateLimit, TJRSUpstreamError, TJRSNetworkError, TJRSCircuitOpen):
+            raise
+        except Exception as response:
+            raise HTTPException(status_code=500, detail=f"Erro inesperado: {type(response).__name__}")
+
+        # 2) parse
+        try:
+            with span("extract"):
+                if resource == BASIC:
+                    data = self.crawler.extract_basic_data_partes(payload)
+                else:
+                    data = self.crawler.extract_movimentos(payload)
         except Exception as e:
             raise HTTPException(status_code=502, detail=f"Falha ao processar resposta do TJRS: {type(e).__name__}")
-        
-        results = {**basic_data, "movimentos": movimentos}
 
-        if not results:
-            raise HTTPException(status_code=404, detail="Nenhum processo encontrado")
+        # 3) seta na cache com o horário da consulta para o stale-while-revalidate; os movimentos
+        # ficam em uma lista própria para serem lidos em fatias, com uma entrada de controle
+        fetched_at = time.time()
+        try:
+            with span("cache_write"):
+                if resource == BASIC:
+                    # dados vazios (processo inexistente) não são gravados
+                    if any(data.values()):
+                        await set_cache(cache_key, {"fetched_at": fetched_at, "data": data}, ttl=CACHE_BASIC_HARD_TTL)
+                else:
+                    await set_list_cache(movimentos_cache_key(cache_key), data, ttl=CACHE_HARD_TTL)
+                    await set_cache(
+                        movimentos_meta_key(cache_key),
+                        {"fetched_at": fetched_at, "total": len(data)},
+                        ttl=CACHE_HARD_TTL,
+                    )
+        except Exception:
+            pass
 
-        # 6) seta resultado na cache
+        return data
+
+    async def remember_negative(self, cache_key: str, negative: dict) -> None:
+        """Seviço que grava na cache negativa um resultado que não adianta consultar de novo
+        Args:
+            cache_key (str): chave do processo na cache
+            negative (dict): tipo e detalhe do erro a ser relançado
+        """
         try:
-            await set_cache(cache_key, results, ttl=60)
+            await set_negative_cache(cache_key, negative)
         except Exception:
             pass
 
-        return results
\ No newline at end of file
+    async def search_npu_item(self, npu_original: str, force_refresh: bool = False) -> dict:
+        """Seviço que executa a busca de um processo sem propagar erros, usado nas buscas em lote
+        Args:
+            npu_original (str): npu(número de processo unificado) enviado para busca
+            force_refresh (bool): Determina se é para forçar ou nao refresh no cache redis
+        Returns:
+            item (dict): Dicionário com status e dados ou erro tipado do processo
+        """
+        try:
+            data = await self.search_npu(npu_original, force_refresh=force_refresh)
+        except Exception as e:
+            return {"npu": npu_original, "status": "error", "error": build_error_item(e)}
+        return {"npu": npu_original, "status": "ok", "data": data}
+
+    async def search_npu_batch(
+        self,
+        npus: list[str],
+        force_refresh: bool = False,
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    ) -> list[dict]:
+        """Seviço que busca uma lista de processos, servindo da cache o que houver e consultando o resto com concorrência limitada
+        Args:
+            npus (list[str]): Lista de npus enviados para busca
+            force_refresh (bool): Determina se é para forçar ou nao refresh no cache redis
+            max_concurrency (int): Máximo de processos consultados ao mesmo tempo no TJRS
+        Returns:
+            results (list[dict]): Um item por npu único, na ordem de entrada, com dados ou erro tipado
+        """
+        unique_npus = list(dict.fromkeys(npus))
+
+        # 1) busca todos os hits da cache (dados básicos e movimentos) em uma única ida ao redis
+        cached = [None] * (2 * len(unique_npus))
+        if not force_refresh:
+            try:
+                keys = []
+                for npu in unique_npus:
+                    cache_key = self.build_context(npu)[2]
+                    keys += [cache_key, movimentos_meta_key(cache_key)]
+                cached = await get_many_cache(keys)
+            except Exception:
+                cached = [None] * (2 * len(unique_npus))
+
+        # 2) consulta os misses com concorrência limitada
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def fetch(npu: str) -> dict:
+            async with semaphore:
+                return await self.search_npu_item(npu, force_refresh=force_refresh)
+
+        async def resolve(npu: str, basic: dict | None, meta: dict | None) -> dict:
+            if basic or meta:
+                try:
+                    data = await self.resolve(
+                        *self.build_context(npu), basic, meta, MovimentosFilter(), fetch_missing=False
+                    )
+                    return {"npu": npu, "status": "ok", "data": data}
+                except LookupError:
+                    pass
+            return await fetch(npu)
+
+        return await asyncio.gather(
+            *(resolve(npu, basic, meta) for npu, basic, meta in zip(unique_npus, cached[::2], cached[1::2]))
+        )
+
+    async def stream_npus(
+        self,
+        npus: AsyncIterable[str | Exception],
+        force_refresh: bool = False,
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    ) -> AsyncIterator[dict]:
+        """Seviço que busca processos de uma fonte assíncrona e devolve cada resultado assim que fica pronto
+        Args:
+            npus (AsyncIterable[str | Exception]): Fonte de npus; exceções representam entradas inválidas
+            force_refresh (bool): Determina se é para forçar ou nao refresh no cache redis
+            max_concurrency (int): Máximo de processos consultados ao mesmo tempo no TJRS
+        Returns:
+            item (AsyncIterator[dict]): Itens em ordem de conclusão com o índice da entrada
+        """
+        workers_count = max(1, max_concurrency)
+        # fila limitada: se o cliente ler devagar, os workers param de consultar
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers_count)
+        source = aiter(npus)
+        source_lock = asyncio.Lock()
+        next_index = 0
+        done = object()
+
+        async def worker():
+            nonlocal next_index
+            try:
+                while True:
+                    async with source_lock:
+                        try:
+                            npu = await anext(source)
+                        except StopAsyncIteration:
+                            break
+                        index = next_index
+                        next_index += 1
+
+                    if isinstance(npu, Exception):
+                        item = {"npu": None, "status": "error", "error": build_error_item(npu)}
+                    else:
+                        item = await self.search_npu_item(npu, force_refresh=force_refresh)
+                    await queue.put({"index": index, **item})
+            except Exception as e:
+                # falha da fonte (ex.: cliente desconectou): repassa para o consumidor
+                await queue.put(e)
+                return
+            await queue.put(done)
+
+        tasks = [asyncio.create_task(worker()) for _ in range(workers_count)]
+        try:
+            finished = 0
+            while finished < workers_count:
+                item = await queue.get()
+                if item is done:
+                    finished += 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
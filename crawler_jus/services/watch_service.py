@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime
+from fastapi import HTTPException
+from redis.exceptions import WatchError
+from crawler_jus import cache
+from crawler_jus.crawler import Crawler
+from crawler_jus.util import parse_data_movimento
+from crawler_jus.services.search_service import SearchService, MOVIMENTOS
+from api.enums import RequestPriority
+from api.schema import format_cnj
+
+logger = logging.getLogger(__name__)
+
+WATCH_PREFIX = "tjrs:watch:"
+WATCH_DUE_KEY = f"{WATCH_PREFIX}due"
+# intervalo entre verificações = tempo desde o último movimento * fator, dentro dos limites
+WATCH_MIN_INTERVAL = float(os.getenv("WATCH_MIN_INTERVAL_SECONDS", "900"))
+WATCH_MAX_INTERVAL = float(os.getenv("WATCH_MAX_INTERVAL_SECONDS", "86400"))
+WATCH_INTERVAL_FACTOR = float(os.getenv("WATCH_INTERVAL_FACTOR", "0.25"))
+WATCH_POLL_SECONDS = float(os.getenv("WATCH_POLL_SECONDS", "30"))
+WATCH_BATCH_SIZE = int(os.getenv("WATCH_BATCH_SIZE", "20"))
+# tempo que um processo fica reservado para a réplica que o pegou da fila
+WATCH_LEASE_SECONDS = float(os.getenv("WATCH_LEASE_SECONDS", "300"))
+WATCH_LOG_MAX = int(os.getenv("WATCH_LOG_MAX", "1000"))
+
+# reserva atômica: só uma réplica pega cada processo vencido
+CLAIM_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if score and tonumber(score) <= tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+def movement_fingerprints(movimentos: list[dict]) -> list[str]:
+    """Função que calcula a impressão digital de cada movimento, distinguindo movimentos repetidos pela ocorrência
+    Args:
+        movimentos (list[dict]): Movimentos no formato de extract_movimentos
+    Returns:
+        fingerprints (list[str]): Uma impressão digital por movimento, na mesma ordem
+    """
+    seen = Counter()
+    fingerprints = []
+    for movimento in movimentos:
+        base = f"{movimento.get('data')}|{movimento.get('descricao')}"
+        seen[base] += 1
+        fingerprints.append(hashlib.sha1(f"{base}|{seen[base]}".encode("utf-8")).hexdigest()[:16])
+    return fingerprints
+
+
+def latest_movement_time(movimentos: list[dict]) -> float | None:
+    """Função que retorna o horário do movimento mais recente
+    Args:
+        movimentos (list[dict]): Movimentos com "data" no formato dd/mm/aaaa
+    Returns:
+        timestamp (float | None): Horário do movimento mais recente, None se nenhuma data for válida
+    """
+    dates = [d for d in (parse_data_movimento(m.get("data")) for m in movimentos) if d is not None]
+    if not dates:
+        return None
+    return datetime.combine(max(dates), datetime.min.time()).timestamp()
+
+
+def next_interval(last_moved_at: float | None, now: float) -> float:
+    """Função que calcula o intervalo até a próxima verificação: processos parados há muito tempo são vistos com menos frequência
+    Args:
+        last_moved_at (float | None): Horário do último movimento conhecido
+        now (float): Horário atual
+    Returns:
+        interval (float): Segundos até a próxima verificação
+    """
+    if last_moved_at is None:
+        return WATCH_MAX_INTERVAL
+    interval = max(0.0, now - last_moved_at) * WATCH_INTERVAL_FACTOR
+    return min(WATCH_MAX_INTERVAL, max(WATCH_MIN_INTERVAL, interval))
+
+
+def watch_key(npu_digits20: str) -> str:
+    return f"{WATCH_PREFIX}{npu_digits20}"
+
+
+def watch_log_key(npu_digits20: str) -> str:
+    return f"{WATCH_PREFIX}{npu_digits20}:log"
+
+
+class WatchService:
+    """
+    Lista de processos acompanhados. Guarda no redis as impressões digitais dos movimentos já vistos
+    de cada processo, verifica os processos vencidos pelo Crawler e registra só os movimentos novos
+    em um log numerado (o cursor). O intervalo de cada processo se adapta ao tempo desde o último movimento.
+
+    Attributes:
+        crawler (Crawler): Crawler usado nas consultas
+        search (SearchService): Serviço de busca, com prioridade "refresh" nas verificações
+    """
+
+    def __init__(self, crawler: Crawler):
+        self.crawler = crawler
+        self.search = SearchService(crawler, priority=RequestPriority.REFRESH)
+
+    async def add(self, npu_original: str) -> dict:
+        """Seviço que inclui um processo na lista, usando os movimentos atuais como base
+        Args:
+            npu_original (str): npu(número de processo unificado) a acompanhar
+        Returns:
+            watch (dict): Situação do acompanhamento
+        """
+        npu_digits20 = self.search.build_context(npu_original)[0]
+        if not await cache.redis_client.exists(watch_key(npu_digits20)):
+            await self.check(npu_original, priority=RequestPriority.INTERACTIVE)
+        return await self.status(npu_original)
+
+    async def remove(self, npu_original: str) -> None:
+        """Seviço que tira um processo da lista
+        Args:
+            npu_original (str): npu(número de processo unificado) acompanhado
+        """
+        npu_digits20 = self.search.build_context(npu_original)[0]
+        async with cache.redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrem(WATCH_DUE_KEY, npu_digits20)
+            pipe.delete(watch_key(npu_digits20), watch_log_key(npu_digits20))
+            _, deleted = await pipe.execute()
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Processo não acompanhado")
+
+    async def status(self, npu_original: str) -> dict:
+        """Seviço que retorna a situação do acompanhamento de um processo
+        Args:
+            npu_original (str): npu(número de processo unificado) acompanhado
+        Returns:
+            watch (dict): npu, cursor atual, horários da última verificação, do último movimento e da próxima verificação
+        """
+        npu_digits20 = self.search.build_context(npu_original)[0]
+        async with cache.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hmget(watch_key(npu_digits20), "npu", "seq", "last_checked_at", "last_moved_at")
+            pipe.zscore(WATCH_DUE_KEY, npu_digits20)
+            (npu, seq, last_checked_at, last_moved_at), next_check_at = await pipe.execute()
+        if npu is None:
+            raise HTTPException(status_code=404, detail="Processo não acompanhado")
+        return {
+            "npu": npu.decode(),
+            "cursor": int(seq),
+            "last_checked_at": float(last_checked_at) if last_checked_at else None,
+            "last_moved_at": float(last_moved_at) if last_moved_at else None,
+            "next_check_at": next_check_at,
+        }
+
+    async def new_movements(self, npu_original: str, cursor: int = 0) -> dict:
+        """Seviço que retorna os movimentos detectados depois do cursor
+        Args:
+            npu_original (str): npu(número de processo unificado) acompanhado
+            cursor (int): Último cursor recebido (0 para todos desde o início do acompanhamento)
+        Returns:
+            movimentos (dict): npu, novo cursor e movimentos novos em ordem de detecção
+        """
+        npu_digits20 = self.search.build_context(npu_original)[0]
+        async with cache.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hget(watch_key(npu_digits20), "seq")
+            pipe.zrangebyscore(watch_log_key(npu_digits20), f"({cursor}", "+inf")
+            seq, entries = await pipe.execute()
+        if seq is None:
+            raise HTTPException(status_code=404, detail="Processo não acompanhado")
+
+        movimentos = [json.loads(entry) for entry in entries]
+        return {
+            "npu": format_cnj(npu_digits20),
+            "cursor": max([cursor, *(m["seq"] for m in movimentos)]),
+            "movimentos": movimentos,
+        }
+
+    async def check(self, npu_original: str, priority: RequestPriority = RequestPriority.REFRESH) -> list[dict]:
+        """Seviço que consulta os movimentos do processo no TJRS, registra os novos e agenda a próxima verificação
+        Args:
+            npu_original (str): npu(número de processo unificado) acompanhado
+            priority (RequestPriority): Classe da consulta no escalonador
+        Returns:
+            movimentos (list[dict]): Movimentos novos registrados nesta verificação
+        """
+        npu_digits20, comarca, cache_key = self.search.build_context(npu_original)
+        service = self.search if priority == self.search.priority else SearchService(self.crawler, priority=priority)
+        # só os movimentos mudam: os dados básicos ficam com o TTL da cache
+        movimentos = await service.fetch_coalesced(npu_digits20, comarca, cache_key, MOVIMENTOS)
+        fingerprints = movement_fingerprints(movimentos)
+        latest_moved_at = latest_movement_time(movimentos)
+
+        key = watch_key(npu_digits20)
+        # leitura, comparação e registro atômicos (WATCH/MULTI no hash do processo): verificações simultâneas
+        # do mesmo processo não registram o mesmo movimento duas vezes com seqs diferentes
+        async with cache.redis_client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    seen_raw, seq_raw, last_moved_raw = await pipe.hmget(key, "fingerprints", "seq", "last_moved_at")
+                    now = time.time()
+
+                    if seen_raw is None:
+                        # primeira verificação: os movimentos atuais são a base, não entram no log
+                        new = []
+                        seq = 0
+                    else:
+                        seen = set(json.loads(seen_raw))
+                        new = [m for m, fp in zip(movimentos, fingerprints) if fp not in seen]
+                        seq = int(seq_raw)
+                    # data do movimento mais recente; sem data válida, mantém a conhecida
+                    last_moved_at = latest_moved_at
+                    if last_moved_at is None and last_moved_raw:
+                        last_moved_at = float(last_moved_raw)
+
+                    entries = {}
+                    for movimento in new:
+                        seq += 1
+                        entries[json.dumps({"seq": seq, "detected_at": now, **movimento}, ensure_ascii=False)] = seq
+
+                    mapping = {
+                        "npu": format_cnj(npu_digits20),
+                        "fingerprints": json.dumps(fingerprints),
+                        "seq": seq,
+                        "last_checked_at": now,
+                    }
+                    if last_moved_at is not None:
+                        mapping["last_moved_at"] = last_moved_at
+
+                    pipe.multi()
+                    pipe.hset(key, mapping=mapping)
+                    if entries:
+                        pipe.zadd(watch_log_key(npu_digits20), entries)
+                        pipe.zremrangebyrank(watch_log_key(npu_digits20), 0, -WATCH_LOG_MAX - 1)
+                    pipe.zadd(WATCH_DUE_KEY, {npu_digits20: now + next_interval(last_moved_at, now)})
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    # outra verificação gravou no meio: compara de novo com o que ela registrou
+                    continue
+
+        if new:
+            logger.info(f"Movimentos novos | npu={npu_original} | count={len(new)} | cursor={seq}")
+        return new
+
+    async def claim_due(self, limit: int = WATCH_BATCH_SIZE) -> list[str]:
+        """Seviço que reserva para esta réplica os processos com verificação vencida
+        Args:
+            limit (int): Máximo de processos reservados
+        Returns:
+            npus (list[str]): npus (20 dígitos) reservados
+        """
+        now = time.time()
+        due = await cache.redis_client.zrangebyscore(WATCH_DUE_KEY, "-inf", now, start=0, num=limit)
+        claimed = []
+        for member in due:
+            npu_digits20 = member.decode()
+            if await cache.redis_client.eval(CLAIM_SCRIPT, 1, WATCH_DUE_KEY, npu_digits20, now, now + WATCH_LEASE_SECONDS):
+                claimed.append(npu_digits20)
+        return claimed
+
+    async def run_due(self) -> int:
+        """Seviço que verifica os processos vencidos
+        Returns:
+            checked (int): Quantidade de processos verificados
+        """
+        npus = await self.claim_due()
+
+        async def check(npu_digits20: str):
+            try:
+                await self.check(npu_digits20)
+            except Exception as e:
+                # continua reservado: tenta de novo quando a reserva vencer
+                logger.warning(f"Falha ao verificar processo acompanhado | npu={npu_digits20} | error={e}")
+
+        await asyncio.gather(*(check(npu) for npu in npus))
+        return len(npus)
+
+    async def run(self, poll_seconds: float = WATCH_POLL_SECONDS):
+        """Tarefa de fundo que verifica periodicamente os processos vencidos
+        Args:
+            poll_seconds (float): Espera quando não há processos vencidos
+        """
+        while True:
+            try:
+                if await self.run_due():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Falha no acompanhamento de processos | error={e}")
+            await asyncio.sleep(poll_seconds)
@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+
+def solve_range(salt: str, challenge: str, start: int, stop: int) -> Optional[int]:
+    """Função que procura o número do challenge em um intervalo
+    Args:
+        salt (str): Parte do calculo do desafio
+        challenge (str): Hash sha256 (hex) a ser encontrado
+        start (int): Primeiro número testado
+        stop (int): Limite (exclusivo) do intervalo
+    Returns:
+        i (Optional[int]): Número que resolve o challenge, None se não estiver no intervalo
+    """
+    for i in range(start, stop):
+        attempt = (salt + str(i)).encode('utf-8')
+        result = hashlib.sha256(attempt).hexdigest()
+        if result == challenge:
+            return i
+    return None
+
+
+def solve_range_fast(salt: str, challenge: str, start: int, stop: int) -> Optional[int]:
+    """Função que procura o número do challenge em um intervalo reaproveitando o estado sha256 do salt
+    e comparando digests binários (mesmo resultado de solve_range, sem hexdigest por tentativa)
+    Args:
+        salt (str): Parte do calculo do desafio
+        challenge (str): Hash sha256 (hex) a ser encontrado
+        start (int): Primeiro número testado
+        stop (int): Limite (exclusivo) do intervalo
+    Returns:
+        i (Optional[int]): Número que resolve o challenge, None se não estiver no intervalo
+    """
+    try:
+        target = bytes.fromhex(challenge)
+    except ValueError:
+        return None
+    # hexdigest é sempre minúsculo: um challenge em outro formato nunca é encontrado pela busca original
+    if target.hex() != challenge:
+        return None
+
+    copy = hashlib.sha256(salt.encode('utf-8')).copy
+    for i in range(start, stop):
+        attempt = copy()
+        attempt.update(b"%d" % i)
+        if attempt.digest() == target:
+            return i
+    return None
+
+
+ENGINES: dict[str, Callable[[str, str, int, int], Optional[int]]] = {
+    "hashlib": solve_range,
+    "fast": solve_range_fast,
+}
+
+
+class ParallelSolver:
+    """
+    Resolve o challenge altcha dividindo range(maxnumber + 1) em blocos executados em um pool de processos.
+    Assim que um bloco encontra a resposta, os blocos seguintes ainda na fila são cancelados
+    (blocos já em execução terminam, por isso o tamanho do bloco limita o desperdício).
+
+    Attributes:
+        workers (int): Quantidade de processos do pool
+        chunk_size (int): Quantidade de números testados por bloco
+        engine (Callable): Função que testa um bloco (ver ENGINES)
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 50_000, engine: str = "fast"):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.engine = ENGINES[engine]
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: fork de um processo com event loop e conexões abertas não é seguro
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def solve(self, salt: str, challenge: str, maxnumber: int) -> Optional[int]:
+        """Função que resolve o challenge em paralelo
+        Args:
+            salt (str): Parte do calculo do desafio
+            challenge (str): Hash sha256 (hex) a ser encontrado
+            maxnumber (int): Número maximo que challenge pode ter
+        Returns:
+            i (Optional[int]): Menor número que resolve o challenge (mesmo resultado da busca serial), None se não houver
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+
+        chunk_of = {}
+        for order, start in enumerate(range(0, maxnumber + 1, self.chunk_size)):
+            stop = min(start + self.chunk_size, maxnumber + 1)
+            future = loop.run_in_executor(pool, self.engine, salt, challenge, start, stop)
+            chunk_of[future] = order
+
+        pending = set(chunk_of)
+        best_chunk: Optional[int] = None
+        best: Optional[int] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result is not None and (best_chunk is None or chunk_of[future] < best_chunk):
+                        best_chunk, best = chunk_of[future], result
+
+                if best_chunk is not None:
+                    # só blocos anteriores podem ter uma resposta menor
+                    for future in [f for f in pending if chunk_of[f] > best_chunk]:
+                        future.cancel()
+                        pending.discard(future)
+            return best
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self):
+        """Função que encerra o pool de processos"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,110 @@
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+
+@dataclass
+class Span:
+    name: str
+    start: float = field(default_factory=time.perf_counter)
+    end: Optional[float] = None
+    attrs: dict = field(default_factory=dict)
+    children: list["Span"] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def start_trace(name: str, **attrs) -> Iterator[Span]:
+    """Função que abre a raiz de um trace (uma por requisição)
+    Args:
+        name (str): Nome da raiz (ex.: rota)
+    Returns:
+        root (Span): Raiz do trace, encerrada ao sair do bloco
+    """
+    root = Span(name, attrs=attrs)
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        root.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Optional[Span]]:
+    """Função que mede uma fase como filha do span atual; fora de um trace (ou depois que a requisição
+    terminou, ex.: tarefas em segundo plano) não registra nada
+    Args:
+        name (str): Nome da fase
+    Returns:
+        span (Optional[Span]): Span aberto, None se não houver trace ativo
+    """
+    parent = _current_span.get()
+    if parent is None or parent.end is not None:
+        yield None
+        return
+
+    current = Span(name, attrs=attrs)
+    parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def phase_totals(root: Span) -> dict[str, float]:
+    """Função que soma a duração de cada fase do trace (fases concorrentes somam separadamente)
+    Args:
+        root (Span): Raiz do trace
+    Returns:
+        totals (dict[str, float]): Segundos por nome de fase, na ordem em que apareceram
+    """
+    totals: dict[str, float] = {}
+    stack = list(reversed(root.children))
+    while stack:
+        current = stack.pop()
+        totals[current.name] = totals.get(current.name, 0.0) + current.duration
+        stack.extend(reversed(current.children))
+    return totals
+
+
+def server_timing(root: Span) -> str:
+    """Função que monta o header Server-Timing com o total da requisição e de cada fase
+    Args:
+        root (Span): Raiz do trace
+    Returns:
+        header (str): Valor do header (ex.: "total;dur=812.4, cache;dur=1.2")
+    """
+    entries = [("total", root.duration), *phase_totals(root).items()]
+    return ", ".join(f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)};dur={seconds * 1000:.1f}" for name, seconds in entries)
+
+
+def format_tree(root: Span) -> str:
+    """Função que formata o trace em árvore, com início relativo e duração de cada fase
+    Args:
+        root (Span): Raiz do trace
+    Returns:
+        tree (str): Uma linha por span, indentada pela profundidade
+    """
+    lines = []
+
+    def walk(current: Span, depth: int):
+        attrs = "".join(f" {key}={value}" for key, value in current.attrs.items())
+        offset = (current.start - root.start) * 1000
+        lines.append(f"{'  ' * depth}{current.name} +{offset:.1f}ms {current.duration * 1000:.1f}ms{attrs}")
+        for child in current.children:
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
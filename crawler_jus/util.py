@@ -1,11 +1,26 @@
+import os
 import re
 import httpx
 import logging
+from datetime import date, datetime
 from api.exceptions import TJRSUpstreamError
 from bs4 import BeautifulSoup
+from redis.exceptions import RedisError
+from crawler_jus.cache import get_main_js_artifact, set_main_js_artifact
+from crawler_jus.metrics import MAIN_JS_FETCHES
 
 logger = logging.getLogger()
 
+# endereços do TJRS; apontados para outro servidor (ex.: benchmarks/mock_tjrs.py) em testes de carga
+TJRS_CONSULTA_URL = os.getenv("TJRS_CONSULTA_URL", "https://consulta.tjrs.jus.br/consulta-processual/")
+TJRS_SERVICE_URL = os.getenv(
+    "TJRS_SERVICE_URL", "https://consulta-processual-service.tjrs.jus.br/api/consulta-service"
+).rstrip("/")
+
+# cliente http compartilhado e último main.js processado
+_http_client: httpx.AsyncClient | None = None
+_main_js_artifact: dict | None = None
+
 def remove_blank_space(txt: str) -> str:
     """Função que remove espaços de um texto
     Args:
@@ -56,7 +71,7 @@ def build_url_processo(npu: str, comarca: str) -> str:
     Returns:
         url (str): Url pronta
     """
-    return f"https://consulta-processual-service.tjrs.jus.br/api/consulta-service/v1/consultaProcesso?numeroProcesso={npu}&codComarca={comarca}"
+    return f"{TJRS_SERVICE_URL}/v1/consultaProcesso?numeroProcesso={npu}&codComarca={comarca}"
 
 
 def build_url_movimento(npu: str, comarca: str) -> str:
@@ -67,21 +82,37 @@ def build_url_movimento(npu: str, comarca: str) -> str:
     Returns:
         url (str): Url pronta
     """
-    return f"https://consulta-processual-service.tjrs.jus.br/api/consulta-service/v1/consultaMovimentacao?numeroProcesso={npu}&codComarca={comarca}"
+    return f"{TJRS_SERVICE_URL}/v1/consultaMovimentacao?numeroProcesso={npu}&codComarca={comarca}"
 
 
-async def find_main_js() -> str:
+def get_http_client() -> httpx.AsyncClient:
+    """Função que devolve o cliente http compartilhado (pool de conexões) usado na página da consulta e no main.js
+    Returns:
+        client (httpx.AsyncClient): Cliente reaproveitado entre chamadas
     """
-    Função que descobre nome do arquivo main_js do tribunal
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=10, limits=httpx.Limits(max_connections=4))
+    return _http_client
+
+
+async def close_http_client():
+    """Função que fecha o cliente http compartilhado"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def parse_main_js_url(html: str, url_base: str = None) -> str | None:
+    """Função que encontra na página da consulta a url do main.<hash>.js
     Args:
+        html (str): Html da página da consulta processual
+        url_base (str): Url da página, base para caminhos relativos
     Returns:
-    full_url (str): retorna url completa do main_js
+        full_url (str | None): Url completa do main_js, None se não encontrado
     """
-
-    url_base = "https://consulta.tjrs.jus.br/consulta-processual/"
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.get(url_base)
-        html = response.text
+    url_base = url_base or TJRS_CONSULTA_URL
     soup = BeautifulSoup(html, 'html.parser')
 
     # Busca todos os scripts e filtra pelo que começa com 'main.'
@@ -90,25 +121,38 @@ async def find_main_js() -> str:
 
     if main_script_url:
         # Se o caminho for relativo, concatena com a base
-        full_url = main_script_url if main_script_url.startswith('http') else url_base + main_script_url
-        return full_url
+        return main_script_url if main_script_url.startswith('http') else url_base + main_script_url
+    return None
 
 
-async def find_obfuscate_and_extract_big_int() -> tuple:
+def bundle_name(main_js_url: str) -> str:
+    """Função que extrai o nome do bundle (ex.: main.3f9a1c.js), que muda a cada deploy do tribunal
+    Args:
+        main_js_url (str): Url do main_js
+    Returns:
+        name (str): Nome do arquivo, sem query string
+    """
+    return main_js_url.split("?")[0].rsplit("/", 1)[-1]
+
+
+async def find_main_js() -> str:
     """
-    Função que encontra metodo de obfuscação do secrete e extrai numeros base do calculo
+    Função que descobre nome do arquivo main_js do tribunal
     Args:
     Returns:
-    big_ints (tuple): Tupla com os dois numeros do calculo
+    full_url (str): retorna url completa do main_js
     """
+    response = await get_http_client().get(TJRS_CONSULTA_URL)
+    return parse_main_js_url(response.text)
 
-    main_js_url = await find_main_js()
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.get(main_js_url)
-   
-    
-    js_code = response.text
 
+def extract_big_ints_from_js(js_code: str) -> tuple[int, int]:
+    """Função que encontra no main.js o metodo de obfuscação do secret e extrai os numeros base do calculo
+    Args:
+        js_code (str): Conteúdo do main.js
+    Returns:
+        big_ints (tuple[int, int]): Os dois numeros do calculo
+    """
     match =  re.search( r"obfuscation\s*\([^)]*\)\s*\{[\s\S]*?BigInt\s*\(\s*\d+\s*\)[\s\S]*?BigInt\s*\(\s*\d+\s*\)",js_code)
     if not match:
         raise Exception("Função obfuscation não encontrada")
@@ -119,9 +163,76 @@ async def find_obfuscate_and_extract_big_int() -> tuple:
         logger.error(f"Falha Crítica: A estrutura do JS mudou. Encontrados apenas {len(big_ints)} BigInts.")
         raise TJRSUpstreamError("A lógica de ofuscação do Tribunal mudou e o scraper precisa de atualização manual.")
 
+    return int(big_ints[0]), int(big_ints[1])
+
+
+async def load_main_js_artifact() -> dict | None:
+    """Função que lê o último main.js processado, da memória ou do redis (réplica recém iniciada)
+    Returns:
+        artifact (dict | None): bundle, url, validadores da página (etag, last_modified) e bigints
+    """
+    global _main_js_artifact
+    if _main_js_artifact is None:
+        try:
+            _main_js_artifact = await get_main_js_artifact()
+        except RedisError as e:
+            logger.warning(f"Redis indisponível para o artefato do main.js | error={e}")
+    return _main_js_artifact
+
+
+async def save_main_js_artifact(artifact: dict) -> None:
+    global _main_js_artifact
+    _main_js_artifact = artifact
+    try:
+        await set_main_js_artifact(artifact)
+    except RedisError as e:
+        logger.warning(f"Redis indisponível para o artefato do main.js | error={e}")
+
+
+async def find_obfuscate_and_extract_big_int() -> tuple[int, int]:
+    """
+    Função que encontra metodo de obfuscação do secrete e extrai numeros base do calculo.
+    A página da consulta é pedida de forma condicional (If-None-Match/If-Modified-Since) e o main.js
+    só é baixado e varrido quando o nome do bundle muda; senão os BigInts do artefato salvo são reaproveitados
+    Args:
+    Returns:
+    big_ints (tuple[int, int]): Tupla com os dois numeros do calculo
+    """
+    artifact = await load_main_js_artifact()
+    client = get_http_client()
+
+    headers = {}
+    if artifact is not None:
+        if artifact.get("etag"):
+            headers["If-None-Match"] = artifact["etag"]
+        if artifact.get("last_modified"):
+            headers["If-Modified-Since"] = artifact["last_modified"]
+
+    response = await client.get(TJRS_CONSULTA_URL, headers=headers)
+    if response.status_code == 304 and artifact is not None:
+        MAIN_JS_FETCHES.labels("page_not_modified").inc()
+        return tuple(artifact["bigints"])
+
+    main_js_url = parse_main_js_url(response.text)
+    if main_js_url is None:
+        raise TJRSUpstreamError("main.js não encontrado na página da consulta processual")
+
+    validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    bundle = bundle_name(main_js_url)
+    if artifact is not None and artifact.get("bundle") == bundle:
+        MAIN_JS_FETCHES.labels("bundle_unchanged").inc()
+        if validators != {"etag": artifact.get("etag"), "last_modified": artifact.get("last_modified")}:
+            await save_main_js_artifact({**artifact, **validators})
+        return tuple(artifact["bigints"])
+
+    # bundle novo: baixa e extrai
+    MAIN_JS_FETCHES.labels("downloaded").inc()
+    js_response = await client.get(main_js_url)
+    big_ints = extract_big_ints_from_js(js_response.text)
+    logger.info(f"main.js novo do TJRS | bundle={bundle}")
+    await save_main_js_artifact({"bundle": bundle, "url": main_js_url, "bigints": list(big_ints), **validators})
     return big_ints
-    
-    
+
 
 def normalize_npu_to_20_digits(npu: str) -> str:
     """
@@ -153,3 +264,16 @@ def normalize_npu_to_20_digits(npu: str) -> str:
         return digits.zfill(20)
 
     raise ValueError("NPU inválido (tamanho inesperado)")
+
+
+def parse_data_movimento(data: str | None) -> date | None:
+    """Função que converte a data de um movimento (dd/mm/aaaa, com ou sem horário) em date
+    Args:
+        data (str | None): Data do movimento como vem do TJRS
+    Returns:
+        data (date | None): Data do movimento, None se inválida
+    """
+    try:
+        return datetime.strptime((data or "")[:10], "%d/%m/%Y").date()
+    except ValueError:
+        return None
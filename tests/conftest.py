@@ -0,0 +1,25 @@
+import pytest
+import fakeredis
+from unittest.mock import AsyncMock
+from crawler_jus import cache
+from crawler_jus.services import search_service
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """redis em memória no lugar do cliente do módulo cache, com L1 e contadores zerados"""
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(cache, "redis_client", client)
+    monkeypatch.setattr(
+        cache, "local_cache", cache.LocalCache(max_entries=16, max_bytes=1_000_000, max_ttl=30)
+    )
+    monkeypatch.setattr(cache, "redis_stats", {"hits": 0, "misses": 0})
+    return client
+
+
+@pytest.fixture
+def no_cache(monkeypatch):
+    """Cache do SearchService sempre vazia e sem gravação: toda busca vai ao crawler"""
+    monkeypatch.setattr(search_service, "get_many_cache", AsyncMock(side_effect=lambda keys: [None] * len(keys)))
+    monkeypatch.setattr(search_service, "set_cache", AsyncMock(return_value=None))
+    monkeypatch.setattr(search_service, "set_list_cache", AsyncMock(return_value=None))
@@ -1,15 +1,16 @@
 import json
+import asyncio
 import pytest
 from httpx import AsyncClient, ASGITransport
+from api import router
 from api.router import app
 from api.exceptions import TJRSRateLimit
 from crawler_jus.crawler import Crawler
 from crawler_jus.services import search_service
-from unittest.mock import AsyncMock
 
 
 class FakeCrawler:
-    async def request_page(self, url: str) -> str:
+    async def request_page(self, url: str, priority=None) -> str:
         if "consultaProcesso" in url:
             return json.dumps(
                 {
@@ -67,16 +68,14 @@ async def test_search_npu_success(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_search_npu_rate_limit(monkeypatch):
+async def test_search_npu_rate_limit(no_cache):
     transport = ASGITransport(app=app)
 
     class Rate_limit:
-        async def request_page(self, url: str) -> str:
+        async def request_page(self, url: str, priority=None) -> str:
             raise TJRSRateLimit("Limite", retry_after=30)
 
     app.state.crawler = Rate_limit()
-    monkeypatch.setattr(search_service, "get_cache", AsyncMock(return_value=None))
-    monkeypatch.setattr(search_service, "set_cache", AsyncMock(return_value=None))
 
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.post(
@@ -84,3 +83,237 @@ async def test_search_npu_rate_limit(monkeypatch):
         )
     assert response.status_code == 429
     assert response.headers.get("retry-after") == "30"
+
+
+@pytest.mark.asyncio
+async def test_search_npu_batch_mixed_results(no_cache):
+    transport = ASGITransport(app=app)
+
+    class PartialRateLimit(FakeCrawler):
+        async def request_page(self, url: str, priority=None) -> str:
+            if "50560778420258210008" in url:
+                raise TJRSRateLimit("Limite", retry_after=30)
+            return await super().request_page(url)
+
+    app.state.crawler = PartialRateLimit()
+
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post(
+            "/search_npu/batch",
+            json={
+                "processos": [
+                    {"npu": "5001646-66.2026.8.21.0008"},
+                    {"npu": "50016466620268210008"},
+                    {"npu": "5056077-84.2025.8.21.0008"},
+                ]
+            },
+        )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 2
+    ok, limited = body["results"]
+    assert ok["status"] == "ok"
+    assert ok["data"]["nomeClasse"] == "CUMPRIMENTO DE SENTENÇA"
+    assert limited["status"] == "error"
+    assert limited["error"]["type"] == "TJRSRateLimit"
+    assert limited["error"]["retry_after"] == 30
+
+
+@pytest.mark.asyncio
+async def test_search_npu_stream_ndjson(no_cache):
+    transport = ASGITransport(app=app)
+    app.state.crawler = FakeCrawler()
+
+    body = "\n".join(
+        [
+            json.dumps({"npu": "5001646-66.2026.8.21.0008"}),
+            json.dumps({"npu": "123"}),
+            json.dumps({"npu": "5056077-84.2025.8.21.0008"}),
+        ]
+    )
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post(
+            "/search_npu/stream",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    items = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {item["index"]: item for item in items}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[0]["status"] == "ok"
+    assert by_index[1]["error"]["type"] == "ValidationError"
+    assert by_index[2]["npu"] == "5056077-84.2025.8.21.0008"
+
+
+def stream_scope(spec_version: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": spec_version},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/search_npu/stream",
+        "raw_path": b"/search_npu/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/x-ndjson")],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("spec_version", ["2.3", "2.4"])
+async def test_search_npu_stream_reads_body_sent_in_pieces(no_cache, spec_version):
+    app.state.crawler = FakeCrawler()
+
+    incoming: asyncio.Queue = asyncio.Queue()
+    bodies = []
+    answered = asyncio.Event()
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            bodies.append(message["body"])
+            answered.set()
+
+    task = asyncio.create_task(app(stream_scope(spec_version), incoming.get, send))
+    line = json.dumps({"npu": "5001646-66.2026.8.21.0008"}).encode()
+    # linha dividida entre dois pedaços do corpo
+    await incoming.put({"type": "http.request", "body": line[:10], "more_body": True})
+    await incoming.put({"type": "http.request", "body": line[10:] + b"\n", "more_body": True})
+    if spec_version == "2.4":
+        # corpo lido aos poucos: a primeira resposta sai com o corpo ainda aberto
+        await asyncio.wait_for(answered.wait(), 2)
+    await incoming.put({"type": "http.request", "body": b'{"npu": "123"}', "more_body": False})
+    await asyncio.wait_for(task, 2)
+
+    items = [json.loads(line) for line in b"".join(bodies).splitlines()]
+    assert sorted(item["index"] for item in items) == [0, 1]
+    by_index = {item["index"]: item for item in items}
+    assert by_index[0]["status"] == "ok"
+    assert by_index[1]["error"]["type"] == "ValidationError"
+
+
+@pytest.mark.asyncio
+async def test_search_npu_stream_stops_when_client_disconnects(no_cache):
+    release = asyncio.Event()
+
+    class StuckCrawler(FakeCrawler):
+        async def request_page(self, url: str, priority=None):
+            if "5056077" in url:
+                # consulta que só termina no fim do teste: a resposta não pode esperar por ela
+                await release.wait()
+            return await super().request_page(url)
+
+    app.state.crawler = StuckCrawler()
+    body = b"".join(
+        json.dumps({"npu": npu}).encode() + b"\n" for npu in ["5001646-66.2026.8.21.0008", "5056077-84.2025.8.21.0008"]
+    )
+    messages = [{"type": "http.request", "body": body}, {"type": "http.disconnect"}]
+    bodies = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            bodies.append(message["body"])
+
+    await asyncio.wait_for(app(stream_scope("2.3"), receive, send), 2)
+
+    # cliente desconectado: a resposta termina sem esperar a consulta pendente
+    assert bodies == []
+    assert messages == []
+
+    pending = list(search_service._inflight.values())
+    release.set()
+    await asyncio.gather(*pending)
+
+
+@pytest.mark.asyncio
+async def test_read_ndjson_npus_limits_line_size():
+    async def chunks():
+        yield json.dumps({"npu": "5001646-66.2026.8.21.0008"}).encode() + b"\n" + b"x" * 3000
+        yield b"x" * 3000
+        yield b"x" * 3000 + b"\n" + json.dumps({"npu": "50560778420258210008"}).encode()
+
+    items = [item async for item in router.read_ndjson_npus(chunks())]
+
+    assert items[0] == "5001646-66.2026.8.21.0008"
+    assert isinstance(items[1], ValueError)
+    assert items[2] == "5056077-84.2025.8.21.0008"
+    assert len(items) == 3
+
+
+@pytest.mark.asyncio
+async def test_priority_from_header_and_route_default(no_cache):
+    transport = ASGITransport(app=app)
+
+    class RecordingCrawler(FakeCrawler):
+        def __init__(self):
+            self.priorities = []
+
+        async def request_page(self, url: str, priority=None) -> str:
+            self.priorities.append(priority)
+            return await super().request_page(url)
+
+    crawler = RecordingCrawler()
+    app.state.crawler = crawler
+
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        await ac.post(
+            "/search_npu", json={"npu": "5001646-66.2026.8.21.0008"}, headers={"X-Priority": "refresh"}
+        )
+        await ac.post("/search_npu/batch", json={"processos": [{"npu": "5056077-84.2025.8.21.0008"}]})
+        invalid = await ac.post(
+            "/search_npu", json={"npu": "5001646-66.2026.8.21.0008"}, headers={"X-Priority": "urgente"}
+        )
+
+    assert crawler.priorities == ["refresh", "refresh", "bulk", "bulk"]
+    assert invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header_and_metrics(no_cache):
+    app.state.crawler = FakeCrawler()
+    transport = ASGITransport(app=app)
+
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post("/search_npu", json={"npu": "5001646-66.2026.8.21.0008"})
+        metrics = await ac.get("/metrics")
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith("total;dur=")
+    for phase in ("cache;dur=", "fetch_basic;dur=", "fetch_movimentos;dur=", "extract;dur="):
+        assert phase in timing
+
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    assert 'tjrs_search_npu_seconds_count{route="/search_npu"}' in metrics.text
+    assert 'tjrs_cache_resources_total{resource="basic",status="miss"}' in metrics.text
+    assert "server-timing" not in metrics.headers
+
+
+@pytest.mark.asyncio
+async def test_validate_npu_batch():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post(
+            "/validate_npu/batch",
+            json={"npus": ["5001646-66.2026.8.21.0008", "50016466720268210008", "123456789012345678901"]},
+        )
+        empty = await ac.post("/validate_npu/batch", json={"npus": []})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 3,
+        "invalid_count": 2,
+        "normalized": ["5001646-66.2026.8.21.0008", "5001646-67.2026.8.21.0008", None],
+        "invalid": [False, True, True],
+    }
+    assert empty.status_code == 422
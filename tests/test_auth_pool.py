@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from crawler_jus.auth_pool import AuthPool
+
+
+class TokenFactory:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        return f"Basic token-{self.calls}"
+
+
+@pytest.mark.asyncio
+async def test_pool_warms_up_and_rotates_tokens():
+    create = TokenFactory()
+    pool = AuthPool(create, size=2, ttl_seconds=300, refresh_lead_seconds=30)
+    try:
+        await pool.get()
+        await asyncio.sleep(0.01)
+
+        assert create.calls == 2
+        assert {await pool.get() for _ in range(4)} == {"Basic token-1", "Basic token-2"}
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_token_is_cooled_down():
+    create = TokenFactory()
+    pool = AuthPool(create, size=2, ttl_seconds=300, cooldown_seconds=60)
+    try:
+        await pool.get()
+        await asyncio.sleep(0.01)
+        pool.cooldown("Basic token-1")
+
+        assert {await pool.get() for _ in range(4)} == {"Basic token-2"}
+        assert pool.stats() == {"size": 2, "valid": 2, "cooling_down": 1}
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_replaced_before_expiring():
+    create = TokenFactory()
+    pool = AuthPool(create, size=1, ttl_seconds=0.2, refresh_lead_seconds=0.1)
+    try:
+        assert await pool.get() == "Basic token-1"
+        await asyncio.sleep(0.15)
+
+        assert create.calls == 2
+        assert await pool.get() == "Basic token-2"
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_tokens_from_previous_generation_stay_out_of_pool():
+    release = asyncio.Event()
+    calls = []
+
+    async def create() -> str:
+        calls.append(len(calls) + 1)
+        if len(calls) == 2:
+            # resolução lenta iniciada antes da troca de geração
+            await release.wait()
+        return f"Basic token-{len(calls)}"
+
+    pool = AuthPool(create, size=1, ttl_seconds=300)
+    try:
+        assert (await pool.get_token()).generation == 0
+        stale = asyncio.create_task(pool.get_token(force_refresh=True))
+        await asyncio.sleep(0.01)
+
+        pool.invalidate()
+        assert pool.advance("Basic token-1") == 1
+        release.set()
+
+        assert (await stale).generation == 0
+        assert pool.held() == set()
+        token = await pool.get_token()
+        assert (token.value, token.generation) == ("Basic token-3", 1)
+    finally:
+        await pool.close()
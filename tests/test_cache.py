@@ -0,0 +1,92 @@
+import json
+import pytest
+from crawler_jus import cache
+from crawler_jus.codec import CacheCodec, HEADERS
+
+
+@pytest.fixture
+def fake_redis(fake_redis, monkeypatch):
+    # L1 pequena para os testes de despejo
+    monkeypatch.setattr(
+        cache, "local_cache", cache.LocalCache(max_entries=2, max_bytes=10_000, max_ttl=30)
+    )
+    return fake_redis
+
+
+@pytest.mark.asyncio
+async def test_get_cache_serves_hot_key_from_l1(fake_redis):
+    await fake_redis.set("tjrs:8:1", json.dumps({"a": 1}), ex=60)
+
+    assert await cache.get_cache("tjrs:8:1") == {"a": 1}
+    assert await cache.get_cache("tjrs:8:1") == {"a": 1}
+
+    stats = cache.cache_stats()
+    assert stats["redis"] == {"hits": 1, "misses": 0}
+    assert stats["l1"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_l1_respects_redis_ttl(fake_redis):
+    await fake_redis.set("tjrs:8:1", json.dumps({"a": 1}), ex=5)
+    await cache.get_cache("tjrs:8:1")
+
+    _, expires_at, _ = cache.local_cache._entries["tjrs:8:1"]
+    now = cache.time.monotonic()
+    assert expires_at - now <= 5
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = cache.LocalCache(max_entries=2, max_bytes=10_000, max_ttl=30)
+    local.set("a", 1, 10, 1)
+    local.set("b", 2, 10, 1)
+    local.get("a")
+    local.set("c", 3, 10, 1)
+
+    assert local.get("b") is None
+    assert local.get("a") == 1
+    assert local.get("c") == 3
+
+
+def test_apply_invalidation_ignores_own_messages(fake_redis):
+    cache.local_cache.set("tjrs:8:1", {"a": 1}, 10, 1)
+
+    cache.apply_invalidation(json.dumps({"origin": cache.INSTANCE_ID, "key": "tjrs:8:1"}))
+    assert cache.local_cache.get("tjrs:8:1") == {"a": 1}
+
+    cache.apply_invalidation(json.dumps({"origin": "outra-replica", "key": "tjrs:8:1"}))
+    assert cache.local_cache.get("tjrs:8:1") is None
+
+
+@pytest.mark.asyncio
+async def test_legacy_json_entries_are_still_readable(fake_redis):
+    await fake_redis.set("tjrs:8:1", json.dumps({"nome": "PETRÓLEO"}, ensure_ascii=False), ex=60)
+
+    assert await cache.get_cache("tjrs:8:1") == {"nome": "PETRÓLEO"}
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_codec_roundtrip_with_version_header(compression):
+    codec = CacheCodec("json", compression, compress_threshold=64)
+    value = {"movimentos": [{"data": "23/01/2026", "descricao": "Conclusos"}] * 20}
+
+    data, size = codec.encode(value)
+
+    assert data[0] == HEADERS[("json", compression)]
+    assert codec.decode(data) == (value, size)
+
+
+@pytest.mark.asyncio
+async def test_bigints_are_stored_as_text_in_both_keys(fake_redis):
+    bigints = (2**70 + 1, 7654321)
+    await cache.set_shared_bigints(bigints)
+    await cache.set_main_js_artifact({"bundle": "main.aaaa.js", "bigints": list(bigints)})
+
+    shared = json.loads(await fake_redis.get(cache.CREDENTIALS_PREFIX + "bigints"))
+    artifact = json.loads(await fake_redis.get(cache.CREDENTIALS_PREFIX + "main_js"))
+    assert shared == artifact["bigints"] == [str(2**70 + 1), "7654321"]
+    assert await cache.get_shared_bigints() == bigints
+    assert (await cache.get_main_js_artifact())["bigints"] == bigints
+
+    # artefato gravado com os BigInts como números continua legível
+    await fake_redis.set(cache.CREDENTIALS_PREFIX + "main_js", json.dumps({"bundle": "main.aaaa.js", "bigints": [1, 2]}))
+    assert (await cache.get_main_js_artifact())["bigints"] == (1, 2)
@@ -0,0 +1,68 @@
+import time
+import pytest
+from unittest.mock import AsyncMock
+from api.exceptions import TJRSCircuitOpen
+from crawler_jus.circuit_breaker import CircuitBreaker
+from crawler_jus.services import search_service
+from crawler_jus.services.search_service import SearchService
+from tests.test_api import FakeCrawler
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=0.05)
+
+    for _ in range(3):
+        breaker.before_call()
+        breaker.on_failure("TJRS 5xx (503)")
+
+    assert breaker.state == "open"
+    with pytest.raises(TJRSCircuitOpen) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after >= 1
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    # só uma chamada de teste por vez
+    with pytest.raises(TJRSCircuitOpen):
+        breaker.before_call()
+
+    breaker.on_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0.0)
+    breaker.on_failure("Timeout consultando TJRS")
+    assert breaker.state == "half_open"
+
+    breaker.before_call()
+    breaker.recovery_seconds = 60
+    breaker.on_failure("Timeout consultando TJRS")
+
+    assert breaker.state == "open"
+    assert breaker.stats()["last_failure"] == "Timeout consultando TJRS"
+
+
+class DownCrawler(FakeCrawler):
+    async def request_page(self, url: str, priority=None) -> str:
+        raise TJRSCircuitOpen(retry_after=12)
+
+
+@pytest.mark.asyncio
+async def test_force_refresh_falls_back_to_cache_while_breaker_open(no_cache, monkeypatch):
+    basic = {"fetched_at": 0.0, "data": {"nomeClasse": "ANTIGA"}}
+    meta = {"fetched_at": 0.0, "total": 0}
+    monkeypatch.setattr(search_service, "get_many_cache", AsyncMock(return_value=[basic, meta]))
+
+    result = await SearchService(DownCrawler()).search_npu("5001646-66.2026.8.21.0008", force_refresh=True)
+
+    assert result["nomeClasse"] == "ANTIGA"
+    assert result["cache"]["status"] == "stale"
+
+
+@pytest.mark.asyncio
+async def test_breaker_open_without_cache_raises(no_cache):
+    with pytest.raises(TJRSCircuitOpen):
+        await SearchService(DownCrawler()).search_npu("5001646-66.2026.8.21.0008")
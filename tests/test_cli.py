@@ -0,0 +1,150 @@
+import json
+import pytest
+from api.enums import RequestPriority
+from crawler_jus import cli
+from tests.test_api import FakeCrawler
+
+VALID = ["5001646-66.2026.8.21.0008", "50016466620268210008", "5056077-84.2025.8.21.0008"]
+
+
+class CountingCrawler(FakeCrawler):
+    def __init__(self):
+        self.urls = []
+
+    async def request_page(self, url: str, priority=None) -> str:
+        self.urls.append(url)
+        return await super().request_page(url)
+
+
+pytestmark = pytest.mark.usefixtures("fake_redis")
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_read_npus_from_csv_and_txt(tmp_path):
+    csv_path = tmp_path / "npus.csv"
+    csv_path.write_text("id,npu\n1,5001646-66.2026.8.21.0008\n2,\n3, 5056077-84.2025.8.21.0008 \n")
+    txt_path = tmp_path / "npus.txt"
+    txt_path.write_text("# backfill\n5001646-66.2026.8.21.0008\n\nabc\n")
+
+    assert list(cli.read_npus(str(csv_path))) == [(1, "5001646-66.2026.8.21.0008"), (2, "5056077-84.2025.8.21.0008")]
+    assert list(cli.read_npus(str(txt_path))) == [(1, "5001646-66.2026.8.21.0008"), (2, "abc")]
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_one_row_per_process_and_movement(tmp_path):
+    source = tmp_path / "npus.txt"
+    source.write_text("\n".join([VALID[0], "1234", VALID[2]]))
+    out = tmp_path / "out"
+
+    summary = await cli.run_bulk(str(source), str(out), concurrency=2, crawler=CountingCrawler())
+
+    assert summary == {"ok": 2, "error": 1, "skipped": 0}
+    processos = sorted(read_jsonl(out / "processos.jsonl"), key=lambda row: row["line"])
+    assert [row["status"] for row in processos] == ["ok", "error", "ok"]
+    assert processos[0]["nomeClasse"] == "CUMPRIMENTO DE SENTENÇA"
+    assert processos[0]["movimentos_total"] == 1
+    assert processos[1]["npu"] == "1234" and processos[1]["error"]["status_code"] == 422
+    movimentos = read_jsonl(out / "movimentos.jsonl")
+    assert {row["npu"] for row in movimentos} == {VALID[0], VALID[2]}
+    assert json.loads((out / "checkpoint.json").read_text())["watermark"] == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_resumes_after_checkpoint(tmp_path):
+    source = tmp_path / "npus.txt"
+    source.write_text("\n".join(VALID))
+    out = tmp_path / "out"
+    out.mkdir()
+    # queda depois de gravar o registro 1 e o 3
+    checkpoint = cli.Checkpoint(out / "checkpoint.json", str(source.resolve()))
+    checkpoint.mark(1)
+    checkpoint.mark(3)
+    checkpoint.save()
+
+    crawler = CountingCrawler()
+    summary = await cli.run_bulk(str(source), str(out), crawler=crawler)
+
+    assert summary == {"ok": 1, "error": 0, "skipped": 2}
+    assert [row["line"] for row in read_jsonl(out / "processos.jsonl")] == [2]
+    # o registro 3 (outro processo) não é consultado de novo
+    assert all("50016466620268210008" in url for url in crawler.urls)
+    assert json.loads((out / "checkpoint.json").read_text())["watermark"] == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_resume_discards_rows_written_after_checkpoint(tmp_path):
+    source = tmp_path / "npus.txt"
+    source.write_text("\n".join([VALID[0], "1234"]))
+    out = tmp_path / "out"
+    await cli.run_bulk(str(source), str(out), crawler=CountingCrawler())
+
+    # queda depois do checkpoint: registro 3 gravado inteiro e outro pela metade
+    source.write_text("\n".join([VALID[0], "1234", VALID[2]]))
+    for name in ("processos.jsonl", "movimentos.jsonl"):
+        with open(out / name, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"line": 3, "npu": VALID[2]}) + "\n" + '{"line": 3, "np')
+
+    summary = await cli.run_bulk(str(source), str(out), crawler=CountingCrawler())
+
+    assert summary == {"ok": 1, "error": 0, "skipped": 2}
+    processos = read_jsonl(out / "processos.jsonl")
+    assert sorted(row["line"] for row in processos) == [1, 2, 3]
+    assert next(row for row in processos if row["line"] == 3)["status"] == "ok"
+    assert [row["npu"] for row in read_jsonl(out / "movimentos.jsonl")] == [VALID[0], VALID[2]]
+    positions = json.loads((out / "checkpoint.json").read_text())["positions"]
+    assert positions["processos"] == (out / "processos.jsonl").stat().st_size
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_rejects_other_input(tmp_path):
+    source = tmp_path / "npus.txt"
+    source.write_text(VALID[0])
+    out = tmp_path / "out"
+    out.mkdir()
+    cli.Checkpoint(out / "checkpoint.json", "/outro/arquivo.txt").save()
+
+    with pytest.raises(ValueError):
+        await cli.run_bulk(str(source), str(out), crawler=CountingCrawler())
+
+
+@pytest.mark.asyncio
+async def test_bulk_parquet_writes_complete_part_per_checkpoint(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    source = tmp_path / "npus.txt"
+    source.write_text("\n".join([VALID[0], "1234", VALID[2]]))
+    out = tmp_path / "out"
+
+    await cli.run_bulk(str(source), str(out), output_format="parquet", checkpoint_every=2, crawler=CountingCrawler())
+
+    parts = sorted(out.glob("processos-*.parquet"))
+    assert [part.name for part in parts] == ["processos-00001.parquet", "processos-00002.parquet"]
+    rows = [row for part in parts for row in parquet.read_table(part).to_pylist()]
+    assert sorted(row["line"] for row in rows) == [1, 2, 3]
+    ok = next(row for row in rows if row["line"] == 1)
+    assert json.loads(ok["partes"])[0]["descricaoTipo"] == "EXEQUENTE"
+
+
+@pytest.mark.asyncio
+async def test_bulk_crawler_scheduler_follows_concurrency(tmp_path, monkeypatch):
+    created = []
+
+    class ClosingCrawler(CountingCrawler):
+        def __init__(self, **kwargs):
+            super().__init__()
+            created.append(kwargs)
+
+        async def close(self):
+            pass
+
+    monkeypatch.setattr(cli, "Crawler", ClosingCrawler)
+    source = tmp_path / "npus.txt"
+    source.write_text(VALID[0])
+
+    await cli.run_bulk(str(source), str(tmp_path / "out"), concurrency=20)
+
+    scheduler = created[0]["scheduler"]
+    assert scheduler.max_concurrency == 40
+    assert scheduler.caps[RequestPriority.BULK] == 40
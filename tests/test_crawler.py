@@ -0,0 +1,217 @@
+import time
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from crawler_jus import cache, crawler as crawler_module
+from crawler_jus.crawler import Crawler
+from crawler_jus.rate_limit import AdaptiveRateLimiter
+from crawler_jus.circuit_breaker import CircuitBreaker
+from crawler_jus.scheduler import UpstreamScheduler
+from curl_cffi.requests.exceptions import Timeout as CurlTimeout, ConnectionError as CurlConnectionError
+from api.exceptions import TJRSCircuitOpen, TJRSNetworkError
+
+
+@pytest.mark.asyncio
+async def test_bigints_and_auth_are_shared_between_crawlers(fake_redis, monkeypatch):
+    extract = AsyncMock(return_value=["1234567", "7654321"])
+    monkeypatch.setattr(crawler_module, "find_obfuscate_and_extract_big_int", extract)
+    first, second = Crawler(shared_credentials=True), Crawler(shared_credentials=True)
+    first.create_authorization = AsyncMock(return_value="Basic shared")
+    second.create_authorization = AsyncMock(return_value="Basic own")
+    try:
+        assert await first.get_big_ints() == await second.get_big_ints() == (1234567, 7654321)
+        assert extract.await_count == 1
+
+        token, expires_at = await first.acquire_authorization()
+        assert token == "Basic shared"
+        assert expires_at > time.time()
+        assert await second.acquire_authorization() == (token, expires_at)
+        second.create_authorization.assert_not_awaited()
+    finally:
+        await first.close()
+        await second.close()
+
+
+@pytest.mark.asyncio
+async def test_forced_bigints_refresh_skips_rejected_shared_value(fake_redis, monkeypatch):
+    extract = AsyncMock(side_effect=[["1", "2"], ["3", "4"]])
+    monkeypatch.setattr(crawler_module, "find_obfuscate_and_extract_big_int", extract)
+    crawler = Crawler(shared_credentials=True)
+    try:
+        assert await crawler.get_big_ints() == (1, 2)
+        assert await crawler.get_big_ints(force_refresh=True) == (3, 4)
+        assert await cache.get_shared_bigints() == (3, 4)
+    finally:
+        await crawler.close()
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+        self.headers = {"Content-Type": "application/json"}
+
+
+@pytest.mark.asyncio
+async def test_request_page_decodes_each_body_once(monkeypatch):
+    decoded = []
+    json_loads = crawler_module.json_loads
+
+    def counting_loads(data):
+        decoded.append(data)
+        return json_loads(data)
+
+    monkeypatch.setattr(crawler_module, "json_loads", counting_loads)
+    crawler = Crawler(shared_credentials=False, distributed_rate_limit=False)
+    crawler.get_auth = AsyncMock(return_value=("Basic token", 0))
+    crawler.sleep_backoff = AsyncMock()
+    crawler.upstream_request = AsyncMock(
+        side_effect=[
+            FakeResponse(200, '{"exceptionKey": 429, "messages": ["Muitas requisições"]}'),
+            FakeResponse(200, '{"data": [{"data": "23/01/2026", "descricao": "Conclusos"}]}'),
+        ]
+    )
+    try:
+        payload = await crawler.request_page("https://consulta.tjrs.jus.br/movimentos")
+    finally:
+        await crawler.close()
+
+    assert payload == {"data": [{"data": "23/01/2026", "descricao": "Conclusos"}]}
+    assert len(decoded) == 2
+    assert crawler.extract_movimentos(payload) == [{"data": "23/01/2026", "descricao": "Conclusos"}]
+
+
+@pytest.mark.asyncio
+async def test_401_burst_refreshes_credentials_once(monkeypatch):
+    extract = AsyncMock(return_value=["1234567", "7654321"])
+    monkeypatch.setattr(crawler_module, "find_obfuscate_and_extract_big_int", extract)
+    crawler = Crawler(
+        shared_credentials=False,
+        distributed_rate_limit=False,
+        rate_limiter=AdaptiveRateLimiter(rate=1000, max_rate=1000),
+    )
+    tokens = iter(f"Basic v{i}" for i in range(100))
+    crawler.create_authorization = AsyncMock(side_effect=lambda: next(tokens))
+
+    async def upstream_request(method, url, endpoint="consulta", headers=None, **kwargs):
+        await asyncio.sleep(0.01)
+        if headers["Authorization"] == "Basic v0":
+            return FakeResponse(401, "")
+        return FakeResponse(200, '{"data": []}')
+
+    crawler.upstream_request = upstream_request
+    try:
+        # primeiro token (geração 0) resolvido antes da rajada
+        assert await crawler.get_auth() == ("Basic v0", 0)
+        results = await asyncio.gather(*(crawler.request_page(f"https://tjrs/{i}") for i in range(20)))
+    finally:
+        await crawler.close()
+
+    assert results == [{"data": []}] * 20
+    assert extract.await_count == 1
+    assert crawler.create_authorization.await_count == 2
+    assert crawler.credentials_generation == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [CurlTimeout("Operation timed out"), CurlConnectionError("Could not resolve host")])
+async def test_transport_errors_open_circuit_breaker(error):
+    crawler = Crawler(
+        shared_credentials=False,
+        distributed_rate_limit=False,
+        circuit_breaker=CircuitBreaker(failure_threshold=5, recovery_seconds=60),
+    )
+    crawler.get_auth = AsyncMock(return_value=("Basic token", 0))
+    crawler.sleep_backoff = AsyncMock()
+    crawler.upstream_request = AsyncMock(side_effect=error)
+    try:
+        with pytest.raises(TJRSNetworkError):
+            await crawler.request_page("https://consulta.tjrs.jus.br/processo")
+        assert crawler.circuit_breaker.failures == 4
+        # a quinta falha seguida abre o disjuntor no meio da segunda consulta
+        with pytest.raises(TJRSCircuitOpen):
+            await crawler.request_page("https://consulta.tjrs.jus.br/processo")
+        assert crawler.circuit_breaker.state == "open"
+        assert crawler.upstream_request.await_count == 5
+
+        with pytest.raises(TJRSCircuitOpen):
+            await crawler.request_page("https://consulta.tjrs.jus.br/processo")
+        assert crawler.upstream_request.await_count == 5
+    finally:
+        await crawler.close()
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_with_empty_body_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0.0)
+    breaker.on_failure("TJRS 5xx (503)")
+    assert breaker.state == "half_open"
+    breaker.recovery_seconds = 60
+
+    crawler = Crawler(shared_credentials=False, distributed_rate_limit=False, circuit_breaker=breaker)
+    crawler.get_auth = AsyncMock(return_value=("Basic token", 0))
+    crawler.sleep_backoff = AsyncMock()
+    crawler.upstream_request = AsyncMock(return_value=FakeResponse(200, ""))
+    try:
+        with pytest.raises(TJRSCircuitOpen):
+            await crawler.request_page("https://consulta.tjrs.jus.br/processo")
+    finally:
+        await crawler.close()
+
+    # a chamada de teste falhou: o disjuntor reabre em vez de ficar preso em half_open
+    assert breaker.state == "open"
+    assert breaker.stats()["last_failure"] == "Resposta vazia"
+    assert crawler.upstream_request.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_during_refresh_do_not_start_another_generation(monkeypatch):
+    # TJRS trocou o segredo do main.js: só chaves ofuscadas com os BigInts novos passam
+    async def scrape():
+        await asyncio.sleep(0.2)
+        return next(bigints)
+
+    bigints = iter([["1", "2"], ["3", "4"]])
+    extract = AsyncMock(side_effect=scrape)
+    monkeypatch.setattr(crawler_module, "find_obfuscate_and_extract_big_int", extract)
+    crawler = Crawler(
+        shared_credentials=False,
+        distributed_rate_limit=False,
+        rate_limiter=AdaptiveRateLimiter(rate=1000, max_rate=1000),
+        scheduler=UpstreamScheduler(max_concurrency=100),
+    )
+    solved = []
+
+    async def create_authorization():
+        await asyncio.sleep(0.02)
+        solved.append(await crawler.get_big_ints())
+        return f"Basic {solved[-1]}-{len(solved)}"
+
+    async def upstream_request(method, url, endpoint="consulta", headers=None, **kwargs):
+        await asyncio.sleep(0.01)
+        if not headers["Authorization"].startswith("Basic (3, 4)"):
+            return FakeResponse(401, "")
+        return FakeResponse(200, '{"data": []}')
+
+    crawler.create_authorization = create_authorization
+    crawler.upstream_request = upstream_request
+    try:
+        await crawler.get_auth()
+        burst = [asyncio.create_task(crawler.request_page(f"https://tjrs/{i}")) for i in range(10)]
+        # tráfego contínuo enquanto a renovação (raspagem de 0.2s) está em andamento
+        late = []
+        for i in range(10):
+            await asyncio.sleep(0.03)
+            late.append(asyncio.create_task(crawler.request_page(f"https://tjrs/late/{i}")))
+        results = await asyncio.gather(*burst, *late)
+        after = await crawler.request_page("https://tjrs/after")
+    finally:
+        await crawler.close()
+
+    assert results == [{"data": []}] * 20
+    assert after == {"data": []}
+    assert extract.await_count == 2
+    assert crawler.credentials_generation == 1
+    # uma chave inicial, no máximo uma com os BigInts antigos durante a raspagem e a da geração nova
+    assert len(solved) <= 3
+    assert crawler.auth_pool.held() == {f"Basic (3, 4)-{len(solved)}"}
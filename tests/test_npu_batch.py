@@ -0,0 +1,70 @@
+import random
+from crawler_jus import npu_batch
+from crawler_jus.npu_batch import validate_npus, validate_npu_scalar
+
+VALID = "5001646-66.2026.8.21.0008"
+
+MIXED = [
+    VALID,
+    "50016466620268210008",
+    "5001646-67.2026.8.21.0008",
+    "1646-66.2026.8.21.0008",
+    "  5001646 66 2026 8 21 0008 ",
+    "123",
+    "",
+    "abc",
+    "500164666202682100081",
+    "５００１６４６-６６.２０２６.８.２１.０００８",
+    "9" * 80,
+    None,
+    12345,
+]
+
+
+def random_npu(rng: random.Random) -> str:
+    digits = "".join(rng.choice("0123456789") for _ in range(rng.randint(0, 22)))
+    style = rng.random()
+    if style < 0.4 and len(digits) == 20:
+        return f"{digits[:7]}-{digits[7:9]}.{digits[9:13]}.{digits[13]}.{digits[14:16]}.{digits[16:]}"
+    if style < 0.6:
+        return "".join(c + rng.choice(["", "", ".", "-", " ", "x"]) for c in digits)
+    return digits
+
+
+def scalar(npus):
+    results = [validate_npu_scalar(npu) for npu in npus]
+    return [n for n, _ in results], [i for _, i in results]
+
+
+def test_validate_npus_matches_scalar_on_edge_cases():
+    normalized, invalid = validate_npus(MIXED)
+
+    assert (normalized, invalid) == scalar(MIXED)
+    assert normalized[0] == normalized[1] == VALID
+    assert invalid[:3] == [False, False, True]
+    assert normalized[3] == "0001646-66.2026.8.21.0008"
+    assert normalized[8] is None and invalid[8]
+    assert normalized[11] is None and invalid[11]
+
+
+def test_validate_npus_matches_scalar_on_random_input():
+    rng = random.Random(7)
+    npus = [random_npu(rng) for _ in range(3000)]
+    # metade com dígito verificador certo, para exercitar os dois lados da máscara
+    for i in range(0, len(npus), 2):
+        normalized, _ = validate_npu_scalar(npus[i])
+        if normalized is not None:
+            digits = "".join(c for c in normalized if c.isdigit())
+            dv = 98 - int(digits[:7] + digits[9:] + "00") % 97
+            npus[i] = f"{normalized[:8]}{dv:02d}{normalized[10:]}"
+
+    assert validate_npus(npus) == scalar(npus)
+
+
+def test_validate_npus_without_numpy(monkeypatch):
+    monkeypatch.setattr(npu_batch, "np", None)
+    assert validate_npus(MIXED) == scalar(MIXED)
+
+
+def test_validate_npus_empty():
+    assert validate_npus([]) == ([], [])
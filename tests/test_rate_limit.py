@@ -0,0 +1,59 @@
+import time
+import asyncio
+import pytest
+from redis.exceptions import ConnectionError
+from crawler_jus import cache
+from crawler_jus.rate_limit import AdaptiveRateLimiter, RedisTokenBucket
+
+
+def test_aimd_adjusts_rate():
+    limiter = AdaptiveRateLimiter(rate=4, min_rate=1, max_rate=8, increase=1, decrease=0.5)
+
+    for _ in range(4):
+        limiter.on_success()
+    assert 4.9 < limiter.rate < 5.0
+
+    limiter.on_rate_limited()
+    limiter.on_rate_limited()  # mesma rajada: reduz uma vez só
+    assert limiter.rate == pytest.approx(limiter.stats()["rate"], abs=1e-3)
+    assert 2.4 < limiter.rate < 2.5
+
+
+@pytest.mark.asyncio
+async def test_callers_are_queued_instead_of_failing():
+    limiter = AdaptiveRateLimiter(rate=50, max_rate=50)
+
+    tasks = [asyncio.create_task(limiter.acquire()) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert limiter.stats()["queue_depth"] == 4
+
+    await asyncio.gather(*tasks)
+    assert limiter.stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_token_bucket_is_shared_between_instances(fake_redis):
+    first = RedisTokenBucket("consulta", rate=10, burst=2)
+    second = RedisTokenBucket("consulta", rate=10, burst=2)
+
+    assert await first.try_acquire() == 0
+    assert await second.try_acquire() == 0
+    wait = await first.try_acquire()
+    assert 0 < wait <= 0.1
+
+    start = time.monotonic()
+    await second.acquire()
+    assert time.monotonic() - start >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_redis_token_bucket_fails_open(monkeypatch):
+    class BrokenRedis:
+        async def eval(self, *args):
+            raise ConnectionError("redis fora")
+
+    monkeypatch.setattr(cache, "redis_client", BrokenRedis())
+    bucket = RedisTokenBucket("auth", rate=1, burst=1)
+
+    await asyncio.wait_for(bucket.acquire(), timeout=1)
+    await asyncio.wait_for(bucket.acquire(), timeout=1)
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from api.enums import RequestPriority
+from crawler_jus.scheduler import UpstreamScheduler
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_are_not_starved_by_bulk():
+    scheduler = UpstreamScheduler(max_concurrency=1)
+    order = []
+
+    async def call(priority: RequestPriority, name: str):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.001)
+
+    bulk = [asyncio.create_task(call(RequestPriority.BULK, f"bulk{i}")) for i in range(20)]
+    await asyncio.sleep(0)
+    interactive = [asyncio.create_task(call(RequestPriority.INTERACTIVE, f"int{i}")) for i in range(4)]
+    await asyncio.gather(*bulk, *interactive)
+
+    # o primeiro bulk já estava rodando; os interativos passam na frente do resto do lote
+    assert order[:5] == ["bulk0", "int0", "int1", "int2", "int3"]
+
+
+@pytest.mark.asyncio
+async def test_class_caps_and_weighted_share():
+    scheduler = UpstreamScheduler(
+        max_concurrency=4,
+        weights={RequestPriority.INTERACTIVE: 3, RequestPriority.BULK: 1},
+        caps={RequestPriority.BULK: 2},
+    )
+    peak = {RequestPriority.BULK: 0}
+    order = []
+
+    async def call(priority: RequestPriority):
+        async with scheduler.slot(priority):
+            order.append(priority)
+            peak[priority] = max(peak.get(priority, 0), scheduler.stats()[priority.value]["running"])
+            await asyncio.sleep(0.001)
+
+    await asyncio.gather(
+        *(call(RequestPriority.BULK) for _ in range(8)),
+        *(call(RequestPriority.INTERACTIVE) for _ in range(24)),
+    )
+
+    assert peak[RequestPriority.BULK] <= 2
+    # com as duas filas cheias, ~3 interativos para cada bulk
+    first = order[:16]
+    assert first.count(RequestPriority.INTERACTIVE) >= 10
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    scheduler = UpstreamScheduler(max_concurrency=1)
+    await scheduler.acquire(RequestPriority.BULK)
+    waiter = asyncio.create_task(scheduler.acquire(RequestPriority.BULK))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    scheduler.release(RequestPriority.BULK)
+    assert scheduler.stats()["bulk"] == {"running": 0, "queued": 0}
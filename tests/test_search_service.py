@@ -0,0 +1,152 @@
+import json
+import time
+import asyncio
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock
+from crawler_jus import cache
+from crawler_jus.services import search_service
+from crawler_jus.services.search_service import MovimentosFilter, SearchService
+from api.exceptions import TJRSClientError
+from tests.test_api import FakeCrawler
+
+
+class CountingCrawler(FakeCrawler):
+    def __init__(self):
+        self.calls = 0
+
+    async def request_page(self, url: str, priority=None) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return await super().request_page(url)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_share_one_fetch(no_cache):
+    crawler = CountingCrawler()
+
+    results = await asyncio.gather(
+        *(
+            SearchService(crawler).search_npu(
+                "5001646-66.2026.8.21.0008", force_refresh=bool(i % 2)
+            )
+            for i in range(10)
+        )
+    )
+
+    assert crawler.calls == 2
+    assert all(r == results[0] for r in results)
+    assert search_service._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_only_stale_resource_is_refreshed_once(monkeypatch):
+    crawler = CountingCrawler()
+    stale_basic = {
+        "fetched_at": time.time() - search_service.CACHE_BASIC_SOFT_TTL - 5,
+        "data": {"nomeClasse": "ANTIGA"},
+    }
+    fresh_meta = {"fetched_at": time.time(), "total": 0}
+    monkeypatch.setattr(search_service, "get_many_cache", AsyncMock(return_value=[stale_basic, fresh_meta, None]))
+    set_cache = AsyncMock(return_value=None)
+    monkeypatch.setattr(search_service, "set_cache", set_cache)
+    set_list_cache = AsyncMock(return_value=None)
+    monkeypatch.setattr(search_service, "set_list_cache", set_list_cache)
+
+    first = await SearchService(crawler).search_npu("5001646-66.2026.8.21.0008")
+    second = await SearchService(crawler).search_npu("5001646-66.2026.8.21.0008")
+
+    assert first["nomeClasse"] == "ANTIGA"
+    assert first["movimentos"] == []
+    assert first["cache"]["status"] == "stale"
+    assert first["cache"]["age_seconds"] >= search_service.CACHE_BASIC_SOFT_TTL
+    assert second["cache"]["status"] == "stale"
+
+    await asyncio.gather(*search_service._inflight.values())
+    # só os dados básicos estavam velhos: uma única consulta, sem tocar nos movimentos
+    assert crawler.calls == 1
+    set_list_cache.assert_not_awaited()
+    key, stored = set_cache.await_args.args
+    assert key == "tjrs:8:50016466620268210008"
+    assert stored["data"]["nomeClasse"] == "CUMPRIMENTO DE SENTENÇA"
+    assert set_cache.await_args.kwargs["ttl"] == search_service.CACHE_BASIC_HARD_TTL
+
+
+@pytest.mark.asyncio
+async def test_entry_written_before_resource_split_is_served(fake_redis):
+    crawler = CountingCrawler()
+    # formato da versão anterior: json puro com o resultado completo, sem envelope
+    legacy = {"nomeClasse": "ANTIGA", "partes": [], "movimentos": [{"data": "01/01/2026"}, {"data": "02/01/2026"}]}
+    await fake_redis.set("tjrs:8:50016466620268210008", json.dumps(legacy, ensure_ascii=False), ex=60)
+
+    result = await SearchService(crawler).search_npu(
+        "5001646-66.2026.8.21.0008", movimentos_filter=MovimentosFilter(offset=1, limit=1)
+    )
+
+    assert result["nomeClasse"] == "ANTIGA"
+    assert result["movimentos"] == [{"data": "02/01/2026"}]
+    assert result["movimentos_total"] == 2
+    assert result["cache"]["status"] == "hit"
+    assert crawler.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_negative_cache_short_circuits_until_force_refresh(monkeypatch):
+    class NotFoundCrawler(CountingCrawler):
+        async def request_page(self, url: str, priority=None) -> str:
+            self.calls += 1
+            raise TJRSClientError("TJRS retornou erro 404", upstream_status=404)
+
+    crawler = NotFoundCrawler()
+    negative = {"type": "upstream_4xx", "upstream_status": 404, "detail": "TJRS retornou erro 404"}
+    set_negative_cache = AsyncMock(return_value=None)
+    monkeypatch.setattr(search_service, "set_negative_cache", set_negative_cache)
+    monkeypatch.setattr(search_service, "get_many_cache", AsyncMock(return_value=[None, None, negative]))
+
+    with pytest.raises(TJRSClientError):
+        await SearchService(crawler).search_npu("5001646-66.2026.8.21.0008")
+    assert crawler.calls == 0
+
+    with pytest.raises(TJRSClientError):
+        await SearchService(crawler).search_npu("5001646-66.2026.8.21.0008", force_refresh=True)
+    assert crawler.calls == 2
+    assert set_negative_cache.await_args.args == ("tjrs:8:50016466620268210008", negative)
+
+
+@pytest.mark.asyncio
+async def test_movimentos_are_cached_apart_and_sliced(fake_redis):
+
+    class LongHistoryCrawler(CountingCrawler):
+        async def request_page(self, url: str, priority=None):
+            self.calls += 1
+            if "consultaProcesso" in url:
+                return await FakeCrawler.request_page(self, url)
+            return {"data": [{"data": f"{day:02d}/01/2026", "descricao": f"Evento {day}"} for day in range(28, 0, -1)]}
+
+    crawler = LongHistoryCrawler()
+    npu = "5001646-66.2026.8.21.0008"
+    first = await SearchService(crawler).search_npu(npu, movimentos_filter=MovimentosFilter(limit=3))
+    assert first["cache"]["status"] == "miss"
+    assert [m["descricao"] for m in first["movimentos"]] == ["Evento 28", "Evento 27", "Evento 26"]
+    assert first["movimentos_total"] == 28
+
+    # dados básicos e movimentos em entradas separadas
+    stored = await cache.get_cache("tjrs:8:50016466620268210008")
+    assert "movimentos" not in stored["data"]
+    meta = await cache.get_cache("tjrs:8:50016466620268210008:movimentos:meta")
+    assert meta["total"] == 28
+    assert 0 < await fake_redis.ttl("tjrs:8:50016466620268210008:movimentos") <= search_service.CACHE_HARD_TTL
+    assert await fake_redis.ttl("tjrs:8:50016466620268210008") > search_service.CACHE_HARD_TTL
+
+    page = await SearchService(crawler).search_npu(npu, movimentos_filter=MovimentosFilter(offset=3, limit=2))
+    assert page["cache"]["status"] == "hit"
+    assert [m["descricao"] for m in page["movimentos"]] == ["Evento 25", "Evento 24"]
+
+    period = await SearchService(crawler).search_npu(
+        npu, movimentos_filter=MovimentosFilter(desde=date(2026, 1, 10), ate=date(2026, 1, 12))
+    )
+    assert [m["descricao"] for m in period["movimentos"]] == ["Evento 12", "Evento 11", "Evento 10"]
+
+    full = await SearchService(crawler).search_npu(npu)
+    assert len(full["movimentos"]) == 28
+    assert crawler.calls == 2
@@ -0,0 +1,44 @@
+import hashlib
+import pytest
+from api.exceptions import TJRSUpstreamError
+from crawler_jus.crawler import Crawler
+from crawler_jus.solver import ParallelSolver, solve_range, solve_range_fast
+
+
+def make_challenge(salt: str, number: int) -> str:
+    return hashlib.sha256(f"{salt}{number}".encode()).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_parallel_solver_matches_serial():
+    salt, maxnumber = "d0f1e2?expires=1767225600", 20_000
+    challenge = make_challenge(salt, 13_337)
+    solver = ParallelSolver(workers=2, chunk_size=1_000)
+    try:
+        parallel = await solver.solve(salt, challenge, maxnumber)
+        missing = await solver.solve(salt, make_challenge(salt, maxnumber + 1), maxnumber)
+    finally:
+        solver.close()
+
+    assert parallel == Crawler().solve_challenge(salt, challenge, maxnumber) == 13_337
+    assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_crawler_parallel_mode_raises_like_serial():
+    crawler = Crawler(solver="parallel", solver_workers=1, solver_chunk_size=500)
+    try:
+        with pytest.raises(TJRSUpstreamError):
+            await crawler.run_solver("abc", make_challenge("abc", 5_000), 1_000)
+    finally:
+        await crawler.close()
+
+
+@pytest.mark.parametrize("number", [0, 9, 10, 99_999])
+def test_fast_engine_matches_hashlib_engine(number):
+    salt = "0a1b2c?expires=1767225600&ip=1"
+    challenge = make_challenge(salt, number)
+
+    assert solve_range_fast(salt, challenge, 0, 100_000) == solve_range(salt, challenge, 0, 100_000) == number
+    assert solve_range_fast(salt, challenge.upper(), 0, 100_000) is None
+    assert solve_range_fast(salt, "não-hex", 0, 100_000) is None
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import pytest
+from httpx import AsyncClient, ASGITransport
+from api import router
+from crawler_jus.tracing import format_tree, server_timing, span, start_trace
+
+
+def test_spans_nest_and_sum_by_phase():
+    with start_trace("POST /search_npu") as root:
+        with span("cache"):
+            pass
+        with span("fetch_basic"):
+            with span("attempt", n=1):
+                pass
+            with span("attempt", n=2):
+                pass
+
+    assert [child.name for child in root.children] == ["cache", "fetch_basic"]
+    assert len(root.children[1].children) == 2
+
+    timing = server_timing(root)
+    names = [entry.split(";")[0] for entry in timing.split(", ")]
+    assert names == ["total", "cache", "fetch_basic", "attempt"]
+
+    tree = format_tree(root).splitlines()
+    assert tree[0].startswith("POST /search_npu +0.0ms")
+    assert tree[3].startswith("    attempt") and tree[3].endswith("n=1")
+
+
+def test_span_outside_trace_is_noop():
+    with span("cache") as current:
+        assert current is None
+
+
+@pytest.mark.asyncio
+async def test_background_task_does_not_attach_after_request_ends():
+    release = asyncio.Event()
+
+    async def background():
+        await release.wait()
+        with span("late") as current:
+            return current
+
+    with start_trace("root") as root:
+        task = asyncio.create_task(background())
+        await asyncio.sleep(0)
+
+    release.set()
+    assert await task is None
+    assert root.children == []
+
+
+@pytest.mark.asyncio
+async def test_slow_request_logs_span_tree(monkeypatch, caplog):
+    monkeypatch.setattr(router, "SLOW_REQUEST_THRESHOLD", 0.0)
+    transport = ASGITransport(app=router.app)
+
+    with caplog.at_level(logging.WARNING, logger=router.logger.name):
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.get("/metrics/missing")
+
+    assert response.status_code == 404
+    assert "Requisição lenta" in caplog.text
+    assert "GET /metrics/missing" in caplog.text
@@ -1,3 +1,6 @@
+import httpx
+import pytest
+from crawler_jus import cache, util
 from crawler_jus.util import (
     remove_special_characters,
     extract_comarca,
@@ -29,3 +32,60 @@ def test_build_urls():
     )
 
 
+MAIN_JS = "x=1;obfuscation(e){const t=BigInt(e),n=t%BigInt(1234567)+BigInt(7654321);return n}"
+
+
+class FakeTJRS:
+    def __init__(self):
+        self.bundle = "main.aaaa.js"
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        etag = f'"{self.bundle}"'
+        if request.url.path.endswith(".js"):
+            return httpx.Response(200, text=MAIN_JS.replace("1234567", "1" if self.bundle == "main.bbbb.js" else "1234567"))
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, text=f'<script src="{self.bundle}"></script>', headers={"ETag": etag})
+
+    def downloads(self) -> int:
+        return sum(1 for request in self.requests if request.url.path.endswith(".js"))
+
+
+@pytest.fixture
+def tjrs(fake_redis, monkeypatch):
+    fake = FakeTJRS()
+    monkeypatch.setattr(util, "_main_js_artifact", None)
+    monkeypatch.setattr(util, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(fake.handler)))
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_main_js_is_downloaded_once_per_bundle(tjrs, monkeypatch):
+    assert await util.find_obfuscate_and_extract_big_int() == (1234567, 7654321)
+    assert tjrs.downloads() == 1
+
+    # página não mudou: 304, sem baixar o main.js
+    assert await util.find_obfuscate_and_extract_big_int() == (1234567, 7654321)
+    assert tjrs.requests[-1].headers["If-None-Match"] == '"main.aaaa.js"'
+    assert tjrs.downloads() == 1
+
+    # réplica nova: lê o artefato do redis e não baixa o bundle de mesmo nome
+    monkeypatch.setattr(util, "_main_js_artifact", None)
+    assert await util.find_obfuscate_and_extract_big_int() == (1234567, 7654321)
+    assert tjrs.downloads() == 1
+
+    await util.close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_new_bundle_is_extracted_again(tjrs):
+    assert await util.find_obfuscate_and_extract_big_int() == (1234567, 7654321)
+
+    tjrs.bundle = "main.bbbb.js"
+    assert await util.find_obfuscate_and_extract_big_int() == (1, 7654321)
+    assert tjrs.downloads() == 2
+    assert (await cache.get_main_js_artifact())["bundle"] == "main.bbbb.js"
+
+    await util.close_http_client()
@@ -0,0 +1,132 @@
+import json
+import asyncio
+import time
+import pytest
+from httpx import AsyncClient, ASGITransport
+from api.router import app
+from crawler_jus.services import watch_service
+from crawler_jus.services.watch_service import WatchService, next_interval
+from tests.test_api import FakeCrawler
+
+NPU = "5001646-66.2026.8.21.0008"
+
+
+class MovingCrawler(FakeCrawler):
+    def __init__(self):
+        self.movimentos = [{"data": "23/01/2026", "descricao": "Expedida/certificada a intimação eletrônica"}]
+
+    async def request_page(self, url: str, priority=None) -> str:
+        if "consultaProcesso" in url:
+            return await super().request_page(url)
+        return json.dumps({"data": self.movimentos})
+
+
+@pytest.mark.asyncio
+async def test_only_new_movements_are_returned_after_cursor(fake_redis):
+    crawler = MovingCrawler()
+    service = WatchService(crawler)
+
+    watch = await service.add(NPU)
+    assert watch["cursor"] == 0
+    assert (await service.new_movements(NPU))["movimentos"] == []
+
+    crawler.movimentos = [
+        {"data": "02/02/2026", "descricao": "Conclusos pra decisão/despacho"},
+        {"data": "02/02/2026", "descricao": "Conclusos pra decisão/despacho"},
+        *crawler.movimentos,
+    ]
+    new = await service.check("50016466620268210008")
+    assert len(new) == 2
+
+    delta = await service.new_movements(NPU, cursor=0)
+    assert delta["cursor"] == 2
+    assert [m["seq"] for m in delta["movimentos"]] == [1, 2]
+    assert delta["movimentos"][0]["descricao"] == "Conclusos pra decisão/despacho"
+
+    # sem mudança no TJRS: nada novo depois do cursor
+    assert await service.check(NPU) == []
+    assert (await service.new_movements(NPU, cursor=2)) == {"npu": NPU, "cursor": 2, "movimentos": []}
+
+
+@pytest.mark.asyncio
+async def test_due_processes_are_claimed_once_and_rescheduled(fake_redis):
+    service = WatchService(MovingCrawler())
+    await service.add(NPU)
+    await fake_redis.zadd(watch_service.WATCH_DUE_KEY, {"50016466620268210008": time.time() - 1})
+
+    assert await WatchService(MovingCrawler()).claim_due() == ["50016466620268210008"]
+    assert await service.claim_due() == []
+
+    await fake_redis.zadd(watch_service.WATCH_DUE_KEY, {"50016466620268210008": time.time() - 1})
+    assert await service.run_due() == 1
+    status = await service.status(NPU)
+    assert status["next_check_at"] >= time.time() + watch_service.WATCH_MIN_INTERVAL - 5
+
+
+def test_interval_adapts_to_last_movement():
+    now = time.time()
+    assert next_interval(now - 60, now) == watch_service.WATCH_MIN_INTERVAL
+    assert next_interval(now - 365 * 86400, now) == watch_service.WATCH_MAX_INTERVAL
+    assert next_interval(None, now) == watch_service.WATCH_MAX_INTERVAL
+    assert next_interval(now - 86400, now) == 86400 * watch_service.WATCH_INTERVAL_FACTOR
+
+
+@pytest.mark.asyncio
+async def test_watch_routes(fake_redis):
+    app.state.crawler = MovingCrawler()
+    transport = ASGITransport(app=app)
+
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        added = await ac.post("/watch", json={"npu": NPU})
+        movements = await ac.get(f"/watch/{NPU}/movimentos", params={"cursor": 0})
+        removed = await ac.delete(f"/watch/{NPU}")
+        missing = await ac.get(f"/watch/{NPU}/movimentos")
+        invalid = await ac.get("/watch/123/movimentos")
+
+    assert added.status_code == 200
+    assert added.json()["npu"] == NPU
+    assert movements.json() == {"npu": NPU, "cursor": 0, "movimentos": []}
+    assert removed.status_code == 204
+    assert missing.status_code == 404
+    assert invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checks_log_each_movement_once(fake_redis):
+    crawler = MovingCrawler()
+    service = WatchService(crawler)
+    await service.add(NPU)
+
+    crawler.movimentos = [{"data": "02/02/2026", "descricao": "Conclusos pra decisão/despacho"}, *crawler.movimentos]
+    # réplica com reserva vencida e outra verificando o mesmo processo ao mesmo tempo
+    first, second = await asyncio.gather(service.check(NPU), WatchService(crawler).check(NPU))
+
+    assert len(first) + len(second) == 1
+    delta = await service.new_movements(NPU)
+    assert [m["seq"] for m in delta["movimentos"]] == [1]
+    assert delta["cursor"] == 1
+
+
+@pytest.mark.asyncio
+async def test_check_fetches_only_movements_and_tracks_latest_movement_date(fake_redis):
+    class RecordingCrawler(MovingCrawler):
+        def __init__(self):
+            super().__init__()
+            self.urls = []
+
+        async def request_page(self, url: str, priority=None) -> str:
+            self.urls.append(url)
+            return await super().request_page(url)
+
+    crawler = RecordingCrawler()
+    service = WatchService(crawler)
+    await service.add(NPU)
+    crawler.movimentos = [{"data": "02/02/2026", "descricao": "Conclusos pra decisão/despacho"}, *crawler.movimentos]
+    crawler.urls.clear()
+
+    assert len(await service.check(NPU)) == 1
+
+    assert len(crawler.urls) == 1 and "consultaProcesso" not in crawler.urls[0]
+    status = await service.status(NPU)
+    assert status["last_moved_at"] == watch_service.latest_movement_time(crawler.movimentos)
+    assert status["last_moved_at"] < status["last_checked_at"]